@@ -0,0 +1,44 @@
+"""add indexes matching keyset sort orders of list endpoints
+
+Revision ID: 051_list_keyset_indexes
+Revises: 050_wh_receipt_weight_i18n
+Create Date: 2026-10-19 10:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "051_list_keyset_indexes"
+down_revision: Union[str, Sequence[str], None] = "050_wh_receipt_weight_i18n"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keys and NULL placement mirror ORDER_LIST_SORT / OPERATION_LIST_SORT / VISIT_LIST_SORT.
+    # The COALESCE expressions must stay identical to their null_sentinel, so that
+    # "(k1, k2, id) < (:k1, :k2, :id)" starts the scan at the cursor.
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS idx_orders_list_keyset ON "Sales".orders ('
+        "COALESCE(scheduled_delivery_at, '-infinity'::timestamptz) DESC, "
+        "COALESCE(order_date, 'infinity'::timestamptz) DESC, "
+        "order_no DESC)"
+    )
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS idx_operations_list_keyset ON "Sales".operations ('
+        "COALESCE(operation_date, '-infinity'::timestamptz) DESC, "
+        "COALESCE(created_at, '-infinity'::timestamptz) DESC, "
+        "id DESC)"
+    )
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS idx_customers_visits_list_keyset ON "Sales".customers_visits '
+        "(visit_date DESC, visit_time DESC NULLS LAST, id DESC)"
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS "Sales".idx_customers_visits_list_keyset')
+    op.execute('DROP INDEX IF EXISTS "Sales".idx_operations_list_keyset')
+    op.execute('DROP INDEX IF EXISTS "Sales".idx_orders_list_keyset')
@@ -0,0 +1,74 @@
+"""add trigram indexes and search_key() for customer autocomplete
+
+Revision ID: 052_customer_search_trgm
+Revises: 051_list_keyset_indexes
+Create Date: 2026-10-19 12:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "052_customer_search_trgm"
+down_revision: Union[str, Sequence[str], None] = "051_list_keyset_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Kept in sync with src/api/v1/services/customer_search.py (checked by tests/test_customer_search.py).
+# Characters past the end of TRANSLIT_TO (hard/soft signs, apostrophes of o' / g') are dropped.
+TRANSLIT_FROM = "абвгдеёжзийклмнопрстуфхцчшщыэюяўқғҳ" "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЫЭЮЯЎҚҒҲ" "ъьЪЬ'`ʻʼ‘’"
+TRANSLIT_TO = "abvgdeojziiklmnoprstufhccssieuaokgh" * 2
+DIGRAPHS = (
+    ("shch", "s"),
+    ("sh", "s"),
+    ("ch", "c"),
+    ("zh", "j"),
+    ("kh", "h"),
+    ("ts", "c"),
+    ("ya", "a"),
+    ("yu", "u"),
+    ("yo", "o"),
+)
+LATIN_SINGLES = ("yxqw", "ihkv")
+
+INDEXES = (
+    (
+        "idx_customers_search_key_trgm",
+        """"Sales".customers USING gin ("Sales".search_key(coalesce(name_client, '') || ' ' || coalesce(firm_name, '')) gin_trgm_ops)""",
+    ),
+    ("idx_customers_name_client_trgm", '"Sales".customers USING gin (name_client gin_trgm_ops)'),
+    ("idx_customers_firm_name_trgm", '"Sales".customers USING gin (firm_name gin_trgm_ops)'),
+    ("idx_customers_tax_id_trgm", '"Sales".customers USING gin (tax_id gin_trgm_ops)'),
+    ("idx_customers_account_no_trgm", '"Sales".customers USING gin (account_no gin_trgm_ops)'),
+    (
+        "idx_customers_phone_digits_trgm",
+        """"Sales".customers USING gin (regexp_replace(coalesce(phone, ''), '\\D', '', 'g') gin_trgm_ops)""",
+    ),
+    ("idx_customers_tax_id_prefix", '"Sales".customers (tax_id text_pattern_ops)'),
+)
+
+
+def _search_key_body() -> str:
+    translit_from = TRANSLIT_FROM.replace("'", "''")
+    expr = f"translate(lower(coalesce(value, '')), '{translit_from}', '{TRANSLIT_TO}')"
+    for digraph, replacement in DIGRAPHS:
+        expr = f"replace({expr}, '{digraph}', '{replacement}')"
+    expr = f"translate({expr}, '{LATIN_SINGLES[0]}', '{LATIN_SINGLES[1]}')"
+    return f"SELECT btrim(regexp_replace({expr}, '[^a-z0-9]+', ' ', 'g'))"
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        'CREATE OR REPLACE FUNCTION "Sales".search_key(value text) RETURNS text '
+        f"LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $${_search_key_body()}$$"
+    )
+    for name, definition in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade() -> None:
+    for name, _definition in reversed(INDEXES):
+        op.execute(f'DROP INDEX IF EXISTS "Sales".{name}')
+    op.execute('DROP FUNCTION IF EXISTS "Sales".search_key(text)')
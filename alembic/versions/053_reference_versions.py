@@ -0,0 +1,91 @@
+"""add per-table version counters for reference data ETags
+
+Revision ID: 053_reference_versions
+Revises: 052_customer_search_trgm
+Create Date: 2026-10-19 14:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "053_reference_versions"
+down_revision: Union[str, Sequence[str], None] = "052_customer_search_trgm"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Kept in sync with src/core/http_cache.py REFERENCE_TABLES (checked by tests/test_http_cache.py).
+REFERENCE_TABLES = (
+    "product",
+    "product_type",
+    "payment_type",
+    "currency",
+    "warehouse",
+    "cities",
+    "territories",
+    "menu_items",
+    "role_menu_access",
+    "operation_types",
+    "operation_config",
+    "translations",
+)
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS "Sales".reference_versions (
+            table_name text PRIMARY KEY,
+            version bigint NOT NULL DEFAULT 1,
+            updated_at timestamptz NOT NULL DEFAULT now()
+        )
+        """
+    )
+    # Statement-level: one bump per write statement, however many rows it touches.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION "Sales".bump_reference_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO "Sales".reference_versions AS v (table_name) VALUES (TG_TABLE_NAME)
+            ON CONFLICT (table_name) DO UPDATE SET version = v.version + 1, updated_at = now();
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table in REFERENCE_TABLES:
+        op.execute(
+            f"""
+            DO $$
+            BEGIN
+                IF to_regclass('"Sales".{table}') IS NOT NULL THEN
+                    INSERT INTO "Sales".reference_versions (table_name) VALUES ('{table}')
+                    ON CONFLICT (table_name) DO NOTHING;
+                    DROP TRIGGER IF EXISTS trg_{table}_reference_version ON "Sales".{table};
+                    CREATE TRIGGER trg_{table}_reference_version
+                        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "Sales".{table}
+                        FOR EACH STATEMENT EXECUTE FUNCTION "Sales".bump_reference_version();
+                END IF;
+            END
+            $$
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(REFERENCE_TABLES):
+        op.execute(
+            f"""
+            DO $$
+            BEGIN
+                IF to_regclass('"Sales".{table}') IS NOT NULL THEN
+                    DROP TRIGGER IF EXISTS trg_{table}_reference_version ON "Sales".{table};
+                END IF;
+            END
+            $$
+            """
+        )
+    op.execute('DROP FUNCTION IF EXISTS "Sales".bump_reference_version()')
+    op.execute('DROP TABLE IF EXISTS "Sales".reference_versions')
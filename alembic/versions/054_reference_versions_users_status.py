@@ -0,0 +1,55 @@
+"""track order statuses and users in reference_versions
+
+Revision ID: 054_reference_versions_users_status
+Revises: 053_reference_versions
+Create Date: 2026-10-19 15:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "054_reference_versions_users_status"
+down_revision: Union[str, Sequence[str], None] = "053_reference_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Read by the in-process reference data cache (src/api/v1/services/reference_data.py).
+REFERENCE_TABLES = ("status", "users")
+
+
+def upgrade() -> None:
+    for table in REFERENCE_TABLES:
+        op.execute(
+            f"""
+            DO $$
+            BEGIN
+                IF to_regclass('"Sales".{table}') IS NOT NULL THEN
+                    INSERT INTO "Sales".reference_versions (table_name) VALUES ('{table}')
+                    ON CONFLICT (table_name) DO NOTHING;
+                    DROP TRIGGER IF EXISTS trg_{table}_reference_version ON "Sales".{table};
+                    CREATE TRIGGER trg_{table}_reference_version
+                        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "Sales".{table}
+                        FOR EACH STATEMENT EXECUTE FUNCTION "Sales".bump_reference_version();
+                END IF;
+            END
+            $$
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(REFERENCE_TABLES):
+        op.execute(
+            f"""
+            DO $$
+            BEGIN
+                IF to_regclass('"Sales".{table}') IS NOT NULL THEN
+                    DROP TRIGGER IF EXISTS trg_{table}_reference_version ON "Sales".{table};
+                END IF;
+            END
+            $$
+            """
+        )
+        op.execute(f"DELETE FROM \"Sales\".reference_versions WHERE table_name = '{table}'")
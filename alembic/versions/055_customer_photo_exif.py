@@ -0,0 +1,50 @@
+"""store EXIF capture data of customer photos
+
+Revision ID: 055_customer_photo_exif
+Revises: 054_reference_versions_users_status
+Create Date: 2026-10-19 17:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "055_customer_photo_exif"
+down_revision: Union[str, Sequence[str], None] = "054_reference_versions_users_status"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        'ALTER TABLE "Sales".customer_photo '
+        "ADD COLUMN IF NOT EXISTS latitude NUMERIC(9, 6), "
+        "ADD COLUMN IF NOT EXISTS longitude NUMERIC(9, 6), "
+        "ADD COLUMN IF NOT EXISTS exif_orientation SMALLINT, "
+        "ADD COLUMN IF NOT EXISTS exif_checked_at TIMESTAMPTZ"
+    )
+    op.execute(
+        'COMMENT ON COLUMN "Sales".customer_photo.latitude IS '
+        "'Широта из GPS в EXIF файла (NULL — координат в файле нет)'"
+    )
+    op.execute(
+        'COMMENT ON COLUMN "Sales".customer_photo.exif_checked_at IS '
+        "'Когда EXIF файла был прочитан (NULL — ещё не обработан, см. backfill_photo_exif)'"
+    )
+    # Backfill picks unprocessed photos by id.
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS idx_customer_photo_exif_pending ON "Sales".customer_photo (id) '
+        "WHERE exif_checked_at IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS "Sales".idx_customer_photo_exif_pending')
+    op.execute(
+        'ALTER TABLE "Sales".customer_photo '
+        "DROP COLUMN IF EXISTS exif_checked_at, "
+        "DROP COLUMN IF EXISTS exif_orientation, "
+        "DROP COLUMN IF EXISTS longitude, "
+        "DROP COLUMN IF EXISTS latitude"
+    )
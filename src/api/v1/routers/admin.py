@@ -0,0 +1,73 @@
+"""Служебные эндпоинты администратора: диагностика процесса API, схема БД, медленные запросы."""
+import os
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.api.v1.schemas.common import EntityModel
+from src.core.config import settings
+from src.core.deps import require_admin
+from src.core.schema_registry import SCHEMA, refresh_schema_capabilities
+from src.core.slow_queries import SLOW_QUERIES
+from src.core.startup_checks import STARTUP_REPORT
+from src.database.models import User
+
+router = APIRouter()
+
+
+@router.get("/admin/startup-checks", response_model=EntityModel)
+async def get_startup_checks(user: User = Depends(require_admin)):
+    """Результаты отложенных проверок при старте: max_connections, таблицы схемы, целостность."""
+    return STARTUP_REPORT.as_dict()
+
+
+@router.get("/admin/schema", response_model=EntityModel)
+async def get_schema_capabilities(user: User = Depends(require_admin)):
+    """Колонки схемы Sales, известные процессу (вместо запросов к information_schema)."""
+    return SCHEMA.as_dict()
+
+
+@router.post("/admin/schema/refresh", response_model=EntityModel)
+async def refresh_schema(user: User = Depends(require_admin)):
+    """Перечитать схему после миграции без перезапуска API.
+
+    Действует только на тот процесс (worker) API, который принял запрос: реестр схемы хранится
+    в памяти процесса. Остальные worker'ы и бот увидят новую схему после перезапуска, поэтому
+    после миграции на нескольких worker'ах надёжнее перезапустить сервис.
+    """
+    if not await refresh_schema_capabilities():
+        raise HTTPException(status_code=503, detail="Не удалось прочитать схему БД")
+    return {
+        "success": True,
+        "loaded_at": SCHEMA.as_dict()["loaded_at"],
+        "scope": "worker",
+        "worker_pid": os.getpid(),
+    }
+
+
+@router.get("/admin/slow-queries", response_model=EntityModel)
+async def list_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: Literal["total", "max", "count"] = Query("total"),
+    include_plans: bool = Query(False),
+    user: User = Depends(require_admin),
+):
+    """Топ медленных запросов этого процесса API по отпечатку (fingerprint)."""
+    items = [e.as_dict(include_plan=include_plans) for e in SLOW_QUERIES.top(limit, order_by)]
+    return {"threshold_ms": settings.slow_query_ms, "order_by": order_by, "items": items}
+
+
+@router.get("/admin/slow-queries/{fingerprint}", response_model=EntityModel)
+async def get_slow_query(fingerprint: str, user: User = Depends(require_admin)):
+    """Один отпечаток вместе с последним снятым планом EXPLAIN."""
+    entry = SLOW_QUERIES.get(fingerprint)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Отпечаток запроса не найден")
+    return entry.as_dict(include_plan=True)
+
+
+@router.delete("/admin/slow-queries", response_model=EntityModel)
+async def reset_slow_queries(user: User = Depends(require_admin)):
+    """Сбросить накопленную статистику (например, после добавления индекса)."""
+    SLOW_QUERIES.reset()
+    return {"success": True}
@@ -1,33 +1,40 @@
 """
-Фотографии клиентов и визитов (customer_photo). Загрузка в папку photo/, именование: КОД_ДДММГГГГ_ЧЧММСС.ext
+Фотографии клиентов и визитов (customer_photo). Хранилище photo/ (или S3),
+ключ: ab/cd/КОД_ДДММГГГГ_ЧЧММСС_xxxxxxxx.ext
 """
 import logging
-
-logger = logging.getLogger(__name__)
 import re
 import uuid
 from datetime import datetime
 from pathlib import Path
 
-import aiofiles
 from src.api.v1.schemas.common import EntityModel
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File, Form
+from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connection import get_db_session
 from src.database.models import CustomerPhoto, Customer, User
+from src.api.v1.services.photo_exif import schedule_exif
+from src.api.v1.services.photo_storage import PHOTO_STORAGE, new_photo_key, store_upload
+from src.api.v1.services.photo_thumbnails import (
+    DEFAULT_THUMBNAIL_SIZE,
+    THUMBNAIL_SIZES,
+    ensure_thumbnail,
+    remove_thumbnails,
+    schedule_thumbnails,
+)
 from src.core.config import settings
 from src.core.deps import get_current_user
+from src.core.file_delivery import NAMED_FILE_CACHE_CONTROL, send_file
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # ТЗ: /var/www/sales.zakharenkov.ru/html/photo — НЕ uploads!
-PROJECT_ROOT = Path(__file__).resolve().parents[4]
-UPLOAD_DIR = Path(settings.upload_dir or str(PROJECT_ROOT / "photo"))
-LEGACY_UPLOAD_DIR = PROJECT_ROOT / "uploads" / "customer_photos"
+UPLOAD_DIR = PHOTO_STORAGE.root
 SITE_URL = (settings.site_url or "").rstrip("/")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -50,10 +57,12 @@ def _photo_to_dict(p: CustomerPhoto, customer_name: str | None = None) -> dict:
         "uploaded_by": p.uploaded_by,
         "uploaded_at": p.uploaded_at.isoformat() if p.uploaded_at else None,
         "photo_datetime": p.photo_datetime.isoformat() if p.photo_datetime else None,
+        "latitude": float(p.latitude) if p.latitude is not None else None,
+        "longitude": float(p.longitude) if p.longitude is not None else None,
     }
-    # Прямая ссылка: http://sales.zakharenkov.ru/photo/33_11022026_143045.jpg
-    fname = (p.photo_path or "").split("/")[-1] or p.photo_path
-    d["photo_url"] = f"{SITE_URL}/photo/{fname}" if SITE_URL and fname else None
+    # Прямая ссылка: http://sales.zakharenkov.ru/photo/3f/a2/33_11022026_143045_1b2c3d4e.jpg
+    key = (p.photo_path or "").lstrip("/")
+    d["photo_url"] = f"{SITE_URL}/photo/{key}" if SITE_URL and key else None
     if customer_name is not None:
         d["customer_name"] = customer_name
     return d
@@ -86,20 +95,7 @@ def _parse_photo_datetime(s: str | None) -> "datetime | None":
         return None
 
 
-def _resolve_save_path(customer_id: int, ext: str) -> tuple[Path, str]:
-    """Уникальное имя: КОД_ДДММГГГГ_ЧЧММСС.ext в photo/ (ТЗ)."""
-    base = _make_photo_filename(customer_id)
-    name = f"{base}.{ext}"
-    path = UPLOAD_DIR / name
-    suffix = 0
-    while path.exists():
-        suffix += 1
-        name = f"{base}_{suffix}.{ext}"
-        path = UPLOAD_DIR / name
-    return path, name
-
-
-async def _save_photo(file: UploadFile, destination: Path) -> int:
+async def _save_photo(file: UploadFile, key: str) -> int:
     if file.content_type not in ALLOWED_CONTENT_TYPES:
         raise HTTPException(status_code=400, detail="Неверный тип файла. Разрешены: JPEG, PNG, WEBP")
 
@@ -107,14 +103,12 @@ async def _save_photo(file: UploadFile, destination: Path) -> int:
     if ext not in {".jpg", ".jpeg", ".png", ".webp"}:
         raise HTTPException(status_code=400, detail="Неверное расширение файла")
 
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=413, detail="Файл слишком большой. Максимум: 10MB")
-
-    destination.parent.mkdir(parents=True, exist_ok=True)
-    async with aiofiles.open(destination, "wb") as output:
-        await output.write(content)
-    return len(content)
+    stored = await store_upload(
+        file, PHOTO_STORAGE, key, max_size=MAX_FILE_SIZE, content_type=file.content_type
+    )
+    if stored.deduplicated:
+        logger.info("upload_photo: %s has the same content as an earlier upload, linked", key)
+    return stored.size
 
 
 def _auto_description(customer_id: int, filename: str) -> str:
@@ -139,9 +133,9 @@ async def upload_photo(
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(get_current_user),
 ):
-    """Загрузить фото клиента. Формат имени: КОД_ДДММГГГГ_ЧЧММСС.ext в photo/."""
+    """Загрузить фото клиента. Ключ: ab/cd/КОД_ДДММГГГГ_ЧЧММСС_xxxxxxxx.ext."""
     logger.info("upload_photo: customer_id=%s, filename=%s, user=%s", customer_id, file.filename, getattr(user, "login", ""))
-    full_path: Path | None = None
+    key: str | None = None
     try:
         result = await session.execute(select(Customer).where(Customer.id == customer_id))
         if not result.scalar_one_or_none():
@@ -153,17 +147,17 @@ async def upload_photo(
         if ext not in ALLOWED_EXTENSIONS:
             raise HTTPException(status_code=400, detail=f"Разрешены: {', '.join(ALLOWED_EXTENSIONS)}")
 
-        full_path, filename = _resolve_save_path(customer_id, ext)
-        logger.info("upload_photo: saving to %s", full_path)
-        file_size = await _save_photo(file, full_path)
+        key = new_photo_key(_make_photo_filename(customer_id), ext)
+        logger.info("upload_photo: saving to %s", key)
+        file_size = await _save_photo(file, key)
 
         row = (await session.execute(text("SELECT md5(random()::text) AS t"))).fetchone()
         download_token = row[0] if row else str(uuid.uuid4()).replace("-", "")
         now = datetime.now()
-        desc = _auto_description(customer_id, filename)
+        desc = _auto_description(customer_id, Path(key).name)
         photo = CustomerPhoto(
             customer_id=customer_id,
-            photo_path=filename,
+            photo_path=key,
             original_filename=_safe_filename(file.filename),
             file_size=file_size,
             mime_type=file.content_type or f"image/{ext}",
@@ -176,20 +170,17 @@ async def upload_photo(
         session.add(photo)
         await session.commit()
         await session.refresh(photo)
+        schedule_thumbnails(PHOTO_STORAGE, key)
+        # Время съёмки и GPS из EXIF дописываются в фоне; до этого photo_datetime = время загрузки
+        schedule_exif(photo.id, PHOTO_STORAGE, key)
         return _photo_to_dict(photo)
     except HTTPException:
-        if full_path and full_path.exists():
-            try:
-                full_path.unlink()
-            except OSError:
-                logger.warning("upload_photo: failed to cleanup file %s", full_path)
+        if key:
+            await PHOTO_STORAGE.delete(key)
         raise
     except Exception as e:
-        if full_path and full_path.exists():
-            try:
-                full_path.unlink()
-            except OSError:
-                logger.warning("upload_photo: failed to cleanup file %s", full_path)
+        if key:
+            await PHOTO_STORAGE.delete(key)
         logger.exception("upload_photo: %s", e)
         raise HTTPException(status_code=500, detail=str(e)[:200])
 
@@ -250,18 +241,21 @@ async def get_photo(
     return _photo_to_dict(photo, customer_name=customer_name)
 
 
-def _resolve_photo_path(photo_path: str) -> Path:
-    """Ищем в photo/ или legacy uploads/customer_photos/"""
-    name = (photo_path or "").strip().lstrip("/").split("/")[-1] or photo_path
-    path = UPLOAD_DIR / name
-    if not path.exists() and re.match(r"^\d+\.[a-z]+$", name.lower()) and LEGACY_UPLOAD_DIR.exists():
-        path = LEGACY_UPLOAD_DIR / name
-    return path
+async def _photo_file_response(request: Request, photo: CustomerPhoto, **kwargs):
+    """Локальный файл — через send_file, объект в S3 — редирект на подписанную ссылку."""
+    path = PHOTO_STORAGE.local_path(photo.photo_path)
+    if path is not None:
+        media_type = photo.mime_type or "image/jpeg"
+        return send_file(request, PHOTO_STORAGE.root, path, media_type=media_type, **kwargs)
+    if PHOTO_STORAGE.remote and await PHOTO_STORAGE.exists(photo.photo_path):
+        return RedirectResponse(await PHOTO_STORAGE.remote_url(photo.photo_path), status_code=307)
+    raise HTTPException(status_code=404, detail="File not found")
 
 
 @router.get("/photos/download/{download_token}", response_model=None)
 async def download_photo(
     download_token: str,
+    request: Request,
     session: AsyncSession = Depends(get_db_session),
 ):
     """Скачать/просмотреть фото по токену (без авторизации для просмотра по ссылке)."""
@@ -269,26 +263,47 @@ async def download_photo(
     photo = result.scalar_one_or_none()
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
-    path = _resolve_photo_path(photo.photo_path)
-    if not path.exists():
-        raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(path, media_type=photo.mime_type or "image/jpeg", filename=photo.original_filename or f"photo_{photo.id}.jpg")
+    filename = photo.original_filename or f"photo_{photo.id}.jpg"
+    return await _photo_file_response(request, photo, filename=filename)
 
 
 @router.get("/photos/thumbnail/{download_token}", response_model=None)
 async def thumbnail_photo(
     download_token: str,
+    request: Request,
+    size: int = Query(
+        DEFAULT_THUMBNAIL_SIZE,
+        description=f"Сторона рамки, px: {', '.join(map(str, THUMBNAIL_SIZES))}",
+    ),
     session: AsyncSession = Depends(get_db_session),
 ):
-    """Миниатюра 150x150 (пока отдаём тот же файл; при необходимости можно добавить PIL)."""
+    """Миниатюра (WebP) в рамке size x size.
+
+    Генерируется при первом запросе и кешируется в photo/thumbs/.
+    """
+    if size not in THUMBNAIL_SIZES:
+        raise HTTPException(
+            status_code=400, detail=f"Размер миниатюры: {', '.join(map(str, THUMBNAIL_SIZES))}"
+        )
     result = await session.execute(select(CustomerPhoto).where(CustomerPhoto.download_token == download_token))
     photo = result.scalar_one_or_none()
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
-    path = _resolve_photo_path(photo.photo_path)
-    if not path.exists():
-        raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(path, media_type=photo.mime_type or "image/jpeg")
+    try:
+        thumb = await ensure_thumbnail(PHOTO_STORAGE, photo.photo_path, size)
+    except Exception as e:
+        # Нет файла, битый или нераспознанный файл — отдаём оригинал, как раньше
+        logger.warning("thumbnail_photo: cannot render %s: %s", photo.photo_path, e)
+        return await _photo_file_response(request, photo)
+    # URL по токену не меняется при замене оригинала: кешируем на сутки, затем сверяем ETag
+    return send_file(
+        request,
+        PHOTO_STORAGE.root,
+        thumb.path,
+        media_type=thumb.media_type,
+        etag=thumb.etag,
+        cache_control=NAMED_FILE_CACHE_CONTROL,
+    )
 
 
 class PhotoUpdate(BaseModel):
@@ -333,12 +348,8 @@ async def delete_photo(
     photo = result.scalar_one_or_none()
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
-    path = _resolve_photo_path(photo.photo_path)
-    if path.exists():
-        try:
-            path.unlink()
-        except OSError:
-            pass
+    await PHOTO_STORAGE.delete(photo.photo_path)
+    remove_thumbnails(PHOTO_STORAGE.root, photo.photo_path)
     await session.delete(photo)
     await session.commit()
 
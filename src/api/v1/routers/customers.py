@@ -1,16 +1,13 @@
 """
 Клиенты (customers). Новая структура: id SERIAL PRIMARY KEY, остальные поля TEXT/VARCHAR.
 """
-import csv
 import io
 from datetime import date, time
-from decimal import Decimal
 from src.api.v1.schemas.common import EntityModel
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from fastapi.responses import Response
-from openpyxl import Workbook
 from pydantic import BaseModel
-from sqlalchemy import select, text
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connection import get_db_session
@@ -19,6 +16,8 @@ from src.core.deps import get_current_user, require_admin
 from src.core.exceptions import ForbiddenError, NotFoundError
 from src.core.pagination import PaginatedResponse, PaginationParams
 from src.core.sql import escape_like
+from src.api.v1.services.customer_import import CustomerImportService
+from src.api.v1.services.customer_search import CustomerSearchService
 from src.api.v1.services.customer_service import CustomerService
 
 router = APIRouter()
@@ -178,7 +177,7 @@ async def list_customers(
 ):
     """Список клиентов с фильтрами по параметрам поиска."""
     service = CustomerService(session)
-    data, total = await service.list_customers(
+    return await service.list_customers(
         pagination,
         customer_id=customer_id,
         search=search,
@@ -190,7 +189,29 @@ async def list_customers(
         phone=phone,
         tax_id=tax_id,
     )
-    return PaginatedResponse.create(data=data, total=total, pagination=pagination)
+
+
+@router.get("/customers/search", response_model=EntityModel)
+async def search_customers(
+    q: str = Query(
+        ...,
+        min_length=2,
+        max_length=100,
+        description="Название, фирма, ИНН, телефон или номер счёта",
+    ),
+    limit: int = Query(10, ge=1, le=50),
+    session: AsyncSession = Depends(get_db_session),
+    user: User = Depends(get_current_user),
+):
+    """Быстрый поиск клиента для автодополнения: ранжирование по совпадению.
+
+    Кириллица и латиница равнозначны. Цифровой запрос ищет по началу ИНН и по вхождению
+    в телефон / номер счёта. Клиенты текущего агента выше остальных при равном совпадении.
+    """
+    data = await CustomerSearchService(session).search(q, limit=limit, user_login=user.login)
+    return {"data": data, "q": q}
+
+
 @router.get("/customers/export", response_model=None)
 async def export_customers_excel(
     session: AsyncSession = Depends(get_db_session),
@@ -208,6 +229,7 @@ async def export_customers_excel(
              ORDER BY c.id LIMIT 50000"""
     result = await session.execute(text(sql))
     rows = result.fetchall()
+    from openpyxl import Workbook
     wb = Workbook()
     ws = wb.active
     ws.title = "Клиенты"
@@ -232,122 +254,23 @@ async def export_customers_excel(
     )
 
 
-def _parse_float(s: str | None):
-    if not s or not s.strip():
-        return None
-    try:
-        return float(s.strip().replace(",", "."))
-    except ValueError:
-        return None
-
-
-def _normalize_coordinate(value: float | None, *, field: str) -> float | None:
-    if value is None:
-        return None
-    if field == "latitude" and not (-90 <= value <= 90):
-        return None
-    if field == "longitude" and not (-180 <= value <= 180):
-        return None
-    return value
-
-
 @router.post("/customers/import", response_model=EntityModel | list[EntityModel])
 async def import_customers_csv(
     file: UploadFile = File(..., description="CSV файл (разделитель ;), структура как в выгрузке"),
+    dry_run: bool = Query(
+        False, description="Только проверить файл и вернуть отчёт, ничего не сохраняя"
+    ),
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(require_admin),
 ):
-    """Загрузка клиентов из CSV. Только admin. Формат: как у export (id;name_client;...)."""
+    """Загрузка клиентов из CSV. Только admin. Формат: как у export (id;name_client;...).
+
+    Строки с существующим id обновляются, остальные создаются. Строки с ошибками (id, координаты,
+    город, территория, логины) пропускаются и перечислены в отчёте с номером строки файла.
+    """
     if not file.filename or not (file.filename.lower().endswith(".csv") or file.filename.lower().endswith(".txt")):
         raise HTTPException(status_code=400, detail="Нужен файл .csv или .txt")
-    content = await file.read()
-    try:
-        text_content = content.decode("utf-8-sig") or content.decode("utf-8")
-    except Exception:
-        raise HTTPException(status_code=400, detail="Неверная кодировка файла (нужен UTF-8)")
-    buf = io.StringIO(text_content)
-    reader = csv.reader(buf, delimiter=";")
-    rows = list(reader)
-    if not rows:
-        return {"message": "Файл пуст", "created": 0, "updated": 0}
-    header = rows[0]
-    if header and header[0] == "id" and "name_client" in (h.strip().lower() for h in header):
-        data_rows = rows[1:]
-    else:
-        data_rows = rows
-    created = 0
-    updated = 0
-    col_count = len(EXPORT_COLUMNS)
-    for row in data_rows:
-        if not row or len(row) < 2:
-            continue
-        values = (row + [""] * col_count)[:col_count]
-        row_id = values[0].strip() if values[0] else ""
-        try:
-            pk = int(row_id) if row_id.isdigit() else None
-        except ValueError:
-            pk = None
-        lat = _normalize_coordinate(_parse_float(values[14]), field="latitude")
-        lon = _normalize_coordinate(_parse_float(values[15]), field="longitude")
-        def _v(i):
-            x = values[i] if i < len(values) else ""
-            return x.strip() if x else None
-        if pk:
-            result = await session.execute(select(Customer).where(Customer.id == pk))
-            existing = result.scalar_one_or_none()
-            if existing:
-                existing.name_client = _v(1) or existing.name_client
-                existing.firm_name = _v(2) or existing.firm_name
-                existing.category_client = _v(3)
-                existing.address = _v(4)
-                existing.city = _v(5)
-                existing.territory = _v(6)
-                existing.landmark = _v(7)
-                existing.phone = _v(8)
-                existing.contact_person = _v(9)
-                existing.tax_id = _v(10)
-                existing.status = _v(11) or existing.status
-                existing.login_agent = _v(12)
-                existing.login_expeditor = _v(13)
-                existing.latitude = Decimal(str(lat)) if lat is not None else existing.latitude
-                existing.longitude = Decimal(str(lon)) if lon is not None else existing.longitude
-                existing.PINFL = _v(16)
-                existing.contract_no = _v(17)
-                existing.account_no = _v(18)
-                existing.bank = _v(19)
-                existing.MFO = _v(20)
-                existing.OKED = _v(21)
-                existing.VAT_code = _v(22)
-                updated += 1
-                continue
-        c = Customer(
-            name_client=_v(1),
-            firm_name=_v(2),
-            category_client=_v(3),
-            address=_v(4),
-            city=_v(5),
-            territory=_v(6),
-            landmark=_v(7),
-            phone=_v(8),
-            contact_person=_v(9),
-            tax_id=_v(10),
-            status=_v(11) or "Активный",
-            login_agent=_v(12),
-            login_expeditor=_v(13),
-            latitude=Decimal(str(lat)) if lat is not None else None,
-            longitude=Decimal(str(lon)) if lon is not None else None,
-            PINFL=_v(16),
-            contract_no=_v(17),
-            account_no=_v(18),
-            bank=_v(19),
-            MFO=_v(20),
-            OKED=_v(21),
-            VAT_code=_v(22),
-        )
-        session.add(c)
-        created += 1
-    await session.commit()
-    return {"message": "Импорт выполнен", "created": created, "updated": updated}
+    return await CustomerImportService(session).import_csv(file.file, dry_run=dry_run)
 
 
 @router.post("/customers", response_model=EntityModel | list[EntityModel])
@@ -6,7 +6,6 @@ import re
 from datetime import datetime
 from pathlib import Path
 
-import aiofiles
 from src.api.v1.schemas.common import EntityModel
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from pydantic import BaseModel
@@ -15,38 +14,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connection import get_db_session
 from src.database.models import Product, ProductType, Warehouse, PaymentType, User, Currency
-from src.core.config import settings
 from src.core.deps import get_current_user, require_admin
+from src.core.http_cache import ConditionalGet, conditional_get
+from src.core.schema_registry import has_column
+from src.api.v1.services.photo_storage import PHOTO_STORAGE, new_photo_key, store_upload
 from src.api.v1.services.translation_service import TranslationService
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-PROJECT_ROOT = Path(__file__).resolve().parents[4]
-UPLOAD_DIR = Path(settings.upload_dir or str(PROJECT_ROOT / "photo"))
+UPLOAD_DIR = PHOTO_STORAGE.root
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 ALLOWED_IMAGE_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp"}
 ALLOWED_IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "webp"}
 MAX_IMAGE_SIZE = 10 * 1024 * 1024
 
 
-async def _has_column(session: AsyncSession, table_name: str, column_name: str) -> bool:
-    result = await session.execute(
-        text(
-            """
-            SELECT 1
-            FROM information_schema.columns
-            WHERE table_schema = 'Sales'
-              AND table_name = :table_name
-              AND column_name = :column_name
-            LIMIT 1
-            """
-        ),
-        {"table_name": table_name, "column_name": column_name},
-    )
-    return result.first() is not None
-
-
 def _safe_product_code(code: str) -> str:
     return re.sub(r"[^\w\-]", "_", (code or "").strip())[:100] or "product"
 
@@ -54,23 +37,15 @@ def _safe_product_code(code: str) -> str:
 def _product_photo_url(photo_path: str | None) -> str | None:
     if not photo_path:
         return None
-    return f"/photo/{photo_path.split('/')[-1]}"
+    return f"/photo/{photo_path.lstrip('/')}"
 
 
-def _resolve_product_photo_path(code: str, ext: str) -> tuple[Path, str]:
+def _new_product_photo_key(code: str, ext: str) -> str:
     stamp = datetime.now().strftime("%d%m%Y_%H%M%S")
-    base = f"product_{_safe_product_code(code)}_{stamp}"
-    filename = f"{base}.{ext}"
-    path = UPLOAD_DIR / filename
-    suffix = 0
-    while path.exists():
-        suffix += 1
-        filename = f"{base}_{suffix}.{ext}"
-        path = UPLOAD_DIR / filename
-    return path, filename
-
-
-async def _save_uploaded_image(file: UploadFile, destination: Path) -> int:
+    return new_photo_key(f"product_{_safe_product_code(code)}_{stamp}", ext)
+
+
+async def _save_uploaded_image(file: UploadFile, key: str) -> int:
     if file.content_type not in ALLOWED_IMAGE_CONTENT_TYPES:
         raise HTTPException(status_code=400, detail="Разрешены только JPG, PNG и WEBP")
 
@@ -78,25 +53,16 @@ async def _save_uploaded_image(file: UploadFile, destination: Path) -> int:
     if ext not in ALLOWED_IMAGE_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Неверное расширение файла")
 
-    content = await file.read()
-    if len(content) > MAX_IMAGE_SIZE:
-        raise HTTPException(status_code=413, detail="Файл слишком большой. Максимум: 10MB")
-
-    destination.parent.mkdir(parents=True, exist_ok=True)
-    async with aiofiles.open(destination, "wb") as out:
-        await out.write(content)
-    return len(content)
+    stored = await store_upload(
+        file, PHOTO_STORAGE, key, max_size=MAX_IMAGE_SIZE, content_type=file.content_type
+    )
+    return stored.size
 
 
-def _delete_product_photo_file(photo_path: str | None) -> None:
+async def _delete_product_photo_file(photo_path: str | None) -> None:
     if not photo_path:
         return
-    path = UPLOAD_DIR / Path(photo_path).name
-    if path.exists():
-        try:
-            path.unlink()
-        except OSError:
-            logger.warning("Failed to delete product photo file: %s", path)
+    await PHOTO_STORAGE.delete(photo_path)
 
 
 @router.get("/user-logins", response_model=EntityModel | list[EntityModel])
@@ -117,8 +83,11 @@ async def list_products(
     type_id: str | None = Query(None, description="Тип: Yogurt, Tvorog, Tara"),
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(get_current_user),
+    cache: ConditionalGet = Depends(conditional_get("product")),
 ):
     """Список товаров. Требуется авторизация. Сортировка по коду: числовая (1,2,...,10,11), затем текстовая."""
+    if cache.not_modified:
+        return cache.not_modified_response()
     q = select(Product).where(Product.active == True)
     if type_id:
         q = q.where(Product.type_id == type_id)
@@ -169,8 +138,11 @@ async def get_next_product_code(
 async def list_product_types(
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(get_current_user),
+    cache: ConditionalGet = Depends(conditional_get("product_type")),
 ):
     """Типы продукции (Yogurt, Tvorog, Tara)."""
+    if cache.not_modified:
+        return cache.not_modified_response()
     result = await session.execute(select(ProductType).order_by(ProductType.name))
     types = result.scalars().all()
     return [{"name": t.name, "description": t.description} for t in types]
@@ -246,8 +218,11 @@ async def list_payment_types(
     language: str | None = Query(None),
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(get_current_user),
+    cache: ConditionalGet = Depends(conditional_get("payment_type", "translations")),
 ):
     """Payment types list."""
+    if cache.not_modified:
+        return cache.not_modified_response()
     result = await session.execute(select(PaymentType).order_by(PaymentType.code))
     rows = result.scalars().all()
     translation_service = TranslationService(session)
@@ -335,8 +310,11 @@ async def delete_payment_type(
 async def list_currencies(
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(get_current_user),
+    cache: ConditionalGet = Depends(conditional_get("currency")),
 ):
     """Справочник валют: код, название, страна, символ, признак валюты по умолчанию."""
+    if cache.not_modified:
+        return cache.not_modified_response()
     result = await session.execute(select(Currency).order_by(Currency.code))
     rows = result.scalars().all()
     return [
@@ -444,8 +422,11 @@ async def delete_currency(
 async def list_warehouses(
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(get_current_user),
+    cache: ConditionalGet = Depends(conditional_get("warehouse")),
 ):
     """Список складов."""
+    if cache.not_modified:
+        return cache.not_modified_response()
     result = await session.execute(select(Warehouse).order_by(Warehouse.code))
     rows = result.scalars().all()
     return [
@@ -704,35 +685,29 @@ async def upload_product_photo(
     if ext not in ALLOWED_IMAGE_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Разрешены только JPG, PNG и WEBP")
 
-    full_path: Path | None = None
+    key: str | None = None
     old_photo_path = getattr(product, "photo_path", None)
     try:
-        full_path, filename = _resolve_product_photo_path(code, ext)
-        file_size = await _save_uploaded_image(file, full_path)
-        product.photo_path = filename
+        key = _new_product_photo_key(code, ext)
+        file_size = await _save_uploaded_image(file, key)
+        product.photo_path = key
         product.last_updated_by_login = user.login
         await session.commit()
-        _delete_product_photo_file(old_photo_path)
+        await _delete_product_photo_file(old_photo_path)
         return {
             "code": product.code,
-            "photo_path": filename,
-            "photo_url": _product_photo_url(filename),
+            "photo_path": key,
+            "photo_url": _product_photo_url(key),
             "file_size": file_size,
             "message": "photo_uploaded",
         }
     except HTTPException:
-        if full_path and full_path.exists():
-            try:
-                full_path.unlink()
-            except OSError:
-                logger.warning("Failed to cleanup product photo file: %s", full_path)
+        if key:
+            await PHOTO_STORAGE.delete(key)
         raise
     except Exception as exc:
-        if full_path and full_path.exists():
-            try:
-                full_path.unlink()
-            except OSError:
-                logger.warning("Failed to cleanup product photo file: %s", full_path)
+        if key:
+            await PHOTO_STORAGE.delete(key)
         logger.exception("upload_product_photo failed: %s", exc)
         raise HTTPException(status_code=500, detail="Ошибка загрузки фото")
 
@@ -754,7 +729,7 @@ async def delete_product_photo(
     product.photo_path = None
     product.last_updated_by_login = user.login
     await session.commit()
-    _delete_product_photo_file(old_photo_path)
+    await _delete_product_photo_file(old_photo_path)
     return {"code": code, "message": "photo_deleted"}
 
 
@@ -765,8 +740,11 @@ async def list_cities(
     active_only: bool = Query(True),
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(get_current_user),
+    cache: ConditionalGet = Depends(conditional_get("cities")),
 ):
-    has_region = await _has_column(session, "cities", "region")
+    if cache.not_modified:
+        return cache.not_modified_response()
+    has_region = await has_column(session, "cities", "region")
     if has_region:
         query = text(
             """
@@ -805,7 +783,7 @@ async def create_city(
     if not name:
         raise HTTPException(status_code=400, detail="City name is required")
 
-    has_region = await _has_column(session, "cities", "region")
+    has_region = await has_column(session, "cities", "region")
     if has_region:
         query = text(
             '''
@@ -842,7 +820,7 @@ async def update_city(
     if not name:
         raise HTTPException(status_code=400, detail="City name is required")
 
-    has_region = await _has_column(session, "cities", "region")
+    has_region = await has_column(session, "cities", "region")
     if has_region:
         query = text(
             '''
@@ -900,12 +878,15 @@ async def list_territories_by_city(
     active_only: bool = Query(True),
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(get_current_user),
+    cache: ConditionalGet = Depends(conditional_get("cities", "territories")),
 ):
+    if cache.not_modified:
+        return cache.not_modified_response()
     city = await session.execute(text('SELECT id FROM "Sales".cities WHERE id = :id'), {"id": city_id})
     if not city.first():
         raise HTTPException(status_code=404, detail="City not found")
 
-    has_city_id = await _has_column(session, "territories", "city_id")
+    has_city_id = await has_column(session, "territories", "city_id")
     if has_city_id:
         query = text(
             '''
@@ -944,8 +925,11 @@ async def list_territories(
     active_only: bool = Query(True),
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(get_current_user),
+    cache: ConditionalGet = Depends(conditional_get("territories")),
 ):
-    has_city_id = await _has_column(session, "territories", "city_id")
+    if cache.not_modified:
+        return cache.not_modified_response()
+    has_city_id = await has_column(session, "territories", "city_id")
     if has_city_id:
         query = text(
             '''
@@ -983,7 +967,7 @@ async def create_territory(
     if not name:
         raise HTTPException(status_code=400, detail="Territory name is required")
 
-    has_city_id = await _has_column(session, "territories", "city_id")
+    has_city_id = await has_column(session, "territories", "city_id")
     if body.city_id is not None and has_city_id:
         city = await session.execute(
             text('SELECT id FROM "Sales".cities WHERE id = :id AND COALESCE(is_active, TRUE) = TRUE'),
@@ -1030,7 +1014,7 @@ async def update_territory(
     if not name:
         raise HTTPException(status_code=400, detail="Territory name is required")
 
-    has_city_id = await _has_column(session, "territories", "city_id")
+    has_city_id = await has_column(session, "territories", "city_id")
     if body.city_id is not None and has_city_id:
         city = await session.execute(
             text('SELECT id FROM "Sales".cities WHERE id = :id AND COALESCE(is_active, TRUE) = TRUE'),
@@ -15,7 +15,6 @@ from fastapi.responses import Response
 from pydantic import BaseModel
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
-from openpyxl import Workbook
 
 from src.database.connection import get_db_session
 from src.core.deps import get_current_user
@@ -340,6 +339,7 @@ async def export_cash_received_excel(
         rows = r.fetchall()
     except Exception:
         rows = []
+    from openpyxl import Workbook
     wb = Workbook()
     ws = wb.active
     ws.title = "Принятые деньги"
@@ -414,6 +414,7 @@ async def export_orders_for_confirmation_excel(
         rows = r.fetchall()
     except Exception:
         rows = []
+    from openpyxl import Workbook
     wb = Workbook()
     ws = wb.active
     ws.title = "Заказы для подтверждения оплаты"
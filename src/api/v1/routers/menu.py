@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.connection import get_db_session
 from src.database.models import User
 from src.core.deps import get_current_user, require_admin
+from src.core.http_cache import ConditionalGet, conditional_get
 from src.api.v1.services.translation_service import TranslationService
 
 router = APIRouter()
@@ -19,7 +20,12 @@ async def get_menu(
     language: str | None = Query(None),
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(get_current_user),
+    cache: ConditionalGet = Depends(
+        conditional_get("menu_items", "role_menu_access", "translations", vary_role=True)
+    ),
 ):
+    if cache.not_modified:
+        return cache.not_modified_response()
     role = (user.role or "").strip().lower() or "agent"
     q = text("""SELECT mi.id, mi.code, mi.label, mi.icon, mi.url, mi.sort_order, rma.access_level
         FROM "Sales".menu_items mi JOIN "Sales".role_menu_access rma ON mi.id = rma.menu_item_id
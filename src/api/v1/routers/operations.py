@@ -7,7 +7,6 @@ from uuid import UUID
 from src.api.v1.schemas.common import EntityModel
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import Response
-from openpyxl import Workbook
 from pydantic import BaseModel, field_validator
 from sqlalchemy import select, text, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -17,7 +16,9 @@ from sqlalchemy.exc import IntegrityError
 from src.database.connection import get_db_session
 from src.database.models import Operation, Customer, Product, Order, OperationConfig, OperationType, Batch, Item, Status, Warehouse
 from src.core.deps import get_current_user, require_admin
+from src.core.http_cache import ConditionalGet, conditional_get
 from src.core.pagination import PaginatedResponse, PaginationParams
+from src.core.schema_registry import has_column
 from src.database.models import User
 from src.api.v1.services.operation_service import OperationService
 from src.api.v1.services.translation_service import TranslationService
@@ -65,19 +66,7 @@ async def _ensure_user_can_create_operation_type(
     user: User,
     operation_type: str,
 ) -> str:
-    col_result = await session.execute(
-        text(
-            """
-            SELECT 1
-            FROM information_schema.columns
-            WHERE table_schema = 'Sales'
-              AND table_name = 'operation_types'
-              AND column_name = 'executor_role'
-            LIMIT 1
-            """
-        )
-    )
-    has_executor_role = col_result.scalar_one_or_none() is not None
+    has_executor_role = await _has_executor_role_column(session)
 
     if has_executor_role:
         op_type_result = await session.execute(
@@ -379,22 +368,15 @@ async def list_operation_types(
     language: str | None = Query(None),
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(get_current_user),
+    cache: ConditionalGet = Depends(
+        conditional_get("operation_types", "operation_config", "translations")
+    ),
 ):
     """Ð¢Ð¸Ð¿Ñ‹ Ð¾Ð¿ÐµÑ€Ð°Ñ†Ð¸Ð¹: Ð¿Ñ€Ð¸Ñ…Ð¾Ð´, Ñ€Ð°ÑÑ…Ð¾Ð´, Ð¿Ñ€Ð¾Ð´Ð°Ð¶Ð°, Ð²Ð¾Ð·Ð²Ñ€Ð°Ñ‚ Ð¸ Ñ‚.Ð´. (code PK) + Ð°ÐºÑ‚Ð¸Ð²Ð½Ð¾ÑÑ‚ÑŒ Ð¸Ð· operation_config.
     active=True Ñ‚Ð¾Ð»ÑŒÐºÐ¾ ÐµÑÐ»Ð¸ ÐµÑÑ‚ÑŒ operation_config Ð¸ oc.active=TRUE. has_config=True ÐµÑÐ»Ð¸ ÐºÐ¾Ð½Ñ„Ð¸Ð³ ÐµÑÑ‚ÑŒ (Ð´Ð»Ñ ÑÐ¾Ð·Ð´Ð°Ð½Ð¸Ñ Ð¾Ð¿ÐµÑ€Ð°Ñ†Ð¸Ð¸)."""
-    col_result = await session.execute(
-        text(
-            """
-            SELECT 1
-            FROM information_schema.columns
-            WHERE table_schema = 'Sales'
-              AND table_name = 'operation_types'
-              AND column_name = 'executor_role'
-            LIMIT 1
-            """
-        )
-    )
-    has_executor_role = col_result.scalar_one_or_none() is not None
+    if cache.not_modified:
+        return cache.not_modified_response()
+    has_executor_role = await _has_executor_role_column(session)
 
     result = await session.execute(
         text(
@@ -430,19 +412,7 @@ async def list_operation_types(
 
 
 async def _has_executor_role_column(session: AsyncSession) -> bool:
-    col_result = await session.execute(
-        text(
-            """
-            SELECT 1
-            FROM information_schema.columns
-            WHERE table_schema = 'Sales'
-              AND table_name = 'operation_types'
-              AND column_name = 'executor_role'
-            LIMIT 1
-            """
-        )
-    )
-    return col_result.scalar_one_or_none() is not None
+    return await has_column(session, "operation_types", "executor_role")
 
 
 class OperationTypeCreate(BaseModel):
@@ -593,7 +563,7 @@ async def list_operations(
     user: User = Depends(get_current_user),
 ):
     """Ð¡Ð¿Ð¸ÑÐ¾Ðº Ð¾Ð¿ÐµÑ€Ð°Ñ†Ð¸Ð¹ Ñ Ñ„Ð¸Ð»ÑŒÑ‚Ñ€Ð°Ð¼Ð¸."""
-    data, total = await OperationService(session).list_operations(
+    return await OperationService(session).list_operations(
         pagination,
         type_code=type_code,
         customer_id=customer_id,
@@ -603,7 +573,6 @@ async def list_operations(
         to_date=to_date,
         created_by=created_by,
     )
-    return PaginatedResponse.create(data=data, total=total, pagination=pagination)
 @router.get("/operations/export", response_model=None)
 async def export_operations_excel(
     session: AsyncSession = Depends(get_db_session),
@@ -623,6 +592,7 @@ async def export_operations_excel(
         c_result = await session.execute(select(Customer.id, Customer.name_client, Customer.firm_name).where(Customer.id.in_(customer_ids)))
         for r in c_result.all():
             customer_names[r[0]] = (r[1] or r[2] or "")
+    from openpyxl import Workbook
     wb = Workbook()
     ws = wb.active
     ws.title = "ÐžÐ¿ÐµÑ€Ð°Ñ†Ð¸Ð¸"
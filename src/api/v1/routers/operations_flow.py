@@ -14,8 +14,9 @@ from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connection import get_db_session
-from src.database.models import Operation, Batch, Customer, Product, Order, User
+from src.database.models import Operation, Batch, Customer, User
 from src.core.deps import get_current_user
+from src.api.v1.services.reference_data import REFERENCE_DATA
 from src.core.exceptions import DatabaseError, ValidationError
 
 router = APIRouter()
@@ -120,16 +121,15 @@ class CashReturnDT(BaseModel):
 
 # ─── Валидации справочников (ТЗ-VAL-004) ──────────────────────────────────
 
+# Справочники берутся из REFERENCE_DATA (память процесса), без запроса на каждую строку операции.
+
 async def validate_warehouse(session: AsyncSession, code: str) -> bool:
-    r = await session.execute(text('SELECT 1 FROM "Sales".warehouse WHERE code = :c'), {"c": code})
-    return r.scalar() is not None
+    return code in await REFERENCE_DATA.warehouses(session)
 
 
 async def validate_product(session: AsyncSession, code: str) -> bool:
-    r = await session.execute(
-        text('SELECT 1 FROM "Sales".product WHERE code = :c AND active = TRUE'), {"c": code}
-    )
-    return r.scalar() is not None
+    product = (await REFERENCE_DATA.products(session)).get(code)
+    return product is not None and product.active
 
 
 async def validate_customer(session: AsyncSession, customer_id: int) -> bool:
@@ -138,16 +138,12 @@ async def validate_customer(session: AsyncSession, customer_id: int) -> bool:
 
 
 async def validate_user_role(session: AsyncSession, login: str, allowed_roles: list[str]) -> bool:
-    r = await session.execute(select(User).where(User.login == login))
-    u = r.scalar_one_or_none()
-    if not u:
-        return False
-    return (u.role or "").lower() in [r.lower() for r in allowed_roles]
+    role = (await REFERENCE_DATA.user_roles(session)).get(login)
+    return role is not None and role.lower() in [r.lower() for r in allowed_roles]
 
 
 async def validate_payment_type(session: AsyncSession, code: str) -> bool:
-    r = await session.execute(text('SELECT 1 FROM "Sales".payment_type WHERE code = :c'), {"c": code})
-    return r.scalar() is not None
+    return code in await REFERENCE_DATA.payment_types(session)
 
 
 # ─── Бизнес-правила (ТЗ-BIZ) ──────────────────────────────────────────────
@@ -528,8 +524,7 @@ async def post_delivery(
     """Доставка клиенту. ТЗ-ALG-003."""
     if not await validate_warehouse(session, dt.warehouse_from):
         raise error_400("INVALID_WAREHOUSE", "Склад не найден", {"warehouse_from": dt.warehouse_from})
-    prod_result = await session.execute(select(Product).where(Product.code == dt.product_code))
-    product = prod_result.scalar_one_or_none()
+    product = (await REFERENCE_DATA.products(session)).get(dt.product_code)
     if not product:
         raise error_400("INVALID_PRODUCT", "Товар не найден", {"product_code": dt.product_code})
     if not await validate_customer(session, dt.customer_id):
@@ -640,8 +635,7 @@ async def post_write_off(
 
     amount_to_use = dt.amount
     if amount_to_use is None or amount_to_use <= 0:
-        prod_result = await session.execute(select(Product).where(Product.code == dt.product_code))
-        product = prod_result.scalar_one_or_none()
+        product = (await REFERENCE_DATA.products(session)).get(dt.product_code)
         price = float(product.price) if product and product.price is not None else 0
         amount_to_use = Decimal(str(price)) * dt.quantity
 
@@ -7,22 +7,36 @@ from uuid import UUID
 from src.api.v1.schemas.common import EntityModel
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import Response
-from openpyxl import Workbook
-from pydantic import BaseModel
-from sqlalchemy import select, func, or_, text
+from pydantic import BaseModel, Field
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connection import get_db_session
-from src.database.models import Order, Item, Customer, Product, Status, PaymentType, User as UserModel, Warehouse, Batch, Operation
+from src.database.models import Order, Item, Customer, Product, Status, User as UserModel, Warehouse, Batch, Operation
 from src.core.deps import get_current_user, require_admin
 from src.core.notifications import (
     notify_new_order,
     notify_order_status_changed,
     schedule_notification,
 )
-from src.core.pagination import PaginatedResponse, PaginationParams
-from src.core.sql import escape_like
+from src.core.pagination import (
+    PaginatedResponse,
+    PaginationParams,
+    SortKey,
+    count_total,
+    paginate_keyset,
+    split_page,
+)
 from src.database.models import User
+from src.api.v1.services.order_query import (
+    ITEM_AMOUNT,
+    ORDER_AMOUNT,
+    OrderFilters,
+    order_items_query,
+    orders_query,
+    totals_query,
+    with_window_totals,
+)
 from src.api.v1.services.order_service import OrderService
 from src.api.v1.services.translation_service import TranslationService
 
@@ -33,20 +47,6 @@ def _now_utc():
     return datetime.now(timezone.utc)
 
 
-def _parse_optional_datetime(s: str | None):
-    """Parse ISO date/datetime string to timezone-aware datetime or None."""
-    if not s or not s.strip():
-        return None
-    raw = s.strip().replace("Z", "+00:00")
-    try:
-        dt = datetime.fromisoformat(raw)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt
-    except (ValueError, TypeError):
-        return None
-
-
 async def _is_delivery_status(session: AsyncSession, status_code: str | None) -> bool:
     """Check if status means 'delivery' by code or status name."""
     if status_code is None:
@@ -237,6 +237,26 @@ class ItemUpdate(BaseModel):
     price: float | None = None
 
 
+class OrderFullCreate(OrderCreate):
+    items: list[ItemCreate] = Field(..., min_length=1, max_length=500)
+
+
+class ItemSet(ItemCreate):
+    id: UUID | None = None
+
+
+class ItemPatch(ItemUpdate):
+    id: UUID
+
+
+class OrderItemsBatch(BaseModel):
+    last_updated_at: str | None = None  # значение из GET /orders/{id}; при расхождении — 409
+    items: list[ItemSet] | None = Field(None, max_length=500)
+    add: list[ItemCreate] = Field(default_factory=list, max_length=500)
+    update: list[ItemPatch] = Field(default_factory=list, max_length=500)
+    delete: list[UUID] = Field(default_factory=list, max_length=500)
+
+
 @router.get("/orders/statuses", response_model=EntityModel | list[EntityModel])
 async def list_order_statuses(
     language: str | None = Query(None),
@@ -252,98 +272,50 @@ async def list_order_statuses(
     return [{"code": r[0], "name": translated.get(f"status.{r[0]}", (r[1] or r[0]))} for r in rows]
 
 
+# Sentinels keep the NULL placement (last for delivery, first for order_date) and match
+# idx_orders_list_keyset.
+ORDER_LIST_SORT = (
+    SortKey(Order.scheduled_delivery_at, descending=True, null_sentinel="'-infinity'::timestamptz"),
+    SortKey(Order.order_date, descending=True, null_sentinel="'infinity'::timestamptz"),
+    SortKey(Order.order_no, descending=True, nullable=False),
+)
+
+
 @router.get("/orders", response_model=PaginatedResponse[EntityModel])
 async def list_orders(
-    order_no: int | None = Query(None, description="Номер заказа"),
-    customer_id: int | None = Query(None, description="ID клиента"),
-    customer_name: str | None = Query(None, description="Поиск по названию клиента или фирмы"),
-    status_code: str | None = Query(None, description="Статус заказа"),
-    scheduled_delivery_from: str | None = Query(None, description="Дата поставки с (ISO дата)"),
-    scheduled_delivery_to: str | None = Query(None, description="Дата поставки по (ISO дата)"),
-    login_agent: str | None = Query(None, description="Логин агента"),
-    login_expeditor: str | None = Query(None, description="Логин экспедитора"),
-    last_updated_by: str | None = Query(None, description="Логин пользователя, выполнившего последнее изменение"),
+    filters: OrderFilters = Depends(),
     pagination: PaginationParams = Depends(),
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(get_current_user),
 ):
-    """Список заказов с фильтрами: клиент, статус, дата поставки, агент, экспедитор, кто изменил. Сортировка по дате поставки."""
-    q = (
-        select(Order, Customer, Status, PaymentType)
-        .outerjoin(Customer, Order.customer_id == Customer.id)
-        .outerjoin(Status, Order.status_code == Status.code)
-        .outerjoin(PaymentType, Order.payment_type_code == PaymentType.code)
-        .order_by(Order.scheduled_delivery_at.desc().nullslast(), Order.order_date.desc())
-    )
-    if order_no is not None:
-        q = q.where(Order.order_no == order_no)
-    if customer_id is not None:
-        q = q.where(Order.customer_id == customer_id)
-    if customer_name and customer_name.strip():
-        name = escape_like(customer_name.strip())
-        q = q.where(or_(
-            Customer.name_client.ilike(f"%{name}%", escape="\\"),
-            Customer.firm_name.ilike(f"%{name}%", escape="\\"),
-        ))
-    if status_code and status_code.strip():
-        q = q.where(Order.status_code == status_code.strip())
-    if scheduled_delivery_from:
-        dt_from = _parse_optional_datetime(scheduled_delivery_from)
-        if dt_from:
-            q = q.where(Order.scheduled_delivery_at >= dt_from)
-    if scheduled_delivery_to:
-        dt_to = _parse_optional_datetime(scheduled_delivery_to)
-        if dt_to:
-            q = q.where(Order.scheduled_delivery_at <= dt_to)
-    if login_agent and login_agent.strip():
-        q = q.where(Customer.login_agent == login_agent.strip())
-    if login_expeditor and login_expeditor.strip():
-        q = q.where(Customer.login_expeditor == login_expeditor.strip())
-    if last_updated_by and last_updated_by.strip():
-        q = q.where(Order.last_updated_by == last_updated_by.strip())
-
-    count_q = q.with_only_columns(func.count()).order_by(None)
-    total = int((await session.execute(count_q)).scalar() or 0)
-
-    # Подсчет общей суммы заказов (до получения данных)
-    sum_q = (
-        select(func.sum(func.coalesce(Order.total_amount, 0)))
-        .select_from(Order)
-        .outerjoin(Customer, Order.customer_id == Customer.id)
+    """Список заказов с фильтрами: клиент, статус, дата поставки, агент, экспедитор, кто изменил.
+
+    Сортировка по дате поставки. В режиме offset с count=exact страница, количество и сумма
+    приходят одним запросом (оконные функции).
+    """
+    q = orders_query(filters)
+    total_is_estimate = False
+    use_window = pagination.cursor is None and pagination.count == "exact"
+    page_q = with_window_totals(q, ORDER_AMOUNT) if use_window else q
+    result = await session.execute(paginate_keyset(page_q, ORDER_LIST_SORT, pagination))
+    rows, has_more, next_cursor = split_page(
+        result.all(),
+        pagination,
+        lambda row: (row[0].scheduled_delivery_at, row[0].order_date, row[0].order_no),
     )
-    # Применяем те же фильтры
-    if customer_id is not None:
-        sum_q = sum_q.where(Order.customer_id == customer_id)
-    if customer_name and customer_name.strip():
-        name = escape_like(customer_name.strip())
-        sum_q = sum_q.where(or_(
-            Customer.name_client.ilike(f"%{name}%", escape="\\"),
-            Customer.firm_name.ilike(f"%{name}%", escape="\\"),
-        ))
-    if status_code and status_code.strip():
-        sum_q = sum_q.where(Order.status_code == status_code.strip())
-    if scheduled_delivery_from:
-        dt_from = _parse_optional_datetime(scheduled_delivery_from)
-        if dt_from:
-            sum_q = sum_q.where(Order.scheduled_delivery_at >= dt_from)
-    if scheduled_delivery_to:
-        dt_to = _parse_optional_datetime(scheduled_delivery_to)
-        if dt_to:
-            sum_q = sum_q.where(Order.scheduled_delivery_at <= dt_to)
-    if login_agent and login_agent.strip():
-        sum_q = sum_q.where(Customer.login_agent == login_agent.strip())
-    if login_expeditor and login_expeditor.strip():
-        sum_q = sum_q.where(Customer.login_expeditor == login_expeditor.strip())
-    if last_updated_by and last_updated_by.strip():
-        sum_q = sum_q.where(Order.last_updated_by == last_updated_by.strip())
-    
-    total_amount_result = await session.execute(sum_q)
-    total_amount_all = float(total_amount_result.scalar() or 0)
+    if use_window and rows:
+        total, total_amount_all = int(rows[0][4]), float(rows[0][5] or 0)
+    elif pagination.count == "exact":
+        # Пустая страница (offset за концом) или cursor-режим: оконных итогов нет,
+        # один агрегатный запрос.
+        count_value, amount_value = (await session.execute(totals_query(q, ORDER_AMOUNT))).one()
+        total, total_amount_all = int(count_value or 0), float(amount_value or 0)
+    else:
+        total, total_is_estimate = await count_total(session, q, pagination)
+        total_amount_all = None
 
-    result = await session.execute(q.offset(pagination.offset).limit(pagination.limit))
-    rows = result.all()
     out = []
-    for o, cust, st, pt in rows:
+    for o, cust, st, pt, *_window in rows:
         out.append({
             "id": o.order_no,
             "order_no": o.order_no,
@@ -365,10 +337,19 @@ async def list_orders(
             "last_updated_by": o.last_updated_by,
         })
     
-    payload = PaginatedResponse.create(data=out, total=total, pagination=pagination)
+    payload = PaginatedResponse.create(
+        data=out,
+        total=total,
+        pagination=pagination,
+        has_more=has_more,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
+    )
     return {**payload.model_dump(), "total_amount": total_amount_all}
 
 
+EXPORT_MAX_ROWS = 50000
+
 ORDERS_EXPORT_HEADERS_RU = [
     "№", "Клиент", "ID клиента", "Дата создания", "Статус", "Тип оплаты", "Агент", "Экспедитор",
     "Назначенная дата поставки", "Дата перевода в доставку", "Дата закрытия",
@@ -400,19 +381,22 @@ ORDERS_ITEMS_EXPORT_HEADERS_RU = [
 
 @router.get("/orders/export", response_model=None)
 async def export_orders_excel(
+    filters: OrderFilters = Depends(),
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(require_admin),
 ):
-    """Выгрузка заказов в Excel (.xlsx). Заголовки — русские. Только admin."""
+    """Выгрузка заказов в Excel (.xlsx) с теми же фильтрами, что и /orders.
+
+    Заголовки — русские. Только admin.
+    """
     q = (
-        select(Order, Customer, Status, PaymentType)
-        .outerjoin(Customer, Order.customer_id == Customer.id)
-        .outerjoin(Status, Order.status_code == Status.code)
-        .outerjoin(PaymentType, Order.payment_type_code == PaymentType.code)
-        .order_by(Order.order_date.desc())
+        orders_query(filters)
+        .order_by(Order.order_date.desc(), Order.order_no.desc())
+        .limit(EXPORT_MAX_ROWS)
     )
     result = await session.execute(q)
-    rows = result.all()[:50000]
+    rows = result.all()
+    from openpyxl import Workbook
     wb = Workbook()
     ws = wb.active
     ws.title = "Заказы"
@@ -460,14 +444,7 @@ async def export_orders_excel(
 
 @router.get("/orders/items", response_model=EntityModel | list[EntityModel])
 async def list_order_items(
-    customer_id: int | None = Query(None, description="ID клиента"),
-    customer_name: str | None = Query(None, description="Поиск по названию клиента или фирмы"),
-    status_code: str | None = Query(None, description="Статус заказа"),
-    scheduled_delivery_from: str | None = Query(None, description="Дата поставки с (ISO дата)"),
-    scheduled_delivery_to: str | None = Query(None, description="Дата поставки по (ISO дата)"),
-    login_agent: str | None = Query(None, description="Логин агента"),
-    login_expeditor: str | None = Query(None, description="Логин экспедитора"),
-    last_updated_by: str | None = Query(None, description="Логин пользователя, выполнившего последнее изменение заказа"),
+    filters: OrderFilters = Depends(),
     limit: int = Query(100, ge=1, le=1000, description="Количество записей на странице"),
     offset: int = Query(0, ge=0, description="Смещение для пагинации"),
     session: AsyncSession = Depends(get_db_session),
@@ -476,62 +453,27 @@ async def list_order_items(
     """
     Список позиций заказов (items) с теми же фильтрами, что и /orders.
     Каждая строка — одна позиция товара в заказе.
-    Поддерживает пагинацию (limit, offset).
+    Поддерживает пагинацию (limit, offset); количество и сумма считаются в том же запросе.
     """
-    q = (
-        select(Item, Order, Customer, Product, Status, PaymentType)
-        .join(Order, Item.order_id == Order.order_no)
-        .outerjoin(Customer, Order.customer_id == Customer.id)
-        .outerjoin(Product, Item.product_code == Product.code)
-        .outerjoin(Status, Order.status_code == Status.code)
-        .outerjoin(PaymentType, Order.payment_type_code == PaymentType.code)
+    q = order_items_query(filters)
+    page_q = (
+        with_window_totals(q, ITEM_AMOUNT)
         .order_by(Order.scheduled_delivery_at.desc().nullslast(), Order.order_date.desc(), Item.id)
+        .limit(limit)
+        .offset(offset)
     )
-    if customer_id is not None:
-        q = q.where(Order.customer_id == customer_id)
-    if customer_name and customer_name.strip():
-        name = escape_like(customer_name.strip())
-        q = q.where(
-            or_(
-                Customer.name_client.ilike(f"%{name}%", escape="\\"),
-                Customer.firm_name.ilike(f"%{name}%", escape="\\"),
-            )
-        )
-    if status_code and status_code.strip():
-        q = q.where(Order.status_code == status_code.strip())
-    if scheduled_delivery_from:
-        dt_from = _parse_optional_datetime(scheduled_delivery_from)
-        if dt_from:
-            q = q.where(Order.scheduled_delivery_at >= dt_from)
-    if scheduled_delivery_to:
-        dt_to = _parse_optional_datetime(scheduled_delivery_to)
-        if dt_to:
-            q = q.where(Order.scheduled_delivery_at <= dt_to)
-    if login_agent and login_agent.strip():
-        q = q.where(Customer.login_agent == login_agent.strip())
-    if login_expeditor and login_expeditor.strip():
-        q = q.where(Customer.login_expeditor == login_expeditor.strip())
-    if last_updated_by and last_updated_by.strip():
-        q = q.where(Order.last_updated_by == last_updated_by.strip())
-
-    # Подсчет общего количества (до пагинации)
-    from sqlalchemy import func
-    count_q = select(func.count()).select_from(q.subquery())
-    total_count_result = await session.execute(count_q)
-    total_count = total_count_result.scalar() or 0
-
-    # Применяем пагинацию
-    q = q.limit(limit).offset(offset)
+    rows = (await session.execute(page_q)).all()
+    if rows:
+        total_count, total_amount_all = int(rows[0][6]), float(rows[0][7] or 0)
+    else:
+        count_value, amount_value = (await session.execute(totals_query(q, ITEM_AMOUNT))).one()
+        total_count, total_amount_all = int(count_value or 0), float(amount_value or 0)
 
-    result = await session.execute(q)
-    rows = result.all()
     out: list[dict] = []
-    total_amount = 0.0
-    for it, o, cust, prod, st, pt in rows:
+    for it, o, cust, prod, st, pt, *_window in rows:
         qty = it.quantity or 0
         price = float(it.price) if it.price is not None else None
         amount = qty * (price or 0)
-        total_amount += amount
         out.append(
             {
                 "item_id": str(it.id),
@@ -557,46 +499,7 @@ async def list_order_items(
                 "order_last_updated_by": o.last_updated_by,
             }
         )
-    
-    # Подсчет общей суммы всех позиций (не только текущей страницы)
-    # Для этого нужно выполнить отдельный запрос
-    sum_q = (
-        select(func.sum(Item.quantity * func.coalesce(Item.price, 0)))
-        .select_from(Item)
-        .join(Order, Item.order_id == Order.order_no)
-        .outerjoin(Customer, Order.customer_id == Customer.id)
-    )
-    # Применяем те же фильтры
-    if customer_id is not None:
-        sum_q = sum_q.where(Order.customer_id == customer_id)
-    if customer_name and customer_name.strip():
-        name = escape_like(customer_name.strip())
-        sum_q = sum_q.where(
-            or_(
-                Customer.name_client.ilike(f"%{name}%", escape="\\"),
-                Customer.firm_name.ilike(f"%{name}%", escape="\\"),
-            )
-        )
-    if status_code and status_code.strip():
-        sum_q = sum_q.where(Order.status_code == status_code.strip())
-    if scheduled_delivery_from:
-        dt_from = _parse_optional_datetime(scheduled_delivery_from)
-        if dt_from:
-            sum_q = sum_q.where(Order.scheduled_delivery_at >= dt_from)
-    if scheduled_delivery_to:
-        dt_to = _parse_optional_datetime(scheduled_delivery_to)
-        if dt_to:
-            sum_q = sum_q.where(Order.scheduled_delivery_at <= dt_to)
-    if login_agent and login_agent.strip():
-        sum_q = sum_q.where(Customer.login_agent == login_agent.strip())
-    if login_expeditor and login_expeditor.strip():
-        sum_q = sum_q.where(Customer.login_expeditor == login_expeditor.strip())
-    if last_updated_by and last_updated_by.strip():
-        sum_q = sum_q.where(Order.last_updated_by == last_updated_by.strip())
-    
-    total_amount_result = await session.execute(sum_q)
-    total_amount_all = float(total_amount_result.scalar() or 0)
-    
+
     return {
         "items": out,
         "total_count": total_count,
@@ -608,56 +511,15 @@ async def list_order_items(
 
 @router.get("/orders/items/export", response_model=None)
 async def export_order_items_excel(
-    customer_id: int | None = Query(None, description="ID клиента"),
-    customer_name: str | None = Query(None, description="Поиск по названию клиента или фирмы"),
-    status_code: str | None = Query(None, description="Статус заказа"),
-    scheduled_delivery_from: str | None = Query(None, description="Дата поставки с (ISO дата)"),
-    scheduled_delivery_to: str | None = Query(None, description="Дата поставки по (ISO дата)"),
-    login_agent: str | None = Query(None, description="Логин агента"),
-    login_expeditor: str | None = Query(None, description="Логин экспедитора"),
-    last_updated_by: str | None = Query(None, description="Логин пользователя, выполнившего последнее изменение заказа"),
+    filters: OrderFilters = Depends(),
     session: AsyncSession = Depends(get_db_session),
     user: User = Depends(require_admin),
 ):
     """Выгрузка позиций заказов в Excel (.xlsx). Только admin."""
-    q = (
-        select(Item, Order, Customer, Product, Status, PaymentType)
-        .join(Order, Item.order_id == Order.order_no)
-        .outerjoin(Customer, Order.customer_id == Customer.id)
-        .outerjoin(Product, Item.product_code == Product.code)
-        .outerjoin(Status, Order.status_code == Status.code)
-        .outerjoin(PaymentType, Order.payment_type_code == PaymentType.code)
-        .order_by(Order.order_date.desc(), Item.id)
-    )
-    if customer_id is not None:
-        q = q.where(Order.customer_id == customer_id)
-    if customer_name and customer_name.strip():
-        name = escape_like(customer_name.strip())
-        q = q.where(
-            or_(
-                Customer.name_client.ilike(f"%{name}%", escape="\\"),
-                Customer.firm_name.ilike(f"%{name}%", escape="\\"),
-            )
-        )
-    if status_code and status_code.strip():
-        q = q.where(Order.status_code == status_code.strip())
-    if scheduled_delivery_from:
-        dt_from = _parse_optional_datetime(scheduled_delivery_from)
-        if dt_from:
-            q = q.where(Order.scheduled_delivery_at >= dt_from)
-    if scheduled_delivery_to:
-        dt_to = _parse_optional_datetime(scheduled_delivery_to)
-        if dt_to:
-            q = q.where(Order.scheduled_delivery_at <= dt_to)
-    if login_agent and login_agent.strip():
-        q = q.where(Customer.login_agent == login_agent.strip())
-    if login_expeditor and login_expeditor.strip():
-        q = q.where(Customer.login_expeditor == login_expeditor.strip())
-    if last_updated_by and last_updated_by.strip():
-        q = q.where(Order.last_updated_by == last_updated_by.strip())
-
+    q = order_items_query(filters).order_by(Order.order_date.desc(), Item.id).limit(EXPORT_MAX_ROWS)
     result = await session.execute(q)
-    rows = result.all()[:50000]
+    rows = result.all()
+    from openpyxl import Workbook
     wb = Workbook()
     ws = wb.active
     ws.title = "Позиции заказов"
@@ -729,6 +591,56 @@ async def create_order(
                 detail='В таблице orders отсутствует колонка payment_type_code. Добавьте её в БД: ALTER TABLE "Sales".orders ADD COLUMN payment_type_code VARCHAR REFERENCES "Sales".payment_type(code);',
             )
         raise HTTPException(status_code=500, detail="Ошибка при создании заказа: " + msg)
+
+
+@router.post("/orders/full", response_model=EntityModel)
+async def create_order_full(
+    body: OrderFullCreate,
+    session: AsyncSession = Depends(get_db_session),
+    user: User = Depends(get_current_user),
+):
+    """Создать заказ вместе с позициями одним запросом и одной транзакцией.
+
+    Товары проверяются одним запросом; цена без значения берётся из справочника товаров;
+    total_amount считается на сервере.
+    """
+    response, notification = await OrderService(session).create_order_full(
+        body.model_dump(), user.login
+    )
+    if notification:
+        schedule_notification(notify_new_order(**notification))
+    return response
+
+
+ORDERS_BATCH_MAX = 200
+
+
+@router.get("/orders/batch", response_model=EntityModel)
+async def get_orders_batch(
+    ids: str = Query(..., description="Номера заказов через запятую: 101,102,105"),
+    session: AsyncSession = Depends(get_db_session),
+    user: User = Depends(get_current_user),
+):
+    """Несколько заказов с позициями за два запроса (например, день экспедитора).
+
+    Порядок в data совпадает с порядком ids; ненайденные номера возвращаются в missing.
+    """
+    try:
+        order_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=422, detail="ids: ожидаются целые номера заказов через запятую"
+        ) from exc
+    if not order_ids:
+        raise HTTPException(status_code=422, detail="ids: укажите хотя бы один номер заказа")
+    if len(order_ids) > ORDERS_BATCH_MAX:
+        raise HTTPException(
+            status_code=422, detail=f"ids: не более {ORDERS_BATCH_MAX} заказов за запрос"
+        )
+    orders, missing = await OrderService(session).get_orders_batch(order_ids)
+    return {"data": orders, "missing": missing}
+
+
 @router.get("/orders/{order_id}", response_model=EntityModel | list[EntityModel])
 async def get_order(
     order_id: int,
@@ -809,11 +721,33 @@ async def add_order_item(
         last_updated_by=user.login,
     )
     session.add(item)
+    await OrderService(session).touch_order(order_id, user.login)
     await session.commit()
     await session.refresh(item)
     return {"id": str(item.id), "product_code": item.product_code, "quantity": item.quantity, "message": "created"}
 
 
+@router.put("/orders/{order_id}/items", response_model=EntityModel)
+async def replace_order_items(
+    order_id: int,
+    body: OrderItemsBatch,
+    session: AsyncSession = Depends(get_db_session),
+    user: User = Depends(get_current_user),
+):
+    """Изменить позиции заказа одним запросом: полный набор items или разница add/update/delete.
+
+    Всё применяется в одной транзакции, total_amount пересчитывается один раз;
+    ответ — обновлённый заказ.
+    """
+    if body.items is not None and (body.add or body.update or body.delete):
+        raise HTTPException(status_code=422, detail="Передайте либо items, либо add/update/delete")
+    return await OrderService(session).replace_order_items(
+        order_id=order_id,
+        payload=body.model_dump(exclude_unset=True),
+        updated_by=user.login,
+    )
+
+
 @router.patch("/orders/{order_id}/items/{item_id}")
 async def update_order_item(
     order_id: int,
@@ -832,6 +766,7 @@ async def update_order_item(
     if body.price is not None:
         item.price = body.price
     item.last_updated_by = user.login
+    await OrderService(session).touch_order(order_id, user.login)
     await session.commit()
     await session.refresh(item)
     return {"id": str(item.id), "message": "updated"}
@@ -850,5 +785,6 @@ async def delete_order_item(
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     await session.delete(item)
+    await OrderService(session).touch_order(order_id, user.login)
     await session.commit()
     return {"message": "deleted"}
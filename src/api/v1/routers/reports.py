@@ -6,8 +6,6 @@ from datetime import date
 from src.api.v1.schemas.common import EntityModel
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import Response
-from openpyxl import Workbook
-from openpyxl.styles import Alignment
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -159,6 +157,8 @@ async def report_customers_export(
     """Экспорт отчёта по клиентам в Excel."""
     res = await report_customers(status, agent_login, month, date_from, date_to, session, user)
     data = res.get("data") or []
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment
     wb = Workbook()
     ws = wb.active
     ws.title = "По клиентам"
@@ -283,6 +283,8 @@ async def report_agents_export(
     """Экспорт отчёта по агентам в Excel."""
     res = await report_agents(month, date_from, date_to, session, user)
     data = res.get("data") or []
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment
     wb = Workbook()
     ws = wb.active
     ws.title = "Агенты"
@@ -395,6 +397,8 @@ async def report_expeditors_export(
     """Экспорт сводного отчёта по экспедиторам в Excel."""
     res = await report_expeditors(month, date_from, date_to, session, user)
     data = res.get("data") or []
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment
     wb = Workbook()
     ws = wb.active
     ws.title = "Экспедиторы"
@@ -487,6 +491,8 @@ async def report_visits_export(
     res = await report_visits(from_date, to_date, session, user)
     by_date = res.get("by_date") or []
     summary = res.get("summary") or {}
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment
     wb = Workbook()
     ws = wb.active
     ws.title = "Аналитика визитов"
@@ -699,6 +705,8 @@ async def report_dashboard_export(
     res = await report_dashboard(date_from, date_to, status_codes, product_category, session, user)
     data = res.get("by_category") or []
     by_territory = res.get("by_territory") or []
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment
     wb = Workbook()
     ws = wb.active
     ws.title = "По категориям"
@@ -867,6 +875,8 @@ async def report_photos_export(
     stats = res.get("statistics") or {}
     without = res.get("customers_without_photos") or []
     recent = res.get("recent_uploads") or []
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment
     wb = Workbook()
     center_align = Alignment(horizontal='center', vertical='center')
     ws1 = wb.active
@@ -1003,6 +1013,8 @@ async def report_locations_export(
     res = await report_locations(session, user)
     rows = res.get("data") or []
 
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment
     wb = Workbook()
     ws = wb.active
     ws.title = "Локации клиентов"
@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel, Field
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,6 +12,8 @@ from sqlalchemy import text, select, func
 from src.api.v1.services.translation_service import TranslationService
 from src.core.config import settings
 from src.core.deps import get_current_user, require_admin
+from src.core.http_cache import ConditionalGet, conditional_get, etag_matches
+from src.core.static_assets import accepted_encodings
 from src.database.connection import get_db_session
 from src.database.models import User, Translation
 
@@ -42,14 +44,41 @@ class LocalizeLiteralsRequest(BaseModel):
     language: str | None = None
 
 
+# Comes from settings, so it only changes with a restart.
+LANGUAGE_CONFIG_MAX_AGE = 3600
+
+
 @router.get("/config/languages")
-async def get_language_config(_: User = Depends(get_current_user)):
+async def get_language_config(response: Response, _: User = Depends(get_current_user)):
+    response.headers["Cache-Control"] = f"private, max-age={LANGUAGE_CONFIG_MAX_AGE}"
     return {
         "enabled_languages": settings.enabled_languages_list,
         "default_language": settings.effective_default_language,
     }
 
 
+@router.get("/bundle/{language}")
+async def get_translation_bundle(
+    language: str,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+    _: User = Depends(get_current_user),
+):
+    """Все тексты веб-интерфейса на языке одним JSON: готовый gzip из памяти, ETag / 304."""
+    bundle = await TranslationService(session).bundle(language)
+    gzipped = "gzip" in accepted_encodings(request.headers.get("accept-encoding", ""))
+    etag = bundle.gzip_etag if gzipped else bundle.etag
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    return Response(
+        bundle.gzipped if gzipped else bundle.body, media_type="application/json", headers=headers
+    )
+
+
 @router.get("/stats")
 async def get_translations_stats(
     session: AsyncSession = Depends(get_db_session),
@@ -119,7 +148,10 @@ async def list_translations(
     offset: int = Query(0, ge=0),
     session: AsyncSession = Depends(get_db_session),
     _: User = Depends(require_admin),
+    cache: ConditionalGet = Depends(conditional_get("translations")),
 ):
+    if cache.not_modified:
+        return cache.not_modified_response()
     service = TranslationService(session)
     rows = await service.list_items(
         category=category,
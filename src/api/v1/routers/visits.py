@@ -7,15 +7,21 @@ from src.api.v1.schemas.common import EntityModel
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import Response
 from pydantic import BaseModel
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from openpyxl import Workbook
 
 from src.database.connection import get_db_session
 from src.database.models import CustomerVisit, Customer, User
 from src.core.deps import get_current_user
 from src.core.notifications import notify_new_visit, schedule_notification
-from src.core.pagination import PaginatedResponse, PaginationParams
+from src.core.pagination import (
+    PaginatedResponse,
+    PaginationParams,
+    SortKey,
+    count_total,
+    paginate_keyset,
+    split_page,
+)
 from src.core.sql import escape_like
 from src.database.models import User as UserModel
 from src.api.v1.services.visit_service import VisitService
@@ -54,6 +60,15 @@ async def create_visit(
     if notification:
         schedule_notification(notify_new_visit(**notification))
     return response
+
+
+VISIT_LIST_SORT = (
+    SortKey(CustomerVisit.visit_date, descending=True, nullable=False),
+    SortKey(CustomerVisit.visit_time, descending=True, nulls_last=True),
+    SortKey(CustomerVisit.id, descending=True, nullable=False),
+)
+
+
 @router.get("/visits/search", response_model=PaginatedResponse[EntityModel])
 async def search_visits(
     customer_id: int | None = Query(None),
@@ -71,7 +86,6 @@ async def search_visits(
         select(CustomerVisit, Customer.name_client, Customer.firm_name, User.fio)
         .join(Customer, CustomerVisit.customer_id == Customer.id)
         .outerjoin(User, CustomerVisit.responsible_login == User.login)
-        .order_by(CustomerVisit.visit_date.desc(), CustomerVisit.visit_time.desc().nullslast())
     )
     if customer_id is not None:
         q = q.where(CustomerVisit.customer_id == customer_id)
@@ -98,35 +112,13 @@ async def search_visits(
             q = q.where(CustomerVisit.visit_date <= d)
         except (ValueError, TypeError):
             pass
-    count_q = select(func.count()).select_from(CustomerVisit)
-    if customer_id is not None:
-        count_q = count_q.where(CustomerVisit.customer_id == customer_id)
-    if customer_name and customer_name.strip():
-        count_q = count_q.join(Customer, CustomerVisit.customer_id == Customer.id)
-        name = escape_like(customer_name.strip())
-        count_q = count_q.where(
-            (Customer.name_client.ilike(f"%{name}%", escape="\\")) | (Customer.firm_name.ilike(f"%{name}%", escape="\\"))
-        )
-    if status and status.strip():
-        parts = [s.strip() for s in status.split(",") if s.strip()]
-        if parts:
-            count_q = count_q.where(CustomerVisit.status.in_(parts))
-    if responsible_login and responsible_login.strip():
-        count_q = count_q.where(CustomerVisit.responsible_login == responsible_login.strip())
-    if from_date:
-        try:
-            count_q = count_q.where(CustomerVisit.visit_date >= date.fromisoformat(from_date[:10]))
-        except (ValueError, TypeError):
-            pass
-    if to_date:
-        try:
-            count_q = count_q.where(CustomerVisit.visit_date <= date.fromisoformat(to_date[:10]))
-        except (ValueError, TypeError):
-            pass
-    total = (await session.execute(count_q)).scalar() or 0
-    q = q.offset(pagination.offset).limit(pagination.limit)
-    result = await session.execute(q)
-    rows = result.all()
+    total, total_is_estimate = await count_total(session, q, pagination)
+    result = await session.execute(paginate_keyset(q, VISIT_LIST_SORT, pagination))
+    rows, has_more, next_cursor = split_page(
+        result.all(),
+        pagination,
+        lambda row: (row[0].visit_date, row[0].visit_time, row[0].id),
+    )
     data = []
     for v, name_client, firm_name, resp_fio in rows:
         data.append({
@@ -140,7 +132,14 @@ async def search_visits(
             "responsible_name": resp_fio or v.responsible_login or "",
             "comment": v.comment,
         })
-    return PaginatedResponse.create(data=data, total=total, pagination=pagination)
+    return PaginatedResponse.create(
+        data=data,
+        total=total,
+        pagination=pagination,
+        has_more=has_more,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
+    )
 
 
 @router.get("/visits/export", response_model=None)
@@ -186,6 +185,7 @@ async def export_visits_excel(
             pass
     result = await session.execute(q.limit(50000))
     rows = result.all()
+    from openpyxl import Workbook
     wb = Workbook()
     ws = wb.active
     ws.title = "Визиты"
@@ -7,7 +7,6 @@ import io
 from src.api.v1.schemas.common import EntityModel
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import StreamingResponse
-from openpyxl import Workbook
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -185,6 +184,7 @@ async def export_warehouse_stock_excel(
     """Выгрузка остатков по складу в Excel (с учётом сроков годности)."""
     data = await _fetch_stock_with_expiry(session, warehouse, product, batch_code)
 
+    from openpyxl import Workbook
     wb = Workbook()
     ws = wb.active
     ws.title = "Остатки"
@@ -0,0 +1,273 @@
+"""Bulk customer CSV import.
+
+Rows stream into a temp staging table with COPY, are validated in SQL and upserted once.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from collections.abc import Iterator
+from typing import BinaryIO
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.v1.services.customer_search import SEARCH_CACHE
+
+# CSV layout matches /customers/export (";" separated, without the trailing photo column).
+STAGE_COLUMNS = (
+    "line_no",
+    "id",
+    "name_client",
+    "firm_name",
+    "category_client",
+    "address",
+    "city",
+    "territory",
+    "landmark",
+    "phone",
+    "contact_person",
+    "tax_id",
+    "status",
+    "login_agent",
+    "login_expeditor",
+    "latitude",
+    "longitude",
+    "pinfl",
+    "contract_no",
+    "account_no",
+    "bank",
+    "mfo",
+    "oked",
+    "vat_code",
+)
+CSV_COLUMN_COUNT = len(STAGE_COLUMNS) - 1
+STAGE_TABLE = "customer_import_stage"
+COPY_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+DEFAULT_STATUS = "Активный"
+
+_CREATE_STAGE_SQL = f"""
+    CREATE TEMP TABLE {STAGE_TABLE} (
+        line_no integer NOT NULL,
+        {", ".join(f"{name} text" for name in STAGE_COLUMNS[1:])}
+    ) ON COMMIT DROP
+"""
+
+# One normalized row per staged line; ``error`` is its first problem, NULL if importable.
+_VALIDATE_SQL = f"""
+    CREATE TEMP TABLE customer_import_rows ON COMMIT DROP AS
+    WITH parsed AS (
+        SELECT s.*,
+               CASE WHEN s.id ~ '^[0-9]{{1,9}}$' THEN s.id::integer END AS pk,
+               CASE WHEN s.latitude ~ '^[-+]?[0-9]{{1,3}}([.,][0-9]+)?$'
+                    THEN replace(s.latitude, ',', '.')::numeric END AS lat,
+               CASE WHEN s.longitude ~ '^[-+]?[0-9]{{1,3}}([.,][0-9]+)?$'
+                    THEN replace(s.longitude, ',', '.')::numeric END AS lon,
+               ct.id AS city_id,
+               t.id AS territory_id
+        FROM {STAGE_TABLE} s
+        LEFT JOIN "Sales".cities ct ON ct.name = s.city
+        LEFT JOIN "Sales".territories t ON t.name = s.territory
+    )
+    SELECT p.*,
+           EXISTS (SELECT 1 FROM "Sales".customers c WHERE c.id = p.pk) AS is_update,
+           CASE
+               WHEN p.id IS NOT NULL AND p.pk IS NULL THEN 'id должен быть целым числом'
+               WHEN p.pk IS NOT NULL
+                    AND row_number() OVER (PARTITION BY p.pk ORDER BY p.line_no) > 1
+                   THEN 'id повторяется в файле'
+               WHEN p.latitude IS NOT NULL AND (p.lat IS NULL OR p.lat NOT BETWEEN -90 AND 90)
+                   THEN 'Широта должна быть числом в диапазоне [-90, 90]'
+               WHEN p.longitude IS NOT NULL AND (p.lon IS NULL OR p.lon NOT BETWEEN -180 AND 180)
+                   THEN 'Долгота должна быть числом в диапазоне [-180, 180]'
+               WHEN p.city IS NOT NULL AND p.city_id IS NULL THEN 'Город не найден: ' || p.city
+               WHEN p.territory IS NOT NULL AND p.territory_id IS NULL
+                   THEN 'Территория не найдена: ' || p.territory
+               WHEN p.login_agent IS NOT NULL
+                    AND NOT EXISTS (SELECT 1 FROM "Sales".users u WHERE u.login = p.login_agent)
+                   THEN 'Агент не найден: ' || p.login_agent
+               WHEN p.login_expeditor IS NOT NULL
+                    AND NOT EXISTS (SELECT 1 FROM "Sales".users u WHERE u.login = p.login_expeditor)
+                   THEN 'Экспедитор не найден: ' || p.login_expeditor
+           END AS error
+    FROM parsed p
+"""  # noqa: S608
+
+_SUMMARY_SQL = text(
+    """
+    SELECT count(*) FILTER (WHERE error IS NULL AND NOT is_update),
+           count(*) FILTER (WHERE error IS NULL AND is_update),
+           count(*) FILTER (WHERE error IS NOT NULL)
+    FROM customer_import_rows
+    """
+)
+
+_ERRORS_SQL = text(
+    """
+    SELECT line_no, id, error FROM customer_import_rows
+    WHERE error IS NOT NULL
+    ORDER BY line_no
+    LIMIT :lim
+    """
+)
+
+# Existing ids are updated in place; new rows (no id or unknown id) take the next sequence value,
+# so one INSERT ... ON CONFLICT covers both. Blank name/firm/status/city/territory/coordinates keep
+# the stored value, other columns are overwritten as in the file.
+_UPSERT_SQL = text(
+    f"""
+    INSERT INTO "Sales".customers AS c (
+        id, name_client, firm_name, category_client, address, city_id, territory_id, landmark,
+        phone, contact_person, tax_id, status, login_agent, login_expeditor, latitude, longitude,
+        pinfl, contract_no, account_no, bank, mfo, oked, vat_code
+    )
+    SELECT CASE WHEN r.is_update THEN r.pk
+                ELSE nextval(pg_get_serial_sequence('"Sales".customers', 'id')) END,
+           r.name_client, r.firm_name, r.category_client, r.address, r.city_id, r.territory_id,
+           r.landmark, r.phone,
+           r.contact_person, r.tax_id,
+           CASE WHEN r.is_update THEN r.status ELSE COALESCE(r.status, '{DEFAULT_STATUS}') END,
+           r.login_agent, r.login_expeditor, r.lat, r.lon,
+           r.pinfl, r.contract_no, r.account_no, r.bank, r.mfo, r.oked, r.vat_code
+    FROM customer_import_rows r
+    WHERE r.error IS NULL
+    ORDER BY r.line_no
+    ON CONFLICT (id) DO UPDATE SET
+        name_client = COALESCE(EXCLUDED.name_client, c.name_client),
+        firm_name = COALESCE(EXCLUDED.firm_name, c.firm_name),
+        category_client = EXCLUDED.category_client,
+        address = EXCLUDED.address,
+        city_id = COALESCE(EXCLUDED.city_id, c.city_id),
+        territory_id = COALESCE(EXCLUDED.territory_id, c.territory_id),
+        landmark = EXCLUDED.landmark,
+        phone = EXCLUDED.phone,
+        contact_person = EXCLUDED.contact_person,
+        tax_id = EXCLUDED.tax_id,
+        status = COALESCE(EXCLUDED.status, c.status),
+        login_agent = EXCLUDED.login_agent,
+        login_expeditor = EXCLUDED.login_expeditor,
+        latitude = COALESCE(EXCLUDED.latitude, c.latitude),
+        longitude = COALESCE(EXCLUDED.longitude, c.longitude),
+        pinfl = EXCLUDED.pinfl,
+        contract_no = EXCLUDED.contract_no,
+        account_no = EXCLUDED.account_no,
+        bank = EXCLUDED.bank,
+        mfo = EXCLUDED.mfo,
+        oked = EXCLUDED.oked,
+        vat_code = EXCLUDED.vat_code
+    """  # noqa: S608
+)
+
+
+def _is_header(row: list[str]) -> bool:
+    if not row or row[0].strip() != "id":
+        return False
+    return "name_client" in (h.strip().lower() for h in row)
+
+
+def iter_csv_records(stream: BinaryIO) -> Iterator[tuple]:
+    """Yield staging records ``(line_no, id, name_client, ...)`` without reading the whole file.
+
+    Blank cells become None; rows with fewer than two cells and the export header are skipped.
+    """
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text_stream, delimiter=";")
+        first = True
+        for row in reader:
+            if first:
+                first = False
+                if _is_header(row):
+                    continue
+            if not row or len(row) < 2:
+                continue
+            values = (row + [""] * CSV_COLUMN_COUNT)[:CSV_COLUMN_COUNT]
+            yield (reader.line_num, *[(value.strip() or None) for value in values])
+    except UnicodeDecodeError as exc:
+        raise HTTPException(
+            status_code=400, detail="Неверная кодировка файла (нужен UTF-8)"
+        ) from exc
+    finally:
+        # Leave the upload's file object open for its owner.
+        text_stream.detach()
+
+
+class CustomerImportService:
+    """Streaming CSV import of customers."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _copy_rows(self, stream: BinaryIO) -> int:
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        driver = raw.driver_connection
+        staged = 0
+        batch: list[tuple] = []
+        for record in iter_csv_records(stream):
+            batch.append(record)
+            if len(batch) >= COPY_BATCH_SIZE:
+                await driver.copy_records_to_table(
+                    STAGE_TABLE, records=batch, columns=STAGE_COLUMNS
+                )
+                staged += len(batch)
+                batch = []
+        if batch:
+            await driver.copy_records_to_table(STAGE_TABLE, records=batch, columns=STAGE_COLUMNS)
+            staged += len(batch)
+        return staged
+
+    async def import_csv(self, stream: BinaryIO, *, dry_run: bool = False) -> dict:
+        """Stage, validate and upsert; ``dry_run`` rolls the transaction back after validation."""
+        try:
+            await self.db.execute(text(_CREATE_STAGE_SQL))
+            staged = await self._copy_rows(stream)
+            if not staged:
+                await self.db.rollback()
+                return self._report("Файл пуст", dry_run, 0, 0, 0, 0, [])
+
+            await self.db.execute(text(_VALIDATE_SQL))
+            created, updated, skipped = (await self.db.execute(_SUMMARY_SQL)).one()
+            error_rows = (
+                await self.db.execute(_ERRORS_SQL, {"lim": MAX_REPORTED_ERRORS})
+            ).fetchall()
+            if dry_run:
+                await self.db.rollback()
+            else:
+                if created or updated:
+                    await self.db.execute(_UPSERT_SQL)
+                await self.db.commit()
+                SEARCH_CACHE.invalidate()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        message = "Проверка выполнена, изменения не сохранены" if dry_run else "Импорт выполнен"
+        return self._report(message, dry_run, staged, created, updated, skipped, error_rows)
+
+    @staticmethod
+    def _report(
+        message: str,
+        dry_run: bool,
+        rows: int,
+        created: int,
+        updated: int,
+        skipped: int,
+        error_rows,
+    ) -> dict:
+        return {
+            "message": message,
+            "dry_run": dry_run,
+            "rows": rows,
+            "created": created,
+            "updated": updated,
+            "skipped": skipped,
+            "errors": [
+                {"line": line_no, "id": row_id, "error": error}
+                for line_no, row_id, error in error_rows
+            ],
+            "errors_truncated": skipped > len(error_rows),
+        }
@@ -0,0 +1,207 @@
+"""Customer autocomplete backed by trigram indexes (migration 052) with a per-agent result cache."""
+
+from __future__ import annotations
+
+import re
+import time
+from collections import OrderedDict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.metrics import record_cache_lookup
+from src.core.sql import escape_like
+
+# Same mapping as "Sales".search_key() in migration 052: Cyrillic (ru/uz) and Latin spellings of a
+# name reduce to one Latin skeleton, so "Ташкент"/"Tashkent", "Хуршид"/"Xurshid" and
+# "Ғайрат"/"G'ayrat" match each other.
+# Characters past the end of TRANSLIT_TO (hard/soft signs, apostrophes of o' / g') are dropped.
+TRANSLIT_FROM = (
+    "абвгдеёжзийклмнопрстуфхцчшщыэюяўқғҳ" "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЫЭЮЯЎҚҒҲ" "ъьЪЬ'`ʻʼ‘’"
+)
+TRANSLIT_TO = "abvgdeojziiklmnoprstufhccssieuaokgh" * 2
+DIGRAPHS = (
+    ("shch", "s"),
+    ("sh", "s"),
+    ("ch", "c"),
+    ("zh", "j"),
+    ("kh", "h"),
+    ("ts", "c"),
+    ("ya", "a"),
+    ("yu", "u"),
+    ("yo", "o"),
+)
+LATIN_SINGLES = ("yxqw", "ihkv")
+
+_TRANSLATE = str.maketrans(
+    TRANSLIT_FROM[: len(TRANSLIT_TO)], TRANSLIT_TO, TRANSLIT_FROM[len(TRANSLIT_TO) :]
+)
+_SINGLES = str.maketrans(*LATIN_SINGLES)
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NUMERIC_TERM = re.compile(r"[\d\s+()\-]+")
+
+# Expressions must match the index definitions in migration 052 for the planner to use them.
+NAME_KEY_SQL = (
+    """"Sales".search_key(coalesce(c.name_client, '') || ' ' || coalesce(c.firm_name, ''))"""
+)
+PHONE_DIGITS_SQL = "regexp_replace(coalesce(c.phone, ''), '\\D', '', 'g')"
+
+MIN_NUMERIC_LENGTH = 3
+
+
+def search_key(value: str | None) -> str:
+    """Python twin of "Sales".search_key(): transliteration-insensitive skeleton of a name."""
+    key = (value or "").lower().translate(_TRANSLATE)
+    for digraph, replacement in DIGRAPHS:
+        key = key.replace(digraph, replacement)
+    key = key.translate(_SINGLES)
+    return _NON_ALNUM.sub(" ", key).strip()
+
+
+def numeric_term(term: str) -> str | None:
+    """Digits of a tax ID / phone / account query, or None when the term is a name."""
+    if not _NUMERIC_TERM.fullmatch(term):
+        return None
+    digits = re.sub(r"\D", "", term)
+    return digits if len(digits) >= MIN_NUMERIC_LENGTH else None
+
+
+class CustomerSearchCache:
+    """LRU of recent search results keyed by (user, term, limit).
+
+    Entries live ``ttl`` seconds; any customer write in this process calls ``invalidate()``,
+    other API workers converge within the TTL.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 2048) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, list[dict]]] = OrderedDict()
+
+    def get(self, key: tuple) -> list[dict] | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            record_cache_lookup("customer_search", False)
+            return None
+        self._entries.move_to_end(key)
+        record_cache_lookup("customer_search", True)
+        return entry[1]
+
+    def set(self, key: tuple, value: list[dict]) -> None:
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+
+SEARCH_CACHE = CustomerSearchCache(ttl=settings.customer_search_cache_ttl)
+
+_COLUMNS_SQL = """
+    c.id, c.name_client, c.firm_name, c.tax_id, c.phone, c.address, c.account_no, c.login_agent
+"""
+
+
+def _row_to_dict(row) -> dict:
+    return {
+        "id": row[0],
+        "name_client": row[1],
+        "firm_name": row[2],
+        "tax_id": row[3],
+        "phone": row[4],
+        "address": row[5],
+        "account_no": row[6],
+        "login_agent": row[7],
+        "score": round(float(row[8]), 3),
+    }
+
+
+class CustomerSearchService:
+    """Ranked customer lookup for autocomplete (web and Telegram bot)."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def search(self, term: str, *, limit: int, user_login: str | None) -> list[dict]:
+        """Customers matching ``term``; the caller's own customers rank first within a tier."""
+        term = (term or "").strip()
+        if not term:
+            return []
+        cache_key = ((user_login or "").lower(), term.lower(), limit)
+        cached = SEARCH_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+        digits = numeric_term(term)
+        if digits is not None:
+            rows = await self._search_numeric(digits, limit, user_login)
+        else:
+            rows = await self._search_text(term, limit, user_login)
+        data = [_row_to_dict(row) for row in rows]
+        SEARCH_CACHE.set(cache_key, data)
+        return data
+
+    async def _search_numeric(self, digits: str, limit: int, user_login: str | None):
+        # tax_id prefix uses the text_pattern_ops B-tree; phone/account "contains" use trigram
+        # indexes.
+        sql = f"""
+            SELECT {_COLUMNS_SQL},
+                   CASE WHEN c.tax_id = :digits THEN 1.0
+                        WHEN c.tax_id LIKE :prefix ESCAPE '\\' THEN 0.8
+                        WHEN {PHONE_DIGITS_SQL} LIKE :contains ESCAPE '\\' THEN 0.6
+                        ELSE 0.4 END AS score
+            FROM "Sales".customers c
+            WHERE c.tax_id LIKE :prefix ESCAPE '\\'
+               OR {PHONE_DIGITS_SQL} LIKE :contains ESCAPE '\\'
+               OR c.account_no LIKE :contains ESCAPE '\\'
+            ORDER BY score DESC, (c.login_agent = :user_login) DESC NULLS LAST, c.id
+            LIMIT :lim
+        """  # noqa: S608
+        escaped = escape_like(digits)
+        params = {
+            "digits": digits,
+            "prefix": escaped + "%",
+            "contains": "%" + escaped + "%",
+            "user_login": user_login,
+            "lim": limit,
+        }
+        return (await self.db.execute(text(sql), params)).fetchall()
+
+    async def _search_text(self, term: str, limit: int, user_login: str | None):
+        # Names match on the transliteration key; tax_id / account_no (which may hold letters
+        # and dashes) keep matching the raw term, as the old ILIKE search did, via their trigram
+        # indexes.
+        key = search_key(term)
+        sql = f"""
+            SELECT {_COLUMNS_SQL},
+                   GREATEST(
+                       CASE WHEN {NAME_KEY_SQL} LIKE :prefix ESCAPE '\\' THEN 1.0 ELSE 0.0 END
+                       + similarity({NAME_KEY_SQL}, :key),
+                       CASE WHEN c.tax_id ILIKE :raw ESCAPE '\\'
+                              OR c.account_no ILIKE :raw ESCAPE '\\'
+                            THEN 0.5 ELSE 0.0 END
+                   ) AS score
+            FROM "Sales".customers c
+            WHERE (:key <> '' AND {NAME_KEY_SQL} LIKE :contains ESCAPE '\\')
+               OR c.tax_id ILIKE :raw ESCAPE '\\'
+               OR c.account_no ILIKE :raw ESCAPE '\\'
+            ORDER BY score DESC, (c.login_agent = :user_login) DESC NULLS LAST, c.id
+            LIMIT :lim
+        """  # noqa: S608
+        escaped = escape_like(key)
+        params = {
+            "key": key,
+            "prefix": escaped + "%",
+            "contains": "%" + escaped + "%",
+            "raw": "%" + escape_like(term) + "%",
+            "user_login": user_login,
+            "lim": limit,
+        }
+        return (await self.db.execute(text(sql), params)).fetchall()
@@ -7,8 +7,9 @@ from fastapi import HTTPException
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.api.v1.services.customer_search import SEARCH_CACHE
 from src.core.exceptions import ForbiddenError, NotFoundError
-from src.core.pagination import PaginationParams
+from src.core.pagination import PaginatedResponse, PaginationParams, count_total_sql, split_page
 from src.core.sql import escape_like
 from src.database.models import Customer, CustomerVisit, User
 
@@ -62,7 +63,7 @@ class CustomerService:
         login_expeditor: str | None = None,
         phone: str | None = None,
         tax_id: str | None = None,
-    ) -> tuple[list[dict], int]:
+    ) -> PaginatedResponse:
         base_from_sql = '''
             FROM "Sales".customers c
             LEFT JOIN "Sales".cities ct ON c.city_id = ct.id
@@ -102,9 +103,14 @@ class CustomerService:
             params["tax_id"] = "%" + escape_like(tax_id.strip()) + "%"
 
         where_sql = (" WHERE " + " AND ".join(conditions)) if conditions else ""
+        total, total_is_estimate = await count_total_sql(
+            self.db, f"{base_from_sql} {where_sql}", params, pagination
+        )
 
-        count_sql = f"SELECT COUNT(*) {base_from_sql} {where_sql}"
-        total = int((await self.db.execute(text(count_sql), params)).scalar() or 0)
+        cursor_values = pagination.cursor_values(1)
+        if cursor_values is not None:
+            where_sql += (" AND " if where_sql else " WHERE ") + "c.id > :after_id"
+            params["after_id"] = cursor_values[0]
 
         sql = f'''SELECT c.id, c.name_client, c.firm_name, c.category_client, c.address,
                  c.city_id, ct.name AS city_name,
@@ -114,10 +120,12 @@ class CustomerService:
                  {base_from_sql}
                  {where_sql}
                  ORDER BY c.id LIMIT :lim OFFSET :off'''  # nosec B608
-        params["lim"] = pagination.limit
+        params["lim"] = pagination.limit + 1
         params["off"] = pagination.offset
         result = await self.db.execute(text(sql), params)
-        rows = result.fetchall()
+        rows, has_more, next_cursor = split_page(
+            result.fetchall(), pagination, lambda row: (row[0],)
+        )
 
         data: list[dict] = []
         for row in rows:
@@ -151,7 +159,14 @@ class CustomerService:
                     "has_photo": bool(row[25]) if len(row) > 25 else False,
                 }
             )
-        return data, total
+        return PaginatedResponse.create(
+            data=data,
+            total=total,
+            pagination=pagination,
+            has_more=has_more,
+            next_cursor=next_cursor,
+            total_is_estimate=total_is_estimate,
+        )
 
     async def get_customer(self, customer_id: int) -> Customer:
         result = await self.db.execute(select(Customer).where(Customer.id == customer_id))
@@ -264,6 +279,7 @@ class CustomerService:
         )
         self.db.add(customer)
         await self.db.commit()
+        SEARCH_CACHE.invalidate()
         await self.db.refresh(customer)
         return self.customer_to_dict(customer)
 
@@ -375,6 +391,7 @@ class CustomerService:
             )
 
         await self.db.commit()
+        SEARCH_CACHE.invalidate()
         await self.db.refresh(customer)
         return self.customer_to_dict(customer)
 
@@ -402,4 +419,5 @@ class CustomerService:
             {"id": customer_id},
         )
         await self.db.commit()
+        SEARCH_CACHE.invalidate()
         return {"id": customer_id, "message": "deleted"}
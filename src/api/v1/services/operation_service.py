@@ -1,13 +1,27 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, timedelta
 
-from sqlalchemy import func, select, text
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.pagination import PaginationParams
+from src.api.v1.services.reference_data import REFERENCE_DATA
+from src.core.pagination import (
+    PaginatedResponse,
+    PaginationParams,
+    SortKey,
+    count_total,
+    paginate_keyset,
+    split_page,
+)
 from src.database.models import Customer, Operation
 
+OPERATION_LIST_SORT = (
+    SortKey(Operation.operation_date, descending=True, null_sentinel="'-infinity'::timestamptz"),
+    SortKey(Operation.created_at, descending=True, null_sentinel="'-infinity'::timestamptz"),
+    SortKey(Operation.id, descending=True, nullable=False),
+)
+
 
 class OperationService:
     """Business logic for warehouse operations domain."""
@@ -26,8 +40,8 @@ class OperationService:
         from_date: date | None = None,
         to_date: date | None = None,
         created_by: str | None = None,
-    ) -> tuple[list[dict], int]:
-        query = select(Operation).order_by(Operation.operation_date.desc().nulls_last(), Operation.created_at.desc().nulls_last())
+    ) -> PaginatedResponse:
+        query = select(Operation)
         if type_code and type_code.strip():
             query = query.where(Operation.type_code == type_code.strip())
         if customer_id is not None:
@@ -36,25 +50,26 @@ class OperationService:
             query = query.where(Operation.product_code == product_code.strip())
         if status and status.strip():
             query = query.where(Operation.status == status.strip())
+        # Range on the raw column (not DATE(operation_date)) so an index on operation_date applies.
         if from_date:
-            query = query.where(func.date(Operation.operation_date) >= from_date)
+            query = query.where(Operation.operation_date >= from_date)
         if to_date:
-            query = query.where(func.date(Operation.operation_date) <= to_date)
+            query = query.where(Operation.operation_date < to_date + timedelta(days=1))
         if created_by and created_by.strip():
             query = query.where(Operation.created_by == created_by.strip())
 
-        count_q = query.with_only_columns(func.count()).order_by(None)
-        total = int((await self.db.execute(count_q)).scalar() or 0)
-        result = await self.db.execute(query.offset(pagination.offset).limit(pagination.limit))
-        rows = result.scalars().all()
+        total, total_is_estimate = await count_total(self.db, query, pagination)
+        result = await self.db.execute(paginate_keyset(query, OPERATION_LIST_SORT, pagination))
+        rows, has_more, next_cursor = split_page(
+            result.scalars().all(),
+            pagination,
+            lambda op: (op.operation_date, op.created_at, op.id),
+        )
 
-        type_codes = {row.type_code for row in rows if row.type_code}
         type_names: dict[str, str] = {}
-        if type_codes:
-            type_result = await self.db.execute(text('SELECT code, name FROM "Sales".operation_types'))
-            for code, name in type_result.fetchall():
-                if code in type_codes:
-                    type_names[code] = name or code
+        if any(row.type_code for row in rows):
+            operation_types = await REFERENCE_DATA.operation_types(self.db)
+            type_names = {code: name or code for code, name in operation_types.items()}
 
         customer_ids = {row.customer_id for row in rows if row.customer_id is not None}
         customer_names: dict[int, str] = {}
@@ -98,4 +113,11 @@ class OperationService:
                 }
             )
 
-        return data, total
+        return PaginatedResponse.create(
+            data=data,
+            total=total,
+            pagination=pagination,
+            has_more=has_more,
+            next_cursor=next_cursor,
+            total_is_estimate=total_is_estimate,
+        )
@@ -0,0 +1,123 @@
+"""Shared filters and SELECT builders for order listings, item listings and their Excel exports."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from fastapi import Query
+from sqlalchemy import func, or_, select
+from sqlalchemy.sql import Select
+
+from src.core.sql import escape_like
+from src.database.models import Customer, Item, Order, PaymentType, Product, Status
+
+
+def parse_optional_datetime(s: str | None):
+    """Parse ISO date/datetime string to timezone-aware datetime or None."""
+    if not s or not s.strip():
+        return None
+    raw = s.strip().replace("Z", "+00:00")
+    try:
+        dt = datetime.fromisoformat(raw)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=UTC)
+        return dt
+    except (ValueError, TypeError):
+        return None
+
+
+class OrderFilters:
+    """Order filter query params, applied identically to page, totals and exports."""
+
+    def __init__(
+        self,
+        order_no: int | None = Query(None, description="Номер заказа"),
+        customer_id: int | None = Query(None, description="ID клиента"),
+        customer_name: str | None = Query(None, description="Поиск по названию клиента или фирмы"),
+        status_code: str | None = Query(None, description="Статус заказа"),
+        scheduled_delivery_from: str | None = Query(None, description="Дата поставки с (ISO дата)"),
+        scheduled_delivery_to: str | None = Query(None, description="Дата поставки по (ISO дата)"),
+        login_agent: str | None = Query(None, description="Логин агента"),
+        login_expeditor: str | None = Query(None, description="Логин экспедитора"),
+        last_updated_by: str | None = Query(
+            None, description="Логин пользователя, выполнившего последнее изменение заказа"
+        ),
+    ) -> None:
+        self.order_no = order_no
+        self.customer_id = customer_id
+        self.customer_name = (customer_name or "").strip() or None
+        self.status_code = (status_code or "").strip() or None
+        self.scheduled_delivery_from = parse_optional_datetime(scheduled_delivery_from)
+        self.scheduled_delivery_to = parse_optional_datetime(scheduled_delivery_to)
+        self.login_agent = (login_agent or "").strip() or None
+        self.login_expeditor = (login_expeditor or "").strip() or None
+        self.last_updated_by = (last_updated_by or "").strip() or None
+
+    def apply(self, query: Select) -> Select:
+        """Add WHERE clauses; ``query`` must already join Order and (outer) Customer."""
+        if self.order_no is not None:
+            query = query.where(Order.order_no == self.order_no)
+        if self.customer_id is not None:
+            query = query.where(Order.customer_id == self.customer_id)
+        if self.customer_name:
+            name = escape_like(self.customer_name)
+            query = query.where(or_(
+                Customer.name_client.ilike(f"%{name}%", escape="\\"),
+                Customer.firm_name.ilike(f"%{name}%", escape="\\"),
+            ))
+        if self.status_code:
+            query = query.where(Order.status_code == self.status_code)
+        if self.scheduled_delivery_from:
+            query = query.where(Order.scheduled_delivery_at >= self.scheduled_delivery_from)
+        if self.scheduled_delivery_to:
+            query = query.where(Order.scheduled_delivery_at <= self.scheduled_delivery_to)
+        if self.login_agent:
+            query = query.where(Customer.login_agent == self.login_agent)
+        if self.login_expeditor:
+            query = query.where(Customer.login_expeditor == self.login_expeditor)
+        if self.last_updated_by:
+            query = query.where(Order.last_updated_by == self.last_updated_by)
+        return query
+
+
+ORDER_AMOUNT = func.coalesce(Order.total_amount, 0)
+ITEM_AMOUNT = Item.quantity * func.coalesce(Item.price, 0)
+
+
+def orders_query(filters: OrderFilters) -> Select:
+    """Rows of (Order, Customer, Status, PaymentType) matching ``filters``; no ORDER BY."""
+    query = (
+        select(Order, Customer, Status, PaymentType)
+        .outerjoin(Customer, Order.customer_id == Customer.id)
+        .outerjoin(Status, Order.status_code == Status.code)
+        .outerjoin(PaymentType, Order.payment_type_code == PaymentType.code)
+    )
+    return filters.apply(query)
+
+
+def order_items_query(filters: OrderFilters) -> Select:
+    """(Item, Order, Customer, Product, Status, PaymentType) rows matching ``filters``."""
+    query = (
+        select(Item, Order, Customer, Product, Status, PaymentType)
+        .join(Order, Item.order_id == Order.order_no)
+        .outerjoin(Customer, Order.customer_id == Customer.id)
+        .outerjoin(Product, Item.product_code == Product.code)
+        .outerjoin(Status, Order.status_code == Status.code)
+        .outerjoin(PaymentType, Order.payment_type_code == PaymentType.code)
+    )
+    return filters.apply(query)
+
+
+def with_window_totals(query: Select, amount) -> Select:
+    """Append COUNT(*) OVER () and SUM(amount) OVER (): each row carries the filtered totals."""
+    return query.add_columns(
+        func.count().over().label("window_total_count"),
+        func.sum(amount).over().label("window_total_amount"),
+    )
+
+
+def totals_query(query: Select, amount) -> Select:
+    """One aggregate (count, sum) over the filtered set, for when no page row has window totals."""
+    return query.with_only_columns(
+        func.count(), func.sum(amount), maintain_column_froms=True
+    ).order_by(None)
@@ -1,18 +1,47 @@
 ﻿from __future__ import annotations
 
+import uuid
+from collections import Counter
 from datetime import datetime, timezone
+from decimal import Decimal
 
 from fastapi import HTTPException
-from sqlalchemy import func, select
+from sqlalchemy import Integer, Numeric, column, delete, func, insert, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from src.database.models import Customer, Item, Order, PaymentType, Product, Status, User, Warehouse
+from src.api.v1.services.reference_data import REFERENCE_DATA
+from src.core.exceptions import ConflictError
+from src.database.models import Customer, Item, Order, Product, User, Warehouse
 
 
 def _now_utc() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _diff_item_set(current: dict, desired: list[dict]) -> tuple[list[dict], list[dict], list]:
+    """Turn a desired item set into (add, update, delete) against ``current``.
+
+    ``current`` maps item_id to product_code. A line whose product_code changed is re-created
+    rather than updated.
+    """
+    to_add: list[dict] = []
+    to_update: list[dict] = []
+    kept: set = set()
+    for item in desired:
+        item_id = item.get("id")
+        if item_id is None or item_id not in current or current[item_id] != item["product_code"]:
+            to_add.append(item)
+            continue
+        kept.add(item_id)
+        to_update.append(
+            {"id": item_id, "quantity": item.get("quantity"), "price": item.get("price")}
+        )
+    to_delete = [item_id for item_id in current if item_id not in kept]
+    return to_add, to_update, to_delete
+
+
 def _parse_optional_datetime(raw: str | None) -> datetime | None:
     if not raw or not raw.strip():
         return None
@@ -36,14 +65,18 @@ class OrderService:
         if status_code is None:
             return False
         code_str = str(status_code).strip().lower()
-        st_result = await self.db.execute(select(Status).where(Status.code == status_code))
-        st_row = st_result.scalar_one_or_none()
-        name_lower = ((st_row.name or "") + " " + code_str).strip().lower() if st_row else code_str
+        status_name = (await REFERENCE_DATA.statuses(self.db)).get(status_code)
+        name_lower = (
+            ((status_name or "") + " " + code_str).strip().lower()
+            if status_name is not None
+            else code_str
+        )
         return code_str in ("2", "delivery") or any(
             marker in name_lower for marker in ("deliver", "delivery", "shipping")
         )
 
-    async def create_order(self, payload: dict, created_by: str) -> tuple[dict, dict | None]:
+    async def _new_order(self, payload: dict, created_by: str) -> Order:
+        """Validate the header and add a new Order (not flushed) with the next order_no."""
         status_code = payload.get("status_code") or "open"
         scheduled_delivery_at = _parse_optional_datetime(payload.get("scheduled_delivery_at"))
         if await self.is_delivery_status(status_code) and scheduled_delivery_at is None:
@@ -63,103 +96,339 @@ class OrderService:
             scheduled_delivery_at=scheduled_delivery_at,
         )
         self.db.add(order)
+        return order
+
+    async def _new_order_notification(self, order: Order) -> dict | None:
+        if not order.customer_id:
+            return None
+        customer_result = await self.db.execute(
+            select(Customer).where(Customer.id == order.customer_id)
+        )
+        customer = customer_result.scalar_one_or_none()
+        if not customer or not customer.login_expeditor:
+            return None
+        customer_name = (customer.name_client or customer.firm_name or "").strip()
+        return {
+            "order_no": order.order_no,
+            "customer_name": customer_name,
+            "total_amount": order.total_amount,
+            "scheduled_delivery_at": order.scheduled_delivery_at,
+            "expeditor_login": customer.login_expeditor,
+        }
+
+    async def create_order(self, payload: dict, created_by: str) -> tuple[dict, dict | None]:
+        order = await self._new_order(payload, created_by)
         await self.db.commit()
         await self.db.refresh(order)
 
-        notify_payload = None
-        if order.customer_id:
-            customer_result = await self.db.execute(select(Customer).where(Customer.id == order.customer_id))
-            customer = customer_result.scalar_one_or_none()
-            if customer and customer.login_expeditor:
-                customer_name = (customer.name_client or customer.firm_name or "").strip()
-                notify_payload = {
-                    "order_no": order.order_no,
-                    "customer_name": customer_name,
-                    "total_amount": order.total_amount,
-                    "scheduled_delivery_at": order.scheduled_delivery_at,
-                    "expeditor_login": customer.login_expeditor,
+        notify_payload = await self._new_order_notification(order)
+        return (
+            {
+                "id": order.order_no,
+                "order_no": order.order_no,
+                "status_code": order.status_code,
+                "message": "created",
+            },
+            notify_payload,
+        )
+
+    async def _priced_items(self, items: list[dict]) -> list[dict]:
+        """Check products exist (one query) and fill missing prices from the catalog."""
+        for item in items:
+            if not item.get("quantity") or item["quantity"] <= 0:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Количество для {item.get('product_code')} должно быть больше 0",
+                )
+            if item.get("price") is not None and item["price"] < 0:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Цена для {item.get('product_code')} не может быть отрицательной",
+                )
+
+        codes = {item["product_code"] for item in items}
+        result = await self.db.execute(
+            select(Product.code, Product.price).where(Product.code.in_(codes))
+        )
+        catalog = {code: price for code, price in result.all()}
+        missing = sorted(codes - catalog.keys())
+        if missing:
+            raise HTTPException(status_code=422, detail="Товар не найден: " + ", ".join(missing))
+
+        priced = []
+        for item in items:
+            price = item.get("price")
+            price = Decimal(str(price)) if price is not None else catalog[item["product_code"]]
+            priced.append(
+                {"product_code": item["product_code"], "quantity": item["quantity"], "price": price}
+            )
+        return priced
+
+    async def create_order_full(self, payload: dict, created_by: str) -> tuple[dict, dict | None]:
+        """Order header, items and total_amount in one transaction (one commit)."""
+        items = await self._priced_items(payload.get("items") or [])
+        order = await self._new_order(payload, created_by)
+        order.total_amount = sum(((i["price"] or 0) * i["quantity"] for i in items), Decimal("0"))
+        await self.db.flush()
+        # One multi-row INSERT ... VALUES (...), (...) for all positions.
+        await self.db.execute(
+            insert(Item).values([
+                {
+                    "id": uuid.uuid4(),
+                    "order_id": order.order_no,
+                    "product_code": i["product_code"],
+                    "quantity": i["quantity"],
+                    "price": i["price"],
+                    "last_updated_by": created_by,
                 }
+                for i in items
+            ])
+        )
+        await self.db.commit()
+        await self.db.refresh(order)
 
+        notify_payload = await self._new_order_notification(order)
         return (
-            {"id": order.order_no, "order_no": order.order_no, "status_code": order.status_code, "message": "created"},
+            {
+                "id": order.order_no,
+                "order_no": order.order_no,
+                "status_code": order.status_code,
+                "total_amount": float(order.total_amount or 0),
+                "items_count": len(items),
+                "message": "created",
+            },
             notify_payload,
         )
 
-    async def get_order(self, order_id: int) -> dict:
-        result = await self.db.execute(select(Order).where(Order.order_no == order_id))
+    async def replace_order_items(self, order_id: int, payload: dict, updated_by: str) -> dict:
+        """Apply an item diff (or a desired item set) in one transaction, recount total_amount once.
+
+        ``payload["items"]`` is the full desired set (entries with ``id`` are kept/updated, others
+        added, missing ones deleted); otherwise ``add`` / ``update`` / ``delete`` are applied
+        as given.
+        ``last_updated_at``, when sent, must equal the order's current value (optimistic lock).
+        """
+        result = await self.db.execute(
+            select(Order).where(Order.order_no == order_id).with_for_update()
+        )
         order = result.scalar_one_or_none()
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
+        if "last_updated_at" in payload:
+            expected = _parse_optional_datetime(payload.get("last_updated_at"))
+            if payload.get("last_updated_at") and expected is None:
+                raise HTTPException(status_code=422, detail="Некорректный last_updated_at")
+            if expected != order.last_updated_at:
+                raise ConflictError(
+                    "Заказ изменён другим пользователем, обновите данные и повторите"
+                )
+
+        current_result = await self.db.execute(
+            select(Item.id, Item.product_code).where(Item.order_id == order_id)
+        )
+        current = {item_id: product_code for item_id, product_code in current_result.all()}
+        if payload.get("items") is not None:
+            to_add, to_update, to_delete = _diff_item_set(current, payload["items"])
+        else:
+            to_add = payload.get("add") or []
+            to_update = payload.get("update") or []
+            to_delete = list(payload.get("delete") or [])
+        referenced = Counter([*(u["id"] for u in to_update), *to_delete])
+        repeated = sorted(str(i) for i, times in referenced.items() if times > 1)
+        if repeated:
+            raise HTTPException(
+                status_code=400, detail="Позиции указаны несколько раз: " + ", ".join(repeated)
+            )
+        unknown = {str(i) for i in referenced if i not in current}
+        if unknown:
+            raise HTTPException(
+                status_code=422,
+                detail="Позиции не относятся к заказу: " + ", ".join(sorted(unknown)),
+            )
+        for patch in to_update:
+            if patch.get("quantity") is not None and patch["quantity"] <= 0:
+                raise HTTPException(status_code=422, detail="Количество должно быть больше 0")
+            if patch.get("price") is not None and patch["price"] < 0:
+                raise HTTPException(status_code=422, detail="Цена не может быть отрицательной")
+        added = await self._priced_items(to_add) if to_add else []
 
-        customer_result = await self.db.execute(select(Customer).where(Customer.id == order.customer_id)) if order.customer_id else None
-        customer = customer_result.scalar_one_or_none() if customer_result else None
-
-        agent_fio = expeditor_fio = None
-        if customer:
-            if customer.login_agent:
-                agent_user_result = await self.db.execute(select(User).where(User.login == customer.login_agent))
-                agent_user = agent_user_result.scalar_one_or_none()
-                agent_fio = agent_user.fio if agent_user else None
-            if customer.login_expeditor:
-                exp_user_result = await self.db.execute(select(User).where(User.login == customer.login_expeditor))
-                exp_user = exp_user_result.scalar_one_or_none()
-                expeditor_fio = exp_user.fio if exp_user else None
-
-        warehouse_from_expeditor = None
-        if customer and customer.login_expeditor:
-            warehouse_result = await self.db.execute(
-                select(Warehouse.code).where(Warehouse.expeditor_login == customer.login_expeditor).limit(1)
+        now = _now_utc()
+        if to_delete:
+            await self.db.execute(
+                delete(Item)
+                .where(Item.order_id == order_id, Item.id.in_(to_delete))
+                .execution_options(synchronize_session=False)
+            )
+        if to_update:
+            patch_rows = values(
+                column("id", PG_UUID(as_uuid=True)),
+                column("quantity", Integer),
+                column("price", Numeric(18, 2)),
+                name="patch",
+            ).data([(u["id"], u.get("quantity"), u.get("price")) for u in to_update])
+            await self.db.execute(
+                update(Item)
+                .where(Item.id == patch_rows.c.id, Item.order_id == order_id)
+                .values(
+                    quantity=func.coalesce(patch_rows.c.quantity, Item.quantity),
+                    price=func.coalesce(patch_rows.c.price, Item.price),
+                    last_updated_by=updated_by,
+                    last_updated_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            )
+        if added:
+            await self.db.execute(
+                insert(Item).values([
+                    {
+                        "id": uuid.uuid4(),
+                        "order_id": order_id,
+                        "product_code": i["product_code"],
+                        "quantity": i["quantity"],
+                        "price": i["price"],
+                        "last_updated_by": updated_by,
+                    }
+                    for i in added
+                ])
             )
-            warehouse_from_expeditor = warehouse_result.scalar_one_or_none()
+        total = (
+            select(func.coalesce(func.sum(Item.quantity * func.coalesce(Item.price, 0)), 0))
+            .where(Item.order_id == order_id)
+            .scalar_subquery()
+        )
+        order.total_amount = total
+        order.last_updated_at = now
+        order.last_updated_by = updated_by
+        await self.db.commit()
+        await self.db.refresh(order)
+        return await self.get_order(order_id)
 
-        status_name = None
-        if order.status_code:
-            status_result = await self.db.execute(select(Status.name).where(Status.code == order.status_code))
-            status_name = status_result.scalar_one_or_none()
+    async def touch_order(self, order_id: int, updated_by: str) -> None:
+        """Bump the order's last_updated_at (optimistic-lock token) in the caller's transaction."""
+        await self.db.execute(
+            update(Order)
+            .where(Order.order_no == order_id)
+            .values(last_updated_at=_now_utc(), last_updated_by=updated_by)
+            .execution_options(synchronize_session=False)
+        )
 
-        payment_type_name = None
-        if order.payment_type_code:
-            payment_result = await self.db.execute(select(PaymentType.name).where(PaymentType.code == order.payment_type_code))
-            payment_type_name = payment_result.scalar_one_or_none()
+    @staticmethod
+    def _order_detail_query():
+        """Order with its customer, agent/expeditor FIO and the expeditor's warehouse in one row."""
+        agent = aliased(User)
+        expeditor = aliased(User)
+        expeditor_warehouse = (
+            select(Warehouse.code)
+            .where(Warehouse.expeditor_login == Customer.login_expeditor)
+            .limit(1)
+            .correlate(Customer)
+            .scalar_subquery()
+        )
+        return (
+            select(Order, Customer, agent.fio, expeditor.fio, expeditor_warehouse)
+            .outerjoin(Customer, Customer.id == Order.customer_id)
+            .outerjoin(agent, agent.login == Customer.login_agent)
+            .outerjoin(expeditor, expeditor.login == Customer.login_expeditor)
+        )
 
+    async def _items_by_order(self, order_nos: list[int]) -> dict[int, list[dict]]:
         items_result = await self.db.execute(
-            select(Item, Product).outerjoin(Product, Product.code == Item.product_code).where(Item.order_id == order.order_no)
+            select(Item, Product.name)
+            .outerjoin(Product, Product.code == Item.product_code)
+            .where(Item.order_id.in_(order_nos))
         )
-        item_rows = items_result.all()
-
-        return {
-            "id": order.order_no,
-            "order_no": order.order_no,
-            "customer_id": order.customer_id,
-            "customer_name": (customer.name_client or customer.firm_name or "") if customer else None,
-            "order_date": order.order_date.isoformat() if order.order_date else None,
-            "status_code": order.status_code,
-            "status_name": status_name,
-            "total_amount": float(order.total_amount) if order.total_amount else None,
-            "payment_type_code": order.payment_type_code,
-            "payment_type_name": payment_type_name,
-            "created_by": order.created_by,
-            "login_agent": customer.login_agent if customer else None,
-            "login_expeditor": customer.login_expeditor if customer else None,
-            "warehouse_from_expeditor": warehouse_from_expeditor,
-            "agent_fio": agent_fio,
-            "expeditor_fio": expeditor_fio,
-            "scheduled_delivery_at": order.scheduled_delivery_at.isoformat() if order.scheduled_delivery_at else None,
-            "status_delivery_at": order.status_delivery_at.isoformat() if order.status_delivery_at else None,
-            "closed_at": order.closed_at.isoformat() if order.closed_at else None,
-            "last_updated_at": order.last_updated_at.isoformat() if order.last_updated_at else None,
-            "last_updated_by": order.last_updated_by,
-            "items": [
+        items: dict[int, list[dict]] = {order_no: [] for order_no in order_nos}
+        for item, product_name in items_result.all():
+            items[item.order_id].append(
                 {
                     "id": str(item.id),
                     "product_code": item.product_code,
-                    "product_name": product.name if product else None,
+                    "product_name": product_name,
                     "quantity": item.quantity,
                     "price": float(item.price) if item.price else None,
                 }
-                for item, product in item_rows
-            ],
-        }
+            )
+        return items
+
+    async def _order_details(self, rows, items: dict[int, list[dict]]) -> list[dict]:
+        statuses = await REFERENCE_DATA.statuses(self.db)
+        payment_types = await REFERENCE_DATA.payment_types(self.db)
+        details = []
+        for order, customer, agent_fio, expeditor_fio, warehouse_from_expeditor in rows:
+            details.append(
+                {
+                    "id": order.order_no,
+                    "order_no": order.order_no,
+                    "customer_id": order.customer_id,
+                    "customer_name": (
+                        (customer.name_client or customer.firm_name or "") if customer else None
+                    ),
+                    "customer_address": customer.address if customer else None,
+                    "customer_phone": customer.phone if customer else None,
+                    "customer_latitude": (
+                        float(customer.latitude)
+                        if customer and customer.latitude is not None
+                        else None
+                    ),
+                    "customer_longitude": (
+                        float(customer.longitude)
+                        if customer and customer.longitude is not None
+                        else None
+                    ),
+                    "order_date": order.order_date.isoformat() if order.order_date else None,
+                    "status_code": order.status_code,
+                    "status_name": statuses.get(order.status_code) if order.status_code else None,
+                    "total_amount": float(order.total_amount) if order.total_amount else None,
+                    "payment_type_code": order.payment_type_code,
+                    "payment_type_name": (
+                        payment_types.get(order.payment_type_code)
+                        if order.payment_type_code
+                        else None
+                    ),
+                    "created_by": order.created_by,
+                    "login_agent": customer.login_agent if customer else None,
+                    "login_expeditor": customer.login_expeditor if customer else None,
+                    "warehouse_from_expeditor": warehouse_from_expeditor,
+                    "agent_fio": agent_fio,
+                    "expeditor_fio": expeditor_fio,
+                    "scheduled_delivery_at": (
+                        order.scheduled_delivery_at.isoformat()
+                        if order.scheduled_delivery_at
+                        else None
+                    ),
+                    "status_delivery_at": (
+                        order.status_delivery_at.isoformat() if order.status_delivery_at else None
+                    ),
+                    "closed_at": order.closed_at.isoformat() if order.closed_at else None,
+                    "last_updated_at": (
+                        order.last_updated_at.isoformat() if order.last_updated_at else None
+                    ),
+                    "last_updated_by": order.last_updated_by,
+                    "items": items.get(order.order_no, []),
+                }
+            )
+        return details
+
+    async def get_order(self, order_id: int) -> dict:
+        result = await self.db.execute(self._order_detail_query().where(Order.order_no == order_id))
+        row = result.first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Order not found")
+        (detail,) = await self._order_details([row], await self._items_by_order([order_id]))
+        return detail
+
+    async def get_orders_batch(self, order_ids: list[int]) -> tuple[list[dict], list[int]]:
+        """Details of several orders in two queries: (orders in request order, missing numbers)."""
+        order_ids = list(dict.fromkeys(order_ids))
+        result = await self.db.execute(
+            self._order_detail_query().where(Order.order_no.in_(order_ids))
+        )
+        rows = {row[0].order_no: row for row in result.all()}
+        found = [rows[order_no] for order_no in order_ids if order_no in rows]
+        details = await self._order_details(
+            found, await self._items_by_order(list(rows)) if rows else {}
+        )
+        return details, [order_no for order_no in order_ids if order_no not in rows]
 
     async def update_order(self, order_id: int, payload: dict, updated_by: str) -> tuple[dict, dict | None]:
         result = await self.db.execute(select(Order).where(Order.order_no == order_id))
@@ -182,10 +451,13 @@ class OrderService:
             order.customer_id = payload.get("customer_id")
         if "status_code" in payload:
             order.status_code = payload.get("status_code")
-            status_result = await self.db.execute(select(Status).where(Status.code == payload.get("status_code")))
-            status_obj = status_result.scalar_one_or_none()
+            status_name = (await REFERENCE_DATA.statuses(self.db)).get(payload.get("status_code"))
             code_str = str(payload.get("status_code") or "").strip().lower()
-            name_lower = ((status_obj.name or "") + " " + code_str).strip().lower() if status_obj else code_str
+            name_lower = (
+                ((status_name or "") + " " + code_str).strip().lower()
+                if status_name is not None
+                else code_str
+            )
             is_delivery_status = code_str in ("2", "delivery") or any(
                 marker in name_lower for marker in ("deliver", "delivery", "shipping")
             )
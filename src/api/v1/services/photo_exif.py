@@ -0,0 +1,213 @@
+"""EXIF of customer photos: capture time, GPS position and orientation, read in the background.
+
+After an upload the file is parsed in a small thread pool (``EXIF_WORKERS``) and the row is
+updated in its own session; ``python -m src.scripts.backfill_photo_exif`` does the same for
+photos stored before migration 055.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta, timezone, tzinfo
+from decimal import Decimal
+from pathlib import Path
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.v1.services.photo_storage import PhotoStorage
+from src.core.config import settings
+from src.database.connection import async_session
+
+logger = logging.getLogger(__name__)
+
+_EXIF_DATETIME_FORMAT = "%Y:%m:%d %H:%M:%S"
+_STORE_SQL = text(
+    """
+    UPDATE "Sales".customer_photo
+    SET photo_datetime = COALESCE(:taken_at, photo_datetime),
+        latitude = :latitude,
+        longitude = :longitude,
+        exif_orientation = :orientation,
+        exif_checked_at = now()
+    WHERE id = :id
+    """
+)
+
+_executor: ThreadPoolExecutor | None = None
+# Strong references to background extractions, so they are not garbage-collected mid-flight
+_background_tasks: set[asyncio.Task] = set()
+
+
+@dataclass(frozen=True)
+class PhotoExif:
+    taken_at: datetime | None = None
+    latitude: Decimal | None = None
+    longitude: Decimal | None = None
+    orientation: int | None = None
+
+
+def _local_zone() -> tzinfo:
+    try:
+        return ZoneInfo(settings.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        return UTC
+
+
+def _parse_offset(value) -> tzinfo | None:
+    """EXIF OffsetTime* value such as ``+05:00``."""
+    if not isinstance(value, str):
+        return None
+    raw = value.strip("\x00 ")
+    if len(raw) != 6 or raw[0] not in "+-" or raw[3] != ":":
+        return None
+    try:
+        delta = timedelta(hours=int(raw[1:3]), minutes=int(raw[4:6]))
+    except ValueError:
+        return None
+    return timezone(-delta if raw[0] == "-" else delta)
+
+
+def _parse_datetime(value, offset=None) -> datetime | None:
+    """EXIF date/time as an aware datetime.
+
+    EXIF stores the camera's wall-clock time without a zone: the matching ``OffsetTime*`` tag
+    is used when the camera wrote one, otherwise the business time zone (``TIMEZONE``), the
+    one the agents' phones are set to. A naive value would be read by Postgres in the session
+    time zone.
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.strptime(value.strip("\x00 ")[:19], _EXIF_DATETIME_FORMAT)
+    except ValueError:
+        return None  # "0000:00:00 00:00:00" and other camera placeholders
+    return parsed.replace(tzinfo=_parse_offset(offset) or _local_zone())
+
+
+def _degrees(dms, ref, limit: int) -> Decimal | None:
+    try:
+        degrees, minutes, seconds = (float(part) for part in dms)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    value = degrees + minutes / 60 + seconds / 3600
+    if str(ref or "").strip("\x00 ").upper() in ("S", "W"):
+        value = -value
+    if not -limit <= value <= limit:
+        return None
+    return Decimal(f"{value:.6f}")
+
+
+def read_exif(path: str | Path) -> PhotoExif:
+    """Capture data of one image file; fields missing in it (or an unreadable file) are None."""
+    from PIL import ExifTags, Image, UnidentifiedImageError
+
+    try:
+        with Image.open(path) as image:
+            exif = image.getexif()
+    except (OSError, UnidentifiedImageError, ValueError):
+        return PhotoExif()
+    details = exif.get_ifd(ExifTags.IFD.Exif)
+    gps = exif.get_ifd(ExifTags.IFD.GPSInfo)
+
+    taken_at = next(
+        (
+            parsed
+            for raw, offset in (
+                (
+                    details.get(ExifTags.Base.DateTimeOriginal),
+                    details.get(ExifTags.Base.OffsetTimeOriginal),
+                ),
+                (
+                    details.get(ExifTags.Base.DateTimeDigitized),
+                    details.get(ExifTags.Base.OffsetTimeDigitized),
+                ),
+                (exif.get(ExifTags.Base.DateTime), details.get(ExifTags.Base.OffsetTime)),
+            )
+            if (parsed := _parse_datetime(raw, offset)) is not None
+        ),
+        None,
+    )
+    latitude = _degrees(
+        gps.get(ExifTags.GPS.GPSLatitude), gps.get(ExifTags.GPS.GPSLatitudeRef), 90
+    )
+    longitude = _degrees(
+        gps.get(ExifTags.GPS.GPSLongitude), gps.get(ExifTags.GPS.GPSLongitudeRef), 180
+    )
+    if latitude is None or longitude is None or (latitude == 0 and longitude == 0):
+        latitude = longitude = None  # 0/0 is what phones write without a fix
+    orientation = exif.get(ExifTags.Base.Orientation)
+    return PhotoExif(
+        taken_at=taken_at,
+        latitude=latitude,
+        longitude=longitude,
+        orientation=orientation if isinstance(orientation, int) and 1 <= orientation <= 8 else None,
+    )
+
+
+async def store_exif(session: AsyncSession, results: list[tuple[int, PhotoExif]]) -> None:
+    """One executemany UPDATE; the caller commits."""
+    if not results:
+        return
+    await session.execute(
+        _STORE_SQL,
+        [
+            {
+                "id": photo_id,
+                "taken_at": exif.taken_at,
+                "latitude": exif.latitude,
+                "longitude": exif.longitude,
+                "orientation": exif.orientation,
+            }
+            for photo_id, exif in results
+        ],
+    )
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.exif_workers), thread_name_prefix="photo-exif"
+        )
+    return _executor
+
+
+def shutdown_exif_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def extract_photo_exif(photo_id: int, storage: PhotoStorage, key: str) -> PhotoExif:
+    try:
+        async with storage.local_copy(key) as path:
+            exif = await asyncio.get_running_loop().run_in_executor(
+                _get_executor(), read_exif, path
+            )
+    except FileNotFoundError:
+        exif = PhotoExif()
+    async with async_session() as session:
+        await store_exif(session, [(photo_id, exif)])
+        await session.commit()
+    return exif
+
+
+def schedule_exif(photo_id: int, storage: PhotoStorage, key: str) -> None:
+    """Queue EXIF extraction for a just-uploaded photo without delaying the response."""
+    task = asyncio.create_task(extract_photo_exif(photo_id, storage, key))
+    _background_tasks.add(task)
+
+    def _done_callback(done_task: asyncio.Task) -> None:
+        _background_tasks.discard(done_task)
+        if done_task.cancelled():
+            return
+        if (exc := done_task.exception()) is not None:
+            logger.error("EXIF extraction failed for photo %s", photo_id, exc_info=exc)
+
+    task.add_done_callback(_done_callback)
@@ -0,0 +1,245 @@
+"""Garbage collection of photo files no row points at any more.
+
+Deleted photos, replaced product photos and interrupted uploads leave names, blobs, thumbnails
+and temp files behind. ``collect_garbage`` scans the local storage tree (fan-out directories are
+walked in a thread pool), diffs the names against the set of ``photo_path`` values read with a
+single query, and moves orphans to ``.quarantine/<run>/`` keeping their relative path, so a
+mistake is undone with ``mv``. Quarantine runs older than ``keep_days`` are deleted for good.
+
+A blob is an orphan once no name links to it (``st_nlink == 1``); names sitting in quarantine
+still hold their blob, so blobs are only collected after the quarantine holding them is purged.
+Files younger than the grace period are never touched: an upload links its file before the row
+is committed. Bytes are "reclaimed" when the last link of an inode is removed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.v1.services.photo_storage import (
+    BLOB_DIR_NAME,
+    INCOMING_DIR_NAME,
+    PhotoStorage,
+    storage_key,
+)
+from src.api.v1.services.photo_thumbnails import THUMBNAIL_DIR_NAME
+
+QUARANTINE_DIR_NAME = ".quarantine"
+LEGACY_QUARANTINE_PREFIX = "_legacy"
+_RUN_FORMAT = "%Y%m%d-%H%M%S"
+
+LIVE_PATHS_SQL = text(
+    """
+    SELECT photo_path FROM "Sales".customer_photo WHERE photo_path IS NOT NULL
+    UNION
+    SELECT photo_path FROM "Sales".product WHERE photo_path IS NOT NULL
+    """
+)
+
+
+@dataclass(frozen=True)
+class ScannedFile:
+    path: Path
+    relative: str  # path under the storage root, or ``_legacy/<n>/<name>`` for legacy directories
+    kind: str  # "photo" | "legacy" | "blob" | "thumb" | "incoming"
+    size: int
+    nlink: int
+    ctime: float
+
+
+@dataclass
+class GcReport:
+    scanned: int = 0
+    orphans: list[ScannedFile] = field(default_factory=list)
+    quarantined_bytes: int = 0
+    purged_runs: int = 0
+    reclaimed_bytes: int = 0
+
+
+def _scanned(path: Path, relative: str, kind: str) -> ScannedFile | None:
+    try:
+        stat = path.stat(follow_symlinks=False)
+    except FileNotFoundError:
+        return None  # removed meanwhile
+    return ScannedFile(path, relative, kind, stat.st_size, stat.st_nlink, stat.st_ctime)
+
+
+def _scan_dir(directory: Path, root: Path, kind: str, prefix: str = "") -> list[ScannedFile]:
+    files = []
+    stack = [directory]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(Path(entry.path))
+            elif entry.is_file(follow_symlinks=False):
+                path = Path(entry.path)
+                item = _scanned(path, prefix + path.relative_to(root).as_posix(), kind)
+                if item is not None:
+                    files.append(item)
+    return files
+
+
+def scan_storage(storage: PhotoStorage, workers: int = 8) -> list[ScannedFile]:
+    """Every file of the local storage tree; top-level directories are walked in parallel."""
+    special = {BLOB_DIR_NAME: "blob", THUMBNAIL_DIR_NAME: "thumb", INCOMING_DIR_NAME: "incoming"}
+    jobs: list[tuple[Path, Path, str, str]] = []
+    files: list[ScannedFile] = []
+    if storage.root.is_dir():
+        for entry in os.scandir(storage.root):
+            if entry.name == QUARANTINE_DIR_NAME:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                jobs.append((Path(entry.path), storage.root, special.get(entry.name, "photo"), ""))
+            elif entry.is_file(follow_symlinks=False) and (
+                item := _scanned(Path(entry.path), entry.name, "photo")
+            ):
+                files.append(item)
+    for index, directory in enumerate(storage.legacy_dirs):
+        if directory.is_dir() and directory.resolve() != storage.root.resolve():
+            jobs.append((directory, directory, "legacy", f"{LEGACY_QUARANTINE_PREFIX}/{index}/"))
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="photo-gc") as pool:
+        for chunk in pool.map(lambda job: _scan_dir(*job), jobs):
+            files.extend(chunk)
+    return files
+
+
+def _thumbnail_stem(name: str) -> str:
+    # <stem>_<size>_<digest>.<ext>, see photo_thumbnails.thumbnail_for
+    return Path(name).stem.rsplit("_", 2)[0]
+
+
+def find_orphans(
+    files: Iterable[ScannedFile], live_paths: Iterable[str], *, older_than: float
+) -> list[ScannedFile]:
+    """Files not referenced by any ``photo_path`` and last linked before ``older_than`` (epoch)."""
+    live = {path.strip().lstrip("/") for path in live_paths if path and path.strip()}
+    live_stems = {Path(path).stem for path in live}
+    orphans = []
+    for item in files:
+        if item.ctime >= older_than:
+            continue
+        name = item.path.name
+        if item.kind == "photo":
+            # A bare photo_path resolves in the flat directory and at its fan-out key
+            referenced = item.relative in live or (
+                name in live and item.relative in (name, storage_key(name))
+            )
+        elif item.kind == "legacy":
+            referenced = name in live
+        elif item.kind == "blob":
+            referenced = item.nlink > 1
+        elif item.kind == "thumb":
+            referenced = _thumbnail_stem(name) in live_stems
+        else:  # temp file of an upload that never finished
+            referenced = False
+        if not referenced:
+            orphans.append(item)
+    return orphans
+
+
+def _unlink(path: Path) -> int:
+    """Remove ``path``; the byte count it frees (0 while other hard links keep the inode)."""
+    try:
+        stat = path.stat()
+        path.unlink()
+    except FileNotFoundError:
+        return 0
+    return stat.st_size if stat.st_nlink == 1 else 0
+
+
+def quarantine(storage: PhotoStorage, orphans: Iterable[ScannedFile], run: str) -> tuple[int, int]:
+    """Move orphans under ``.quarantine/<run>/``, temp files are deleted right away.
+
+    Returns (bytes quarantined, bytes reclaimed).
+    """
+    moved = reclaimed = 0
+    target_root = storage.root / QUARANTINE_DIR_NAME / run
+    for item in orphans:
+        if item.kind == "incoming":
+            reclaimed += _unlink(item.path)
+            continue
+        target = target_root / item.relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            shutil.move(item.path, target)
+        except FileNotFoundError:
+            continue
+        moved += item.size
+    return moved, reclaimed
+
+
+def purge_quarantine(storage: PhotoStorage, *, keep_days: float, now: datetime) -> tuple[int, int]:
+    """Delete quarantine runs older than ``keep_days``; (runs purged, bytes reclaimed)."""
+    base = storage.root / QUARANTINE_DIR_NAME
+    if not base.is_dir():
+        return 0, 0
+    runs = reclaimed = 0
+    for run_dir in sorted(base.iterdir()):
+        try:
+            started = datetime.strptime(run_dir.name, _RUN_FORMAT)
+        except ValueError:
+            continue  # not ours
+        if (now - started).total_seconds() < keep_days * 86400:
+            continue
+        for path in sorted(run_dir.rglob("*"), reverse=True):
+            if path.is_dir():
+                path.rmdir()
+            else:
+                reclaimed += _unlink(path)
+        run_dir.rmdir()
+        runs += 1
+    return runs, reclaimed
+
+
+async def load_live_paths(session: AsyncSession) -> set[str]:
+    return set((await session.execute(LIVE_PATHS_SQL)).scalars())
+
+
+async def collect_garbage(
+    storage: PhotoStorage,
+    session: AsyncSession,
+    *,
+    grace_seconds: float = 6 * 3600,
+    keep_days: float = 7,
+    workers: int = 8,
+    dry_run: bool = False,
+) -> GcReport:
+    started = time.time()
+    now = datetime.fromtimestamp(started)
+    report = GcReport()
+    if not dry_run:
+        report.purged_runs, report.reclaimed_bytes = purge_quarantine(
+            storage, keep_days=keep_days, now=now
+        )
+    # Scan first, read the rows after: a file stored during the scan is protected by the grace
+    # period, a row committed before the query is seen by it.
+    files = await asyncio.to_thread(scan_storage, storage, workers)
+    report.scanned = len(files)
+    report.orphans = find_orphans(
+        files, await load_live_paths(session), older_than=started - grace_seconds
+    )
+    if not dry_run:
+        report.quarantined_bytes, freed = quarantine(
+            storage, report.orphans, now.strftime(_RUN_FORMAT)
+        )
+        report.reclaimed_bytes += freed
+    else:
+        report.quarantined_bytes = sum(
+            item.size for item in report.orphans if item.kind != "incoming"
+        )
+    return report
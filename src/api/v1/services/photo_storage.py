@@ -0,0 +1,357 @@
+"""Photo storage: streaming uploads, content dedup and the local / S3-compatible backends.
+
+``photo_path`` holds a storage key ``<ab>/<cd>/<name>``: a collision-free name
+(``КОД_ДДММГГГГ_ЧЧММСС_<random>.ext``) under a two-level fan-out derived from the name's hash.
+Rows written before the fan-out keep a bare name until
+``python -m src.scripts.migrate_photo_storage`` moves them; a bare name resolves both in the flat
+directory and at its fan-out key, so links keep working while the migration runs.
+
+An upload is streamed in chunks to a temp file (size enforced and SHA-256 computed on the fly).
+The local backend renames it into ``blobs/<ab>/<sha256>.<ext>`` and hard-links the key to that
+blob, so identical uploads share one copy on disk; the S3 backend PUTs the object under the key.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+
+from src.core.config import settings
+from src.core.s3 import S3Client, S3Error
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+BLOB_DIR_NAME = "blobs"
+INCOMING_DIR_NAME = ".incoming"
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+LEGACY_UPLOAD_DIR = PROJECT_ROOT / "uploads" / "customer_photos"
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    key: str
+    size: int
+    sha256: str
+    deduplicated: bool
+
+
+def fanout(name: str) -> str:
+    digest = hashlib.sha256(name.encode()).hexdigest()
+    return f"{digest[:2]}/{digest[2:4]}"
+
+
+def storage_key(name: str) -> str:
+    """Key of a file name in the fan-out layout (also where a legacy bare name is migrated to)."""
+    return f"{fanout(name)}/{name}"
+
+
+def is_photo_key(key: str) -> bool:
+    """``key`` names a photo: ``<fan>/<out>/<name>`` at its own fan-out, or a legacy bare name.
+
+    Staging, quarantine and other internal paths never qualify.
+    """
+    parts = key.split("/")
+    if any(not part or part.startswith(".") for part in parts):
+        return False
+    return len(parts) == 1 or (len(parts) == 3 and f"{parts[0]}/{parts[1]}" == fanout(parts[2]))
+
+
+def new_photo_key(prefix: str, ext: str) -> str:
+    """Collision-free key: no existence probing, the random suffix makes every name unique."""
+    return storage_key(f"{prefix}_{uuid.uuid4().hex[:8]}.{ext.lower()}")
+
+
+def blob_path(root: Path, sha256: str, ext: str) -> Path:
+    return root / BLOB_DIR_NAME / sha256[:2] / f"{sha256}.{ext.lower()}"
+
+
+def _sha256_of(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link(source: Path, destination: Path) -> None:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, destination)
+    except FileExistsError:
+        raise
+    except OSError:
+        # Файловая система без жёстких ссылок: храним копию
+        shutil.copyfile(source, destination)
+
+
+async def _release_local(root: Path, path: Path) -> None:
+    """Remove a stored name, and its blob when no other name links to it any more."""
+    try:
+        links = path.stat().st_nlink
+    except FileNotFoundError:
+        return
+    blob = None
+    if links == 2:
+        candidate = blob_path(
+            root, await asyncio.to_thread(_sha256_of, path), path.suffix.lstrip(".")
+        )
+        if candidate.exists() and os.path.samefile(candidate, path):
+            blob = candidate
+    for target in (path, blob):
+        if target is None:
+            continue
+        try:
+            target.unlink(missing_ok=True)
+        except OSError:
+            logger.warning("Failed to delete photo file: %s", target)
+
+
+class PhotoStorage(ABC):
+    """Base backend. Files under ``root`` (or a legacy directory) are always served locally."""
+
+    remote = False
+
+    def __init__(self, root: Path, legacy_dirs: tuple[Path, ...] = ()) -> None:
+        self.root = root
+        self.legacy_dirs = legacy_dirs
+
+    def local_path(self, key: str) -> Path | None:
+        name = (key or "").strip().lstrip("/")
+        if not name or ".." in Path(name).parts:
+            return None
+        candidates = [self.root / name]
+        if "/" not in name:
+            candidates.append(self.root / storage_key(name))
+            candidates.extend(directory / name for directory in self.legacy_dirs)
+        return next((path for path in candidates if path.is_file()), None)
+
+    def version(self, key: str) -> str:
+        """Changes whenever the bytes behind ``key`` may have changed (thumbnail cache key)."""
+        path = self.local_path(key)
+        if path is None:
+            raise FileNotFoundError(key)
+        stat = path.stat()
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    @asynccontextmanager
+    async def local_copy(self, key: str) -> AsyncIterator[Path]:
+        """A readable local file with the content of ``key`` for the duration of the block."""
+        path = self.local_path(key)
+        if path is None:
+            raise FileNotFoundError(key)
+        yield path
+
+    async def exists(self, key: str) -> bool:
+        return self.local_path(key) is not None
+
+    async def remote_url(self, key: str) -> str | None:
+        return None
+
+    @abstractmethod
+    async def store(self, tmp: Path, key: str, sha256: str, content_type: str) -> bool:
+        """Move the finished temp file under ``key``; True when the content was already stored."""
+
+    @abstractmethod
+    async def import_file(self, source: Path, key: str, content_type: str) -> None:
+        """Copy an existing local file under ``key`` (used by the layout migration)."""
+
+    async def delete(self, key: str) -> None:
+        path = self.local_path(key)
+        if path is not None:
+            await _release_local(self.root, path)
+
+    async def aclose(self) -> None:
+        return None
+
+
+class LocalPhotoStorage(PhotoStorage):
+    async def store(self, tmp: Path, key: str, sha256: str, content_type: str) -> bool:
+        blob = blob_path(self.root, sha256, Path(key).suffix.lstrip("."))
+        deduplicated = blob.exists()
+        if not deduplicated:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp, blob)
+        _link(blob, self.root / key)
+        return deduplicated
+
+    async def import_file(self, source: Path, key: str, content_type: str) -> None:
+        destination = self.root / key
+        if destination.exists() and os.path.samefile(source, destination):
+            return  # повторный запуск миграции
+        # Жёсткая ссылка сохраняет связь с blob (дедупликация не теряется)
+        _link(source, destination)
+
+
+class S3PhotoStorage(PhotoStorage):
+    """Objects in an S3-compatible bucket under the same keys; no cross-upload dedup (no links)."""
+
+    remote = True
+
+    def __init__(
+        self, root: Path, client: S3Client, *, url_ttl: int, legacy_dirs: tuple[Path, ...] = ()
+    ) -> None:
+        super().__init__(root, legacy_dirs)
+        self.client = client
+        self.url_ttl = url_ttl
+
+    @staticmethod
+    def object_key(key: str) -> str:
+        key = key.strip().lstrip("/")
+        return key if "/" in key else storage_key(key)
+
+    def version(self, key: str) -> str:
+        if self.local_path(key) is not None:
+            return super().version(key)
+        return self.object_key(key)  # keys are never rewritten
+
+    @asynccontextmanager
+    async def local_copy(self, key: str) -> AsyncIterator[Path]:
+        path = self.local_path(key)
+        if path is not None:
+            yield path
+            return
+        incoming = self.root / INCOMING_DIR_NAME
+        incoming.mkdir(parents=True, exist_ok=True)
+        tmp = incoming / f"{uuid.uuid4().hex}{Path(key).suffix}"
+        try:
+            try:
+                await self.client.download(self.object_key(key), tmp)
+            except S3Error as exc:
+                if exc.status_code == 404:  # same contract as a missing local file
+                    raise FileNotFoundError(key) from exc
+                raise
+            yield tmp
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    async def exists(self, key: str) -> bool:
+        return self.local_path(key) is not None or await self.client.exists(self.object_key(key))
+
+    async def remote_url(self, key: str) -> str | None:
+        return self.client.presign(self.object_key(key), self.url_ttl)
+
+    async def served_url(self, path: str) -> str | None:
+        """Presigned URL for a path requested from the public ``/photo`` mount.
+
+        Only existing photo keys are signed: never an arbitrary bucket key such as ``.incoming/``.
+        """
+        if not is_photo_key(path) or not await self.client.exists(self.object_key(path)):
+            return None
+        return await self.remote_url(path)
+
+    async def store(self, tmp: Path, key: str, sha256: str, content_type: str) -> bool:
+        await self.client.put_file(key, tmp, sha256=sha256, content_type=content_type)
+        return False
+
+    async def import_file(self, source: Path, key: str, content_type: str) -> None:
+        sha256 = await asyncio.to_thread(_sha256_of, source)
+        await self.client.put_file(key, source, sha256=sha256, content_type=content_type)
+
+    async def delete(self, key: str) -> None:
+        await super().delete(key)
+        await self.client.delete(self.object_key(key))
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+async def store_upload(
+    file: UploadFile,
+    storage: PhotoStorage,
+    key: str,
+    *,
+    max_size: int,
+    content_type: str,
+) -> StoredFile:
+    """Stream ``file`` to a temp file, then hand it to ``storage`` under ``key``."""
+    incoming = storage.root / INCOMING_DIR_NAME
+    incoming.mkdir(parents=True, exist_ok=True)
+    tmp = incoming / f"{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(tmp, "wb") as output:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Файл слишком большой. Максимум: {max_size // (1024 * 1024)}MB",
+                    )
+                digest.update(chunk)
+                await output.write(chunk)
+        sha256 = digest.hexdigest()
+        deduplicated = await storage.store(tmp, key, sha256, content_type)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return StoredFile(key=key, size=size, sha256=sha256, deduplicated=deduplicated)
+
+
+async def move_to_layout(storage: PhotoStorage, name: str, content_type: str) -> str | None:
+    """First step of migrating a bare ``photo_path``: put the file at its fan-out key.
+
+    Returns the key, or None when the file is missing everywhere.
+    """
+    key = storage_key(name)
+    source = next(
+        (
+            path
+            for path in (storage.root / name, *(d / name for d in storage.legacy_dirs))
+            if path.is_file()
+        ),
+        None,
+    )
+    if source is None:
+        return key if await storage.exists(key) else None
+    await storage.import_file(source, key, content_type)
+    return key
+
+
+async def drop_bare_copy(storage: PhotoStorage, name: str) -> None:
+    """Last step, once the row points at the key: remove the file stored under the bare name."""
+    for path in (storage.root / name, *(d / name for d in storage.legacy_dirs)):
+        if path.is_file():
+            await _release_local(storage.root, path)
+
+
+def build_photo_storage(root: Path) -> PhotoStorage:
+    legacy_dirs = (LEGACY_UPLOAD_DIR,)
+    if settings.photo_storage == "s3":
+        missing = [
+            name
+            for name, value in (
+                ("S3_ENDPOINT_URL", settings.s3_endpoint_url),
+                ("S3_BUCKET", settings.s3_bucket),
+                ("S3_ACCESS_KEY", settings.s3_access_key),
+                ("S3_SECRET_KEY", settings.s3_secret_key),
+            )
+            if not value
+        ]
+        if missing:
+            raise RuntimeError("PHOTO_STORAGE=s3 requires " + ", ".join(missing))
+        client = S3Client(
+            settings.s3_endpoint_url,
+            settings.s3_bucket,
+            settings.s3_access_key,
+            settings.s3_secret_key,
+            settings.s3_region,
+        )
+        return S3PhotoStorage(root, client, url_ttl=settings.s3_url_ttl, legacy_dirs=legacy_dirs)
+    return LocalPhotoStorage(root, legacy_dirs)
+
+
+PHOTO_STORAGE = build_photo_storage(Path(settings.upload_dir or str(PROJECT_ROOT / "photo")))
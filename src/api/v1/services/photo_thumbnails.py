@@ -0,0 +1,187 @@
+"""Photo thumbnails: Pillow renders in a process pool, derivatives cached on disk under ``thumbs/``.
+
+A derivative is named after the photo's name, the box size and a digest of the name and the
+storage version of the original, so a replaced original never serves a stale thumbnail and the
+name itself can be cached by browsers forever. Thumbnails stay on local disk for every backend.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from glob import escape as glob_escape
+from pathlib import Path
+
+from src.api.v1.services.photo_storage import PhotoStorage, fanout
+from src.core.config import settings
+from src.core.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+# Bounding boxes (px) of the generated derivatives; other sizes are rejected by the endpoint.
+THUMBNAIL_SIZES = (160, 320, 800)
+DEFAULT_THUMBNAIL_SIZE = 320
+THUMBNAIL_DIR_NAME = "thumbs"
+THUMBNAIL_QUALITY = 75
+
+_pool: ProcessPoolExecutor | None = None
+_in_flight: dict[Path, asyncio.Future] = {}
+# Strong references to background renders, so they are not garbage-collected mid-flight
+_background_tasks: set[asyncio.Task] = set()
+
+
+@dataclass(frozen=True)
+class Thumbnail:
+    path: Path
+    media_type: str
+    etag: str
+
+
+@lru_cache(maxsize=1)
+def _output_format() -> tuple[str, str, str]:
+    """(Pillow format, extension, media type): WebP if this Pillow build has it, else JPEG."""
+    from PIL import features
+
+    if features.check("webp"):
+        return "WEBP", "webp", "image/webp"
+    return "JPEG", "jpg", "image/jpeg"
+
+
+def _render(source: str, destination: str, size: int, image_format: str, quality: int) -> None:
+    """Runs in a worker process: decode, apply EXIF orientation, downscale, write atomically."""
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        image.draft("RGB", (size, size))  # JPEG: let the decoder downscale, far less memory and CPU
+        thumb = ImageOps.exif_transpose(image)
+        thumb.thumbnail((size, size), Image.Resampling.LANCZOS)
+        if thumb.mode not in ("RGB", "RGBA") or (image_format == "JPEG" and thumb.mode == "RGBA"):
+            thumb = thumb.convert("RGB")
+        options = {"quality": quality}
+        options.update({"method": 4} if image_format == "WEBP" else {"optimize": True})
+        tmp = f"{destination}.{os.getpid()}.tmp"
+        try:
+            thumb.save(tmp, image_format, **options)
+            os.replace(tmp, destination)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # fork would copy the locks and event loop state of this multi-threaded process
+        _pool = ProcessPoolExecutor(
+            max_workers=max(1, settings.thumbnail_workers),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_thumbnail_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def thumbnail_for(root: Path, key: str, version: str, size: int) -> Thumbnail:
+    """Where the derivative of photo ``key`` at ``size`` lives under ``root`` (may not exist)."""
+    name = Path(key).name
+    image_format, ext, media_type = _output_format()
+    digest = hashlib.sha256(
+        f"{name}:{version}:{size}:{image_format}:{THUMBNAIL_QUALITY}".encode()
+    ).hexdigest()[:20]
+    path = root / THUMBNAIL_DIR_NAME / fanout(name) / f"{Path(name).stem}_{size}_{digest}.{ext}"
+    return Thumbnail(path=path, media_type=media_type, etag=f'"{digest}"')
+
+
+def remove_thumbnails(root: Path, key: str) -> None:
+    """Delete every cached derivative of photo ``key`` (all sizes and generations).
+
+    Only exact ``<stem>_<size>_<digest>.<ext>`` names: a prefix match would also hit the
+    derivatives of another photo whose stem starts with ``<stem>_``.
+    """
+    name = Path(key).name
+    stem = Path(name).stem
+    exact = re.compile(rf"{re.escape(stem)}_\d+_[0-9a-f]{{20}}\.(?:webp|jpg)")
+    directory = root / THUMBNAIL_DIR_NAME / fanout(name)
+    for size in THUMBNAIL_SIZES:
+        for path in directory.glob(f"{glob_escape(stem)}_{size}_*"):
+            if not exact.fullmatch(path.name):
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                logger.warning("Cannot remove thumbnail %s", path)
+
+
+async def _render_from_storage(
+    storage: PhotoStorage, key: str, thumb: Thumbnail, size: int
+) -> None:
+    image_format, _ext, _media_type = _output_format()
+    thumb.path.parent.mkdir(parents=True, exist_ok=True)
+    async with storage.local_copy(key) as original:
+        await asyncio.get_running_loop().run_in_executor(
+            _get_pool(),
+            _render,
+            str(original),
+            str(thumb.path),
+            size,
+            image_format,
+            THUMBNAIL_QUALITY,
+        )
+
+
+async def ensure_thumbnail(
+    storage: PhotoStorage, key: str, size: int = DEFAULT_THUMBNAIL_SIZE
+) -> Thumbnail:
+    """Return the cached derivative, rendering it in the pool on first use.
+
+    Concurrent requests for the same derivative share one render.
+    """
+    thumb = thumbnail_for(storage.root, key, storage.version(key), size)
+    if thumb.path.exists():
+        record_cache_lookup("photo_thumbnail", True)
+        return thumb
+    record_cache_lookup("photo_thumbnail", False)
+
+    pending = _in_flight.get(thumb.path)
+    if pending is None:
+        pending = asyncio.ensure_future(_render_from_storage(storage, key, thumb, size))
+        _in_flight[thumb.path] = pending
+        pending.add_done_callback(lambda _f, path=thumb.path: _in_flight.pop(path, None))
+    await asyncio.shield(pending)
+    return thumb
+
+
+def schedule_thumbnails(
+    storage: PhotoStorage,
+    key: str,
+    sizes: tuple[int, ...] = (DEFAULT_THUMBNAIL_SIZE,),
+) -> None:
+    """Render grid thumbnails right after an upload, without delaying the response."""
+
+    async def _render_all() -> None:
+        for size in sizes:
+            await ensure_thumbnail(storage, key, size)
+
+    task = asyncio.create_task(_render_all())
+    _background_tasks.add(task)
+
+    def _done_callback(done_task: asyncio.Task) -> None:
+        _background_tasks.discard(done_task)
+        if done_task.cancelled():
+            return
+        if (exc := done_task.exception()) is not None:
+            logger.error("Thumbnail generation failed for %s", key, exc_info=exc)
+
+    task.add_done_callback(_done_callback)
@@ -0,0 +1,116 @@
+"""Process-wide copies of small dictionary tables for validators and name lookups.
+
+Each table is loaded with one SELECT and kept until its "Sales".reference_versions counter moves
+(see src/core/http_cache.py); without that table (migration 053/054 not applied) copies expire
+after ``reference_versions_ttl`` seconds instead.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.http_cache import REFERENCE_VERSIONS
+from src.core.metrics import record_cache_lookup
+
+
+@dataclass(frozen=True)
+class ProductRef:
+    code: str
+    name: str
+    price: Decimal | None
+    active: bool
+
+
+@dataclass(frozen=True)
+class WarehouseRef:
+    code: str
+    name: str
+    expeditor_login: str | None
+
+
+def _code_names(rows) -> dict[str, str]:
+    return {code: name for code, name in rows}
+
+
+# table -> (query, builder of the cached value from the fetched rows)
+_LOADERS: dict[str, tuple[str, Callable[[list], Any]]] = {
+    "product": (
+        'SELECT code, name, price, active IS TRUE FROM "Sales".product',
+        lambda rows: {r[0]: ProductRef(r[0], r[1], r[2], bool(r[3])) for r in rows},
+    ),
+    "warehouse": (
+        'SELECT code, name, expeditor_login FROM "Sales".warehouse',
+        lambda rows: {r[0]: WarehouseRef(r[0], r[1], r[2]) for r in rows},
+    ),
+    "status": ('SELECT code, name FROM "Sales".status', _code_names),
+    "payment_type": ('SELECT code, name FROM "Sales".payment_type', _code_names),
+    "operation_types": ('SELECT code, name FROM "Sales".operation_types', _code_names),
+    "currency": ('SELECT code, name FROM "Sales".currency', _code_names),
+    "users": ('SELECT login, role::text FROM "Sales".users', _code_names),
+}
+
+
+class ReferenceDataCache:
+    """Typed accessors over bulk-loaded dictionary tables, shared by routers and services."""
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        # table -> (version or None, expires_at for unversioned copies, value)
+        self._tables: dict[str, tuple[int | None, float, Any]] = {}
+
+    def invalidate(self) -> None:
+        self._tables.clear()
+
+    async def _get(self, session: AsyncSession, table: str) -> Any:
+        versions = await REFERENCE_VERSIONS.get(session, (table,))
+        # Version 0: no counter row yet for this table, fall back to the TTL.
+        version = (versions[table][0] or None) if versions is not None else None
+        entry = self._tables.get(table)
+        if entry is not None:
+            cached_version, expires_at, value = entry
+            fresh = (
+                cached_version == version if version is not None else expires_at > time.monotonic()
+            )
+            record_cache_lookup("reference_data", fresh)
+            if fresh:
+                return value
+        else:
+            record_cache_lookup("reference_data", False)
+        query, build = _LOADERS[table]
+        value = build((await session.execute(text(query))).fetchall())
+        self._tables[table] = (version, time.monotonic() + self.ttl, value)
+        return value
+
+    async def products(self, session: AsyncSession) -> dict[str, ProductRef]:
+        return await self._get(session, "product")
+
+    async def warehouses(self, session: AsyncSession) -> dict[str, WarehouseRef]:
+        return await self._get(session, "warehouse")
+
+    async def statuses(self, session: AsyncSession) -> dict[str, str]:
+        """Order status code -> name."""
+        return await self._get(session, "status")
+
+    async def payment_types(self, session: AsyncSession) -> dict[str, str]:
+        return await self._get(session, "payment_type")
+
+    async def operation_types(self, session: AsyncSession) -> dict[str, str]:
+        return await self._get(session, "operation_types")
+
+    async def currencies(self, session: AsyncSession) -> dict[str, str]:
+        return await self._get(session, "currency")
+
+    async def user_roles(self, session: AsyncSession) -> dict[str, str]:
+        """User login -> role."""
+        return await self._get(session, "users")
+
+
+REFERENCE_DATA = ReferenceDataCache(ttl=settings.reference_versions_ttl)
@@ -1,19 +1,58 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
 from typing import Any
 from uuid import UUID
-from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import select, case
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import settings
+from src.core.translation_catalog import TRANSLATION_CATALOG, notify_translations_changed
 from src.database.models import Translation
 
+# What the web client renders: key namespaces (categories are not filled in consistently)
+# and categories.
+BUNDLE_KEY_PREFIXES = ("ui.", "menu.", "button.", "buttons.", "field.", "app.")
+BUNDLE_CATEGORIES = frozenset({"ui", "menu", "buttons"})
 
-class TranslationService:
-    _cache: dict[tuple[str, str], tuple[datetime, str]] = {}
 
+@dataclass(frozen=True)
+class TranslationBundle:
+    """One language of the web client's texts, serialized and gzipped once per catalog change."""
+
+    language: str
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+    @property
+    def gzip_etag(self) -> str:
+        return self.etag[:-1] + '-gz"'
+
+
+# language -> (catalog texts the bundle was built from, bundle); a catalog change builds new texts
+_BUNDLES: dict[str, tuple[dict[str, str], TranslationBundle]] = {}
+
+
+def _build_bundle(lang: str, texts: dict[str, str], category) -> TranslationBundle:
+    data = {
+        key: value
+        for key, value in texts.items()
+        if key.startswith(BUNDLE_KEY_PREFIXES) or category(key) in BUNDLE_CATEGORIES
+    }
+    body = json.dumps(
+        {"language": lang, "data": data}, ensure_ascii=False, separators=(",", ":"), sort_keys=True
+    ).encode()
+    # Content hash: every worker serves the same ETag for the same texts
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return TranslationBundle(lang, body, gzip.compress(body, compresslevel=9, mtime=0), etag)
+
+
+class TranslationService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
@@ -64,52 +103,15 @@ class TranslationService:
         return mapped or first or "general"
 
     async def resolve_key(self, translation_key: str, language: str | None) -> str:
-        lang = self.normalize_language(language)
-        cached = self._cache_get(translation_key, lang)
-        if cached is not None:
-            return cached
-
-        row = await self._get_row(translation_key=translation_key, language_code=lang)
-        if row:
-            self._cache_set(translation_key, lang, row.translation_text)
-            return row.translation_text
-
-        if lang != self.default_language:
-            fallback = await self._get_row(
-                translation_key=translation_key,
-                language_code=self.default_language,
-            )
-            if fallback:
-                self._cache_set(translation_key, lang, fallback.translation_text)
-                return fallback.translation_text
-
-        self._cache_set(translation_key, lang, translation_key)
-        return translation_key
+        catalog = await TRANSLATION_CATALOG.ready(self.db)
+        return catalog.get(translation_key, self.normalize_language(language), translation_key)
 
     async def resolve_many(self, keys: list[str], language: str | None) -> dict[str, str]:
         unique_keys = [k for k in dict.fromkeys(keys) if k]
         if not unique_keys:
             return {}
-
-        lang = self.normalize_language(language)
-        stmt = select(Translation).where(
-            Translation.translation_key.in_(unique_keys),
-            Translation.language_code == lang,
-        )
-        rows = (await self.db.execute(stmt)).scalars().all()
-        by_key = {row.translation_key: row.translation_text for row in rows}
-
-        missing = [k for k in unique_keys if k not in by_key]
-        if missing and lang != self.default_language:
-            fb_stmt = select(Translation).where(
-                Translation.translation_key.in_(missing),
-                Translation.language_code == self.default_language,
-            )
-            fb_rows = (await self.db.execute(fb_stmt)).scalars().all()
-            for row in fb_rows:
-                by_key.setdefault(row.translation_key, row.translation_text)
-
-        return {k: by_key.get(k, k) for k in unique_keys}
+        texts = (await TRANSLATION_CATALOG.ready(self.db)).texts(self.normalize_language(language))
+        return {k: texts.get(k, k) for k in unique_keys}
 
     async def localize_literals(self, literals: list[str], language: str | None) -> dict[str, str]:
         normalized = [str(v).strip() for v in literals if str(v).strip()]
@@ -118,66 +120,26 @@ class TranslationService:
             return {}
 
         target_lang = self.normalize_language(language)
-        default_lang = self.default_language
-
-        candidate_stmt = (
-            select(
-                Translation.translation_text,
-                Translation.translation_key,
-                Translation.language_code,
-            )
-            .where(Translation.translation_text.in_(unique_literals))
-            .order_by(
-                Translation.translation_text.asc(),
-                case(
-                    (Translation.language_code == target_lang, 0),
-                    (Translation.language_code == default_lang, 1),
-                    else_=2,
-                ),
-                Translation.translation_key.asc(),
-            )
-        )
-        candidates = (await self.db.execute(candidate_stmt)).all()
-
-        literal_to_key: dict[str, str] = {}
-        for row in candidates:
-            literal = str(row.translation_text)
-            if literal not in literal_to_key:
-                literal_to_key[literal] = str(row.translation_key)
-
-        if not literal_to_key:
-            return {lit: lit for lit in unique_literals}
-
-        keys = list(dict.fromkeys(literal_to_key.values()))
-        target_rows = (
-            await self.db.execute(
-                select(Translation.translation_key, Translation.translation_text).where(
-                    Translation.translation_key.in_(keys),
-                    Translation.language_code == target_lang,
-                )
-            )
-        ).all()
-        key_to_target = {str(r.translation_key): str(r.translation_text) for r in target_rows}
-
-        missing_keys = [k for k in keys if k not in key_to_target]
-        if missing_keys and target_lang != default_lang:
-            fallback_rows = (
-                await self.db.execute(
-                    select(Translation.translation_key, Translation.translation_text).where(
-                        Translation.translation_key.in_(missing_keys),
-                        Translation.language_code == default_lang,
-                    )
-                )
-            ).all()
-            for r in fallback_rows:
-                key_to_target.setdefault(str(r.translation_key), str(r.translation_text))
-
+        catalog = await TRANSLATION_CATALOG.ready(self.db)
+        literal_keys = catalog.literal_keys(target_lang)
+        texts = catalog.texts(target_lang)
         result: dict[str, str] = {}
         for literal in unique_literals:
-            key = literal_to_key.get(literal)
-            result[literal] = key_to_target.get(key, literal) if key else literal
+            key = literal_keys.get(literal)
+            result[literal] = texts.get(key, literal) if key else literal
         return result
 
+    async def bundle(self, language: str | None) -> TranslationBundle:
+        lang = self.normalize_language(language)
+        catalog = await TRANSLATION_CATALOG.ready(self.db)
+        texts = catalog.texts(lang)
+        cached = _BUNDLES.get(lang)
+        if cached is not None and cached[0] is texts:
+            return cached[1]
+        bundle = _build_bundle(lang, texts, catalog.category)
+        _BUNDLES[lang] = (texts, bundle)
+        return bundle
+
     async def list_items(
         self,
         *,
@@ -217,9 +179,11 @@ class TranslationService:
             created_by=payload.get("created_by"),
         )
         self.db.add(entity)
+        await self.db.flush()
+        await notify_translations_changed(self.db)
         await self.db.commit()
+        TRANSLATION_CATALOG.invalidate()
         await self.db.refresh(entity)
-        self._cache.clear()
         return entity
 
     async def update_item(self, translation_id: UUID, payload: dict[str, Any]) -> Translation | None:
@@ -239,9 +203,10 @@ class TranslationService:
         if "updated_by" in payload:
             entity.updated_by = payload["updated_by"]
 
+        await notify_translations_changed(self.db)
         await self.db.commit()
+        TRANSLATION_CATALOG.invalidate()
         await self.db.refresh(entity)
-        self._cache.clear()
         return entity
 
     async def delete_item(self, translation_id: UUID) -> bool:
@@ -251,33 +216,7 @@ class TranslationService:
             return False
 
         await self.db.delete(entity)
+        await notify_translations_changed(self.db, deleted=True)
         await self.db.commit()
-        self._cache.clear()
+        TRANSLATION_CATALOG.invalidate(full=True)
         return True
-
-    async def _get_row(self, *, translation_key: str, language_code: str) -> Translation | None:
-        stmt = select(Translation).where(
-            Translation.translation_key == translation_key,
-            Translation.language_code == language_code,
-        )
-        return (await self.db.execute(stmt)).scalars().first()
-
-    @staticmethod
-    def _cache_key(translation_key: str, language_code: str) -> tuple[str, str]:
-        return translation_key, language_code
-
-    def _cache_get(self, translation_key: str, language_code: str) -> str | None:
-        key = self._cache_key(translation_key, language_code)
-        cached = self._cache.get(key)
-        if not cached:
-            return None
-        expires_at, value = cached
-        if expires_at <= datetime.now(timezone.utc):
-            self._cache.pop(key, None)
-            return None
-        return value
-
-    def _cache_set(self, translation_key: str, language_code: str, value: str) -> None:
-        ttl = max(int(settings.cache_ttl or 0), 1)
-        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
-        self._cache[self._cache_key(translation_key, language_code)] = (expires_at, value)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -36,6 +38,24 @@ class Settings(BaseSettings):
 
     upload_dir: str = Field(default="photo", validation_alias="UPLOAD_DIR")
     site_url: str = Field(default="http://localhost:8000", validation_alias="SITE_URL")
+    thumbnail_workers: int = Field(default=2, validation_alias="THUMBNAIL_WORKERS")
+    exif_workers: int = Field(default=2, validation_alias="EXIF_WORKERS")
+    photo_delivery: Literal["direct", "x-accel", "x-sendfile"] = Field(
+        default="direct",
+        validation_alias="PHOTO_DELIVERY",
+    )
+    photo_accel_prefix: str = Field(
+        default="/protected-photo/", validation_alias="PHOTO_ACCEL_PREFIX"
+    )
+    photo_storage: Literal["local", "s3"] = Field(default="local", validation_alias="PHOTO_STORAGE")
+    s3_endpoint_url: str = Field(default="", validation_alias="S3_ENDPOINT_URL")
+    s3_bucket: str = Field(default="", validation_alias="S3_BUCKET")
+    s3_access_key: str = Field(default="", validation_alias="S3_ACCESS_KEY")
+    s3_secret_key: str = Field(default="", validation_alias="S3_SECRET_KEY")
+    s3_region: str = Field(default="us-east-1", validation_alias="S3_REGION")
+    s3_url_ttl: int = Field(default=3600, validation_alias="S3_URL_TTL")
+    static_build_dir: str = Field(default="build/static", validation_alias="STATIC_BUILD_DIR")
+    static_build_on_startup: bool = Field(default=False, validation_alias="STATIC_BUILD_ON_STARTUP")
 
     yandex_maps_api_key: str = Field(default="", validation_alias="YANDEX_MAPS_API_KEY")
 
@@ -49,14 +69,37 @@ class Settings(BaseSettings):
         validation_alias="SENTRY_IGNORE_TELEGRAM_CONFLICT",
     )
 
+    metrics_enabled: bool = Field(default=False, validation_alias="METRICS_ENABLED")
+    metrics_token: str | None = Field(default=None, validation_alias="METRICS_TOKEN")
+    bot_metrics_port: int = Field(default=0, validation_alias="BOT_METRICS_PORT")
+    n_plus_one_threshold: int = Field(default=10, validation_alias="N_PLUS_ONE_THRESHOLD")
+    slow_query_ms: int = Field(default=500, validation_alias="SLOW_QUERY_MS")
+    slow_query_explain_interval: int = Field(
+        default=3600, validation_alias="SLOW_QUERY_EXPLAIN_INTERVAL"
+    )
+    slow_query_log_file: str = Field(
+        default="logs/slow_queries.jsonl", validation_alias="SLOW_QUERY_LOG_FILE"
+    )
+    startup_checks_mode: Literal["background", "blocking", "off"] = Field(
+        default="background",
+        validation_alias="STARTUP_CHECKS",
+    )
+
     log_level: str = Field(default="INFO", validation_alias="LOG_LEVEL")
     log_file: str = Field(default="logs/app.log", validation_alias="LOG_FILE")
     bot_log_file: str = Field(default="logs/telegram_bot.log", validation_alias="BOT_LOG_FILE")
 
     cache_ttl: int = Field(default=3600, validation_alias="CACHE_TTL")
+    customer_search_cache_ttl: int = Field(default=30, validation_alias="CUSTOMER_SEARCH_CACHE_TTL")
+    reference_versions_ttl: float = Field(default=5, validation_alias="REFERENCE_VERSIONS_TTL")
+    translations_refresh_seconds: float = Field(
+        default=60, validation_alias="TRANSLATIONS_REFRESH_SECONDS"
+    )
     max_login_attempts: int = Field(default=5, validation_alias="MAX_LOGIN_ATTEMPTS")
     login_block_minutes: int = Field(default=10, validation_alias="LOGIN_BLOCK_MINUTES")
-    telegram_session_ttl_minutes: int = Field(default=720, validation_alias="TELEGRAM_SESSION_TTL_MINUTES")
+    telegram_session_ttl_minutes: int = Field(
+        default=720, validation_alias="TELEGRAM_SESSION_TTL_MINUTES"
+    )
     timezone: str = Field(default="Asia/Tashkent", validation_alias="TIMEZONE")
     enabled_languages: str = Field(default="ru,uz,en", validation_alias="ENABLED_LANGUAGES")
     default_language: str = Field(default="ru", validation_alias="DEFAULT_LANGUAGE")
@@ -0,0 +1,146 @@
+"""Serving stored photo files: validators, Range, immutable caching and optional nginx offload.
+
+``PHOTO_DELIVERY=x-accel`` makes the API answer with ``X-Accel-Redirect`` (nginx ``internal``
+location under ``PHOTO_ACCEL_PREFIX``), ``x-sendfile`` with ``X-Sendfile`` (Apache/lighttpd);
+the web server then streams the bytes and handles ``Range`` itself. ``direct`` keeps streaming
+from Python, where Starlette's FileResponse handles ``Range``/``If-Range``.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse, RedirectResponse
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from src.core.config import settings
+from src.core.http_cache import etag_matches
+
+# Content-addressed names (blobs/<ab>/<sha256>.ext, thumbs/<stem>_<px>_<digest>.webp) never change.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Named originals (КОД_ДДММГГГГ_ЧЧММСС.ext) and token links: cache for a day, then revalidate.
+NAMED_FILE_CACHE_CONTROL = "public, max-age=86400"
+IMMUTABLE_DIRS = ("blobs", "thumbs")
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    """Strong validator: a stored file is never rewritten in place, only replaced by a new inode."""
+    return f'"{stat_result.st_ino:x}-{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def cache_control_for(root: Path, path: Path) -> str:
+    try:
+        top = path.relative_to(root).parts[0]
+    except (ValueError, IndexError):
+        return NAMED_FILE_CACHE_CONTROL
+    return IMMUTABLE_CACHE_CONTROL if top in IMMUTABLE_DIRS else NAMED_FILE_CACHE_CONTROL
+
+
+def _offload_headers(root: Path, path: Path) -> dict[str, str] | None:
+    """Headers handing the file to the web server, or None to stream it from Python."""
+    mode = settings.photo_delivery
+    if mode == "x-sendfile":
+        return {"X-Sendfile": str(path.resolve())}
+    if mode == "x-accel":
+        try:
+            relative = path.resolve().relative_to(root.resolve())
+        except ValueError:
+            return None  # e.g. legacy uploads/customer_photos, not behind the internal location
+        return {
+            "X-Accel-Redirect": settings.photo_accel_prefix.rstrip("/") + "/" + relative.as_posix()
+        }
+    return None
+
+
+def _deliver(
+    root: Path,
+    path: Path,
+    stat_result: os.stat_result,
+    request_headers: Headers,
+    *,
+    media_type: str | None = None,
+    filename: str | None = None,
+    etag: str | None = None,
+    cache_control: str | None = None,
+) -> Response:
+    headers = {
+        "ETag": etag or file_etag(stat_result),
+        "Cache-Control": cache_control or cache_control_for(root, path),
+    }
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    response = FileResponse(
+        path, headers=headers, media_type=media_type, filename=filename, stat_result=stat_result
+    )
+    offload = _offload_headers(root, path)
+    if offload is None:
+        return response
+    # Тело (и Range) отдаёт веб-сервер: оставляем заголовки FileResponse без файла
+    headers = {
+        k: v for k, v in response.headers.items() if k not in ("content-length", "accept-ranges")
+    }
+    return Response(status_code=200, headers={**headers, **offload})
+
+
+def send_file(
+    request: Request,
+    root: Path,
+    path: Path,
+    *,
+    media_type: str,
+    filename: str | None = None,
+    etag: str | None = None,
+    cache_control: str | None = None,
+) -> Response:
+    """Conditional, range-capable response for a file stored under ``root``."""
+    return _deliver(
+        root,
+        path,
+        path.stat(),
+        request.headers,
+        media_type=media_type,
+        filename=filename,
+        etag=etag,
+        cache_control=cache_control,
+    )
+
+
+class PhotoStaticFiles(StaticFiles):
+    """``/photo`` mount: same validators, cache policy and offload as the token endpoints.
+
+    With a remote photo storage, paths not found on local disk are redirected to
+    ``remote_url(path)``; it returns None (404) for anything but an existing photo key.
+    """
+
+    def __init__(
+        self, *args, remote_url: Callable[[str], Awaitable[str | None]] | None = None, **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.remote_url = remote_url
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        # .incoming (uploads in progress), .quarantine (collected orphans) and the like are internal
+        if any(part.startswith(".") for part in Path(path).parts):
+            raise HTTPException(status_code=404)
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            if exc.status_code != 404 or self.remote_url is None:
+                raise
+            url = await self.remote_url(path)
+            if url is None:
+                raise
+            return RedirectResponse(url, status_code=307)
+
+    def file_response(
+        self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200
+    ) -> Response:
+        return _deliver(Path(self.directory), Path(full_path), stat_result, Headers(scope=scope))
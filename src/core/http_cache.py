@@ -0,0 +1,199 @@
+"""Conditional GET for reference data.
+
+Strong ETags come from per-table versions, so a 304 is answered before the data query.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.deps import get_current_user
+from src.core.metrics import record_cache_lookup
+from src.core.query_stats import add_statement_observer
+from src.core.schema_registry import has_column
+from src.database.connection import get_db_session
+from src.database.models import User
+
+# Tables with a bump trigger in migrations 053/054 (kept in sync by tests/test_http_cache.py).
+REFERENCE_TABLES = (
+    "product",
+    "product_type",
+    "payment_type",
+    "currency",
+    "warehouse",
+    "cities",
+    "territories",
+    "menu_items",
+    "role_menu_access",
+    "operation_types",
+    "operation_config",
+    "translations",
+    "status",
+    "users",
+)
+
+_VERSIONS_SQL = text('SELECT table_name, version, updated_at FROM "Sales".reference_versions')
+_WRITE_STATEMENT = re.compile(
+    r'^\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?)\s+(?:"?Sales"?\.)?"?(\w+)"?',
+    re.IGNORECASE,
+)
+
+
+class ReferenceVersions:
+    """Process-local snapshot of "Sales".reference_versions, reloaded at most every ``ttl`` seconds.
+
+    Writes to a reference table made by this process drop the snapshot at once (statement observer);
+    writes from other workers, the bot or psql are picked up within the TTL.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._versions: dict[str, tuple[int, datetime | None]] = {}
+        self._expires_at = 0.0
+
+    def invalidate(self) -> None:
+        self._expires_at = 0.0
+
+    def load(self, rows) -> None:
+        self._versions = {name: (int(version), updated_at) for name, version, updated_at in rows}
+        self._expires_at = time.monotonic() + self.ttl
+
+    async def get(
+        self, session: AsyncSession, tables: tuple[str, ...]
+    ) -> dict[str, tuple[int, datetime | None]] | None:
+        """Versions of ``tables``, or None while migration 053 is not applied."""
+        if not await has_column(session, "reference_versions", "version"):
+            return None
+        fresh = self._expires_at > time.monotonic()
+        record_cache_lookup("reference_versions", fresh)
+        if not fresh:
+            self.load((await session.execute(_VERSIONS_SQL)).fetchall())
+        return {table: self._versions.get(table, (0, None)) for table in tables}
+
+    def observe_statement(
+        self, statement: str, parameters, executemany: bool, elapsed: float
+    ) -> None:
+        match = _WRITE_STATEMENT.match(statement)
+        if match and match.group(1).lower() in REFERENCE_TABLES:
+            self.invalidate()
+
+
+REFERENCE_VERSIONS = ReferenceVersions(ttl=settings.reference_versions_ttl)
+add_statement_observer(REFERENCE_VERSIONS.observe_statement)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: ``W/`` prefixes are ignored."""
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    return last_modified.replace(microsecond=0) <= since
+
+
+@dataclass(frozen=True)
+class ConditionalGet:
+    """Validators of one reference response; ``etag`` is None when versioning is unavailable."""
+
+    etag: str | None = None
+    last_modified: datetime | None = None
+    cache_control: str = "private, no-cache"
+    not_modified: bool = False
+
+    @property
+    def headers(self) -> dict[str, str]:
+        if self.etag is None:
+            return {}
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                self.last_modified.astimezone(UTC), usegmt=True
+            )
+        return headers
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
+
+    @classmethod
+    def evaluate(
+        cls,
+        request: Request,
+        versions: dict[str, tuple[int, datetime | None]],
+        *,
+        max_age: int,
+        vary: tuple[str, ...] = (),
+    ) -> ConditionalGet:
+        parts = [
+            request.url.path,
+            repr(sorted(request.query_params.multi_items())),
+            settings.sentry_release or "",
+            *vary,
+            *(f"{table}:{version}" for table, (version, _updated_at) in sorted(versions.items())),
+        ]
+        etag = '"' + hashlib.sha256("\x1f".join(parts).encode()).hexdigest()[:32] + '"'
+        stamps = [
+            updated_at for _version, updated_at in versions.values() if updated_at is not None
+        ]
+        last_modified = max(stamps) if stamps else None
+        cache_control = f"private, max-age={max_age}" if max_age > 0 else "private, no-cache"
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = etag_matches(if_none_match, etag)
+        else:
+            if_modified_since = request.headers.get("if-modified-since")
+            not_modified = bool(
+                if_modified_since
+                and last_modified
+                and _not_modified_since(if_modified_since, last_modified)
+            )
+        record_cache_lookup("http_conditional_get", not_modified)
+        return cls(
+            etag=etag,
+            last_modified=last_modified,
+            cache_control=cache_control,
+            not_modified=not_modified,
+        )
+
+
+def conditional_get(*tables: str, max_age: int = 0, vary_role: bool = False):
+    """Dependency for GET endpoints whose body depends only on ``tables`` and the query string.
+
+    ``vary_role`` adds the caller's role to the key. The endpoint returns
+    ``cache.not_modified_response()`` when ``cache.not_modified``; otherwise the validators are
+    already set on its response. ``max_age=0`` makes browsers revalidate on every use, so an admin
+    sees their own edit immediately.
+    """
+
+    async def dependency(
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(get_db_session),
+        user: User = Depends(get_current_user),
+    ) -> ConditionalGet:
+        versions = await REFERENCE_VERSIONS.get(session, tables)
+        if versions is None:
+            return ConditionalGet()
+        vary = ((user.role or "").strip().lower(),) if vary_role else ()
+        cache = ConditionalGet.evaluate(request, versions, max_age=max_age, vary=vary)
+        response.headers.update(cache.headers)
+        return cache
+
+    return dependency
@@ -0,0 +1,362 @@
+"""In-process metrics registry rendered in Prometheus text exposition format."""
+
+from __future__ import annotations
+
+import hmac
+import logging
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = zip(names, values, strict=False)
+    parts = [f'{name}="{_escape_label_value(value)}"' for name, value in pairs]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """Base class for labelled metric families."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames: tuple[str, ...] = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelnames}, got {tuple(sorted(labels))}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def _render_samples(self) -> list[str]:
+        """Sample lines of the family, without the HELP/TYPE header."""
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._render_samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        if amount < 0:
+            raise ValueError("Counter can only increase")
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: object) -> float:
+        key = self._label_values(labels)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def samples(self) -> dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def _render_samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self.samples().items())
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: object) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+    def get(self, **labels: object) -> float:
+        key = self._label_values(labels)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed upper bounds."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        bounds = sorted(float(b) for b in buckets)
+        if not bounds:
+            raise ValueError("Histogram requires at least one bucket")
+        self.buckets: tuple[float, ...] = tuple(bounds)
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = [0] * (len(self.buckets) + 1)
+                self._counts[key] = counts
+                self._sums[key] = 0.0
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[idx] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] += value
+
+    def get_count(self, **labels: object) -> int:
+        key = self._label_values(labels)
+        with self._lock:
+            return sum(self._counts.get(key, ()))
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            snapshot = sorted(
+                (key, list(counts), self._sums[key]) for key, counts in self._counts.items()
+            )
+        lines: list[str] = []
+        for key, counts, total in snapshot:
+            cumulative = 0
+            labels = _format_labels(self.labelnames, key)
+            for bound, count in zip(self.buckets, counts, strict=False):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                bucket_labels = _format_labels(self.labelnames, key, le)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            cumulative += counts[-1]
+            inf_labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metric families and scrape-time collectors for one process."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(
+                        f"Metric {metric.name} is already registered with another shape"
+                    )
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback that refreshes gauges right before rendering."""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                collector()
+            except Exception:
+                logger.warning("Metrics collector %r failed", collector, exc_info=True)
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "sds_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route"),
+)
+HTTP_REQUESTS_TOTAL = REGISTRY.counter(
+    "sds_http_requests_total",
+    "HTTP requests by route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "sds_http_requests_in_flight",
+    "HTTP requests currently being processed.",
+)
+
+HTTP_REQUEST_DB_QUERIES = REGISTRY.histogram(
+    "sds_http_request_db_queries",
+    "SQL statements executed per HTTP request, by route template.",
+    ("route",),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+HTTP_REQUEST_REPEATED_QUERIES_TOTAL = REGISTRY.counter(
+    "sds_http_request_repeated_queries_total",
+    "Requests that repeated one statement shape above N_PLUS_ONE_THRESHOLD.",
+    ("route",),
+)
+
+DB_POOL_SIZE = REGISTRY.gauge(
+    "sds_db_pool_size",
+    "Configured number of persistent connections in the DB pool.",
+    ("pool",),
+)
+DB_POOL_CHECKED_OUT = REGISTRY.gauge(
+    "sds_db_pool_checked_out",
+    "DB connections currently checked out of the pool.",
+    ("pool",),
+)
+DB_POOL_OVERFLOW = REGISTRY.gauge(
+    "sds_db_pool_overflow",
+    "DB connections opened above the persistent pool size.",
+    ("pool",),
+)
+DB_POOL_WAIT = REGISTRY.histogram(
+    "sds_db_pool_wait_seconds",
+    "Time spent waiting for a DB connection from the pool.",
+    ("pool",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+CACHE_LOOKUPS_TOTAL = REGISTRY.counter(
+    "sds_cache_lookups_total",
+    "Cache lookups by cache name and result (hit/miss).",
+    ("cache", "result"),
+)
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "sds_cache_hit_ratio",
+    "Share of cache lookups served from memory since process start.",
+    ("cache",),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count one lookup against a named in-process cache."""
+    CACHE_LOOKUPS_TOTAL.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _collect_cache_hit_ratio() -> None:
+    totals: dict[str, list[float]] = {}
+    for (cache, result), value in CACHE_LOOKUPS_TOTAL.samples().items():
+        bucket = totals.setdefault(cache, [0.0, 0.0])
+        bucket[0 if result == "hit" else 1] += value
+    for cache, (hits, misses) in totals.items():
+        lookups = hits + misses
+        CACHE_HIT_RATIO.set(hits / lookups if lookups else 0.0, cache=cache)
+
+
+REGISTRY.add_collector(_collect_cache_hit_ratio)
+
+
+def scrape_authorized(authorization: str | None, token: str | None) -> bool:
+    """Check ``Authorization: Bearer <token>`` for the scrape endpoint; no token allows all."""
+    if not token:
+        return True
+    return hmac.compare_digest((authorization or "").encode(), f"Bearer {token}".encode())
+
+
+def render_latest() -> str:
+    """Render all registered metrics of the current process."""
+    return REGISTRY.render()
@@ -10,6 +10,14 @@ from loguru import logger
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from src.core.config import settings
+from src.core.metrics import (
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUEST_REPEATED_QUERIES_TOTAL,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_REQUESTS_TOTAL,
+)
+from src.core.query_stats import RequestQueryStats, begin_request, end_request
 from src.core.security import decode_access_token
 
 
@@ -34,29 +42,85 @@ def _extract_user_login(request: Request) -> str:
     return "anonymous"
 
 
+def _route_template(request: Request) -> str:
+    """Return matched route path (e.g. /api/v1/orders/{order_id}) to keep metric labels bounded."""
+    route = request.scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return str(path)
+    root_path = request.scope.get("root_path") or ""
+    if root_path and request.url.path.startswith(root_path):
+        return root_path
+    return "<unmatched>"
+
+
+def _record_request_metrics(request: Request, status_code: int, duration_seconds: float) -> None:
+    route = _route_template(request)
+    HTTP_REQUEST_DURATION.observe(duration_seconds, method=request.method, route=route)
+    HTTP_REQUESTS_TOTAL.inc(method=request.method, route=route, status=status_code)
+
+
+def _report_query_stats(request: Request, stats: RequestQueryStats) -> None:
+    """Record per-request statement count and warn about repeated shapes (likely N+1)."""
+    route = _route_template(request)
+    HTTP_REQUEST_DB_QUERIES.observe(stats.count, route=route)
+    repeated = stats.repeated_shapes(settings.n_plus_one_threshold)
+    if not repeated:
+        return
+    HTTP_REQUEST_REPEATED_QUERIES_TOTAL.inc(route=route)
+    for shape, repeats in repeated:
+        logger.warning(
+            "n_plus_one_suspect request_id={} method={} route={} repeats={} statement={}",
+            stats.request_id,
+            request.method,
+            route,
+            repeats,
+            shape[:500],
+        )
+
+
 async def request_logging_middleware(request: Request, call_next):
     request_id = uuid.uuid4().hex[:12]
     start = time.perf_counter()
     user_login = _extract_user_login(request)
     client_ip = request.client.host if request.client else "unknown"
 
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    stats, stats_token = begin_request(request_id)
     try:
         response = await call_next(request)
     except Exception:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        _record_request_metrics(request, 500, time.perf_counter() - start)
+        _report_query_stats(request, stats)
         duration_ms = round((time.perf_counter() - start) * 1000, 2)
         logger.exception(
-            "api_error request_id={} method={} path={} user={} ip={} duration_ms={}",
+            "api_error request_id={} method={} path={} user={} ip={} duration_ms={} "
+            "db_queries={} db_ms={}",
             request_id,
             request.method,
             request.url.path,
             user_login,
             client_ip,
             duration_ms,
+            stats.count,
+            stats.total_ms,
         )
         raise
+    finally:
+        end_request(stats_token)
 
+    HTTP_REQUESTS_IN_FLIGHT.dec()
+    _record_request_metrics(request, response.status_code, time.perf_counter() - start)
+    _report_query_stats(request, stats)
     duration_ms = round((time.perf_counter() - start) * 1000, 2)
-    log_message = "api_request request_id={} method={} path={} status={} duration_ms={} user={} ip={}"
+    if settings.api_debug:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = str(stats.total_ms)
+    log_message = (
+        "api_request request_id={} method={} path={} status={} duration_ms={} user={} ip={} "
+        "db_queries={} db_ms={}"
+    )
     log_args = (
         request_id,
         request.method,
@@ -65,6 +129,8 @@ async def request_logging_middleware(request: Request, call_next):
         duration_ms,
         user_login,
         client_ip,
+        stats.count,
+        stats.total_ms,
     )
     if response.status_code >= 500:
         logger.error(log_message, *log_args)
@@ -6,22 +6,29 @@ import asyncio
 import logging
 from datetime import date, datetime
 from decimal import Decimal
+from typing import TYPE_CHECKING
+
 from sqlalchemy import text
-from telegram import Bot
 
 from src.core.config import settings
+from src.core.schema_registry import has_column
+from src.core.translation_catalog import TRANSLATION_CATALOG
 from src.database.connection import async_session
 
+if TYPE_CHECKING:
+    from telegram import Bot
+
 logger = logging.getLogger(__name__)
 
 _bot: Bot | None = None
-_user_notifications_column_exists: bool | None = None
-_user_language_column_exists: bool | None = None
 
 
 def get_bot() -> Bot:
     global _bot
     if _bot is None:
+        # python-telegram-bot is heavy; load only when a notification is sent
+        from telegram import Bot
+
         _bot = Bot(token=settings.telegram_bot_token)
     return _bot
 
@@ -59,26 +66,8 @@ def _format_date(value: datetime | date | str | None) -> str:
 
 
 async def _has_notifications_enabled(login: str) -> bool:
-    global _user_notifications_column_exists
-
     async with async_session() as session:
-        if _user_notifications_column_exists is None:
-            result = await session.execute(
-                text(
-                    """
-                    SELECT EXISTS (
-                        SELECT 1
-                        FROM information_schema.columns
-                        WHERE table_schema = 'Sales'
-                          AND table_name = 'users'
-                          AND column_name = 'notifications_enabled'
-                    )
-                    """
-                )
-            )
-            _user_notifications_column_exists = bool(result.scalar())
-
-        if not _user_notifications_column_exists:
+        if not await has_column(session, "users", "notifications_enabled"):
             return True
 
         row = await session.execute(
@@ -173,25 +162,8 @@ async def notify_order_status_changed(
 
 
 async def _get_user_language(login: str) -> str:
-    global _user_language_column_exists
     async with async_session() as session:
-        if _user_language_column_exists is None:
-            result = await session.execute(
-                text(
-                    """
-                    SELECT EXISTS (
-                        SELECT 1
-                        FROM information_schema.columns
-                        WHERE table_schema = 'Sales'
-                          AND table_name = 'users'
-                          AND column_name = 'language_code'
-                    )
-                    """
-                )
-            )
-            _user_language_column_exists = bool(result.scalar())
-
-        if not _user_language_column_exists:
+        if not await has_column(session, "users", "language_code"):
             return "ru"
 
         row = await session.execute(
@@ -205,14 +177,7 @@ async def _get_user_language(login: str) -> str:
 
 
 async def _translate(key: str, lang: str, fallback: str, **kwargs) -> str:
-    from src.database.connection import async_session
-    from sqlalchemy import text
-    async with async_session() as session:
-        val = await session.scalar(
-            text('SELECT translation_text FROM "Sales".translations WHERE translation_key = :k AND language_code = :l LIMIT 1'),
-            {"k": key, "l": lang}
-        )
-    text_val = val if val else fallback
+    text_val = (await TRANSLATION_CATALOG.ready()).get(key, lang) or fallback
     if kwargs:
         try:
             return text_val.format(**kwargs)
@@ -2,46 +2,287 @@
 
 from __future__ import annotations
 
-from typing import Generic, TypeVar
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Generic, Literal, TypeVar
+from uuid import UUID
 
 from fastapi import Query
 from pydantic import BaseModel
+from sqlalchemy import and_, false, func, literal_column, or_, select, text, true, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from src.core.exceptions import ValidationError
 
 T = TypeVar("T")
 
+CountMode = Literal["exact", "estimate", "none"]
+
+# count=estimate counts at most this many rows; larger totals are reported as the cap.
+COUNT_ESTIMATE_CAP = 10_000
+
 
 class PaginationParams:
-    """Validated pagination query params."""
+    """Validated pagination query params.
+
+    Offset mode (``offset``) is kept for existing clients; passing ``cursor`` switches to keyset
+    mode, where the page is located by the last row's sort keys and ``offset`` is ignored.
+    """
 
     def __init__(
         self,
         limit: int = Query(default=50, ge=1, le=200, description="Results per page"),
         offset: int = Query(default=0, ge=0, description="Number of records to skip"),
+        cursor: str | None = Query(
+            default=None, description="next_cursor of the previous page (keyset mode)"
+        ),
+        count: CountMode = Query(
+            default="exact",
+            description="Total: exact COUNT(*), estimate (capped count) or none",
+        ),
     ) -> None:
         self.limit = limit
-        self.offset = offset
+        self.offset = 0 if cursor else offset
+        self.cursor = cursor or None
+        self.count = count
+
+    def cursor_values(self, expected: int) -> list[Any] | None:
+        """Decoded cursor values, or None in offset mode."""
+        if not self.cursor:
+            return None
+        values = decode_cursor(self.cursor)
+        if len(values) != expected:
+            raise ValidationError("Некорректный cursor", field="cursor")
+        return values
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
     """Standard paginated response envelope."""
 
     data: list[T]
-    total: int
+    total: int | None
     limit: int
     offset: int
     has_more: bool
+    next_cursor: str | None = None
+    total_is_estimate: bool = False
 
     @classmethod
     def create(
         cls,
         data: list[T],
-        total: int,
+        total: int | None,
         pagination: PaginationParams,
+        *,
+        has_more: bool | None = None,
+        next_cursor: str | None = None,
+        total_is_estimate: bool = False,
     ) -> "PaginatedResponse[T]":
+        if has_more is None:
+            has_more = total is not None and (pagination.offset + pagination.limit) < total
         return cls(
             data=data,
             total=total,
             limit=pagination.limit,
             offset=pagination.offset,
-            has_more=(pagination.offset + pagination.limit) < total,
+            has_more=has_more,
+            next_cursor=next_cursor,
+            total_is_estimate=total_is_estimate,
         )
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, time):
+        return {"t": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"u": str(value)}
+    if isinstance(value, Decimal):
+        return {"n": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    (tag, raw), = value.items()
+    decoders = {
+        "dt": datetime.fromisoformat,
+        "d": date.fromisoformat,
+        "t": time.fromisoformat,
+        "u": UUID,
+        "n": Decimal,
+    }
+    return decoders[tag](raw)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque URL-safe cursor for the given sort key values."""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list):
+            raise ValueError("cursor must encode a list")
+        return [_decode_value(v) for v in values]
+    except (ValueError, KeyError, TypeError, binascii.Error, UnicodeError) as exc:
+        raise ValidationError("Некорректный cursor", field="cursor") from exc
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """One ORDER BY term usable for keyset pagination.
+
+    ``nulls_last=None`` means the PostgreSQL default (NULLS LAST for ASC, NULLS FIRST for DESC).
+    ``null_sentinel`` (an SQL constant such as ``'-infinity'::timestamptz``) sorts the key as
+    ``COALESCE(column, sentinel)`` instead: with no NULLs left, the cursor condition becomes one
+    row-value comparison that an expression index can seek to.
+    """
+
+    column: Any
+    descending: bool = False
+    nulls_last: bool | None = None
+    nullable: bool = True
+    null_sentinel: str | None = None
+
+    @property
+    def expression(self):
+        if self.null_sentinel is None:
+            return self.column
+        return func.coalesce(self.column, literal_column(self.null_sentinel))
+
+    @property
+    def has_nulls(self) -> bool:
+        return self.nullable and self.null_sentinel is None
+
+    def order_clause(self):
+        clause = self.expression.desc() if self.descending else self.expression.asc()
+        if self.nulls_last is None or not self.has_nulls:
+            return clause
+        return clause.nulls_last() if self.nulls_last else clause.nulls_first()
+
+    def _nulls_last(self) -> bool:
+        return (not self.descending) if self.nulls_last is None else self.nulls_last
+
+    def equals(self, value: Any):
+        return self.column.is_(None) if value is None else self.column == value
+
+    def after(self, value: Any):
+        """Rows strictly after ``value`` in this key's order."""
+        if value is None:
+            # Nothing follows NULLs sorted last; every non-NULL follows NULLs sorted first.
+            return false() if self._nulls_last() else self.column.is_not(None)
+        beyond = self.column < value if self.descending else self.column > value
+        if self.nullable and self._nulls_last():
+            return or_(beyond, self.column.is_(None))
+        return beyond
+
+    def bound(self, value: Any):
+        """Rows at or after ``value``, when that is a plain range an index can start from."""
+        if value is None or (self.nullable and self._nulls_last()):
+            return None
+        return self.column <= value if self.descending else self.column >= value
+
+    def cursor_value(self, value: Any):
+        return literal_column(self.null_sentinel) if value is None and self.null_sentinel else value
+
+
+def keyset_predicate(keys: Sequence[SortKey], values: Sequence[Any]):
+    """(k1, k2, ...) > (v1, v2, ...) in the keys' sort order, NULL-aware.
+
+    Keys without NULLs sorted in one direction compile to a row-value comparison; otherwise to
+    an OR chain, ANDed with a range on the leading key whenever that is exact, so the index
+    scan starts at the cursor instead of filtering out every earlier page.
+    """
+    if not keys:
+        return true()
+    if len({key.descending for key in keys}) == 1 and not any(key.has_nulls for key in keys):
+        row = tuple_(*(key.expression for key in keys))
+        cursor = tuple_(*(key.cursor_value(value) for key, value in zip(keys, values, strict=True)))
+        return row < cursor if keys[0].descending else row > cursor
+    branches = []
+    prefix = []
+    for key, value in zip(keys, values, strict=True):
+        branches.append(and_(*prefix, key.after(value)) if prefix else key.after(value))
+        prefix.append(key.equals(value))
+    bound = keys[0].bound(values[0])
+    return or_(*branches) if bound is None else and_(bound, or_(*branches))
+
+
+def paginate_keyset(query: Select, keys: Sequence[SortKey], pagination: PaginationParams) -> Select:
+    """Apply ORDER BY, cursor/offset and LIMIT limit+1 (the extra row only signals has_more)."""
+    query = query.order_by(None).order_by(*(key.order_clause() for key in keys))
+    values = pagination.cursor_values(len(keys))
+    if values is not None:
+        query = query.where(keyset_predicate(keys, values))
+    elif pagination.offset:
+        query = query.offset(pagination.offset)
+    return query.limit(pagination.limit + 1)
+
+
+def split_page(
+    rows: Sequence[Any], pagination: PaginationParams, key_values
+) -> tuple[list[Any], bool, str | None]:
+    """Trim the limit+1 probe row; ``key_values(row)`` gives a row's sort keys for next_cursor."""
+    page = list(rows[: pagination.limit])
+    has_more = len(rows) > pagination.limit
+    next_cursor = encode_cursor(key_values(page[-1])) if has_more and page else None
+    return page, has_more, next_cursor
+
+
+async def count_total(
+    session: AsyncSession,
+    query: Select,
+    pagination: PaginationParams,
+) -> tuple[int | None, bool]:
+    """Total for ``query`` per ``pagination.count``: (total, total_is_estimate)."""
+    if pagination.count == "none":
+        return None, False
+    if pagination.count == "estimate":
+        capped = (
+            query.with_only_columns(literal_column("1"), maintain_column_froms=True)
+            .order_by(None)
+            .offset(None)
+            .limit(COUNT_ESTIMATE_CAP + 1)
+        )
+        count_query = select(func.count()).select_from(capped.subquery())
+        total = int((await session.execute(count_query)).scalar() or 0)
+        if total > COUNT_ESTIMATE_CAP:
+            return COUNT_ESTIMATE_CAP, True
+        return total, False
+    # maintain_column_froms keeps FROM when the query has no joins or filters referencing the table.
+    count_q = query.with_only_columns(func.count(), maintain_column_froms=True).order_by(None)
+    return int((await session.execute(count_q)).scalar() or 0), False
+
+
+async def count_total_sql(
+    session: AsyncSession,
+    from_where_sql: str,
+    params: dict[str, Any],
+    pagination: PaginationParams,
+) -> tuple[int | None, bool]:
+    """``count_total`` for raw SQL list queries; ``from_where_sql`` is the "FROM ... WHERE" part."""
+    if pagination.count == "none":
+        return None, False
+    if pagination.count == "estimate":
+        sql = f"SELECT COUNT(*) FROM (SELECT 1 {from_where_sql} LIMIT :_count_cap) AS capped"  # noqa: S608
+        capped_params = {**params, "_count_cap": COUNT_ESTIMATE_CAP + 1}
+        total = int((await session.execute(text(sql), capped_params)).scalar() or 0)
+        if total > COUNT_ESTIMATE_CAP:
+            return COUNT_ESTIMATE_CAP, True
+        return total, False
+    sql = f"SELECT COUNT(*) {from_where_sql}"  # nosec B608
+    return int((await session.execute(text(sql), params)).scalar() or 0), False
@@ -0,0 +1,116 @@
+"""Per-request SQL statement accounting via SQLAlchemy engine events."""
+
+from __future__ import annotations
+
+import re
+import time
+from collections import Counter
+from collections.abc import Callable
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|(?<!:):\w+")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+_QUERY_START_KEY = "sds_query_start"
+
+StatementObserver = Callable[[str, Any, bool, float], None]
+_statement_observers: list[StatementObserver] = []
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse literals, bind placeholders and IN-lists so equal query shapes compare equal."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class RequestQueryStats:
+    """Statements executed while serving one HTTP request."""
+
+    request_id: str
+    count: int = 0
+    total_seconds: float = 0.0
+    shapes: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str, duration_seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += duration_seconds
+        self.shapes[normalize_statement(statement)] += 1
+
+    @property
+    def total_ms(self) -> float:
+        return round(self.total_seconds * 1000, 2)
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes executed more than ``threshold`` times (N+1 suspects)."""
+        if threshold <= 0:
+            return []
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+_current_stats: ContextVar[RequestQueryStats | None] = ContextVar(
+    "sds_request_query_stats", default=None
+)
+
+
+def begin_request(request_id: str) -> tuple[RequestQueryStats, Token]:
+    stats = RequestQueryStats(request_id=request_id)
+    return stats, _current_stats.set(stats)
+
+
+def end_request(token: Token) -> None:
+    _current_stats.reset(token)
+
+
+def current_stats() -> RequestQueryStats | None:
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get(_QUERY_START_KEY)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    for observer in _statement_observers:
+        observer(statement, parameters, executemany, elapsed)
+
+
+def _handle_error(exception_context) -> None:
+    # A failed statement never reaches after_cursor_execute: drop its start time, or the next
+    # statement on this pooled connection would be timed from it.
+    conn = exception_context.connection
+    starts = conn.info.get(_QUERY_START_KEY) if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def add_statement_observer(observer: StatementObserver) -> None:
+    """Call ``observer(statement, parameters, executemany, elapsed_seconds)`` per statement."""
+    if observer not in _statement_observers:
+        _statement_observers.append(observer)
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """Attach timing hooks to a sync engine (use ``AsyncEngine.sync_engine``)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,224 @@
+"""Minimal S3-compatible object client (AWS Signature V4 over httpx), enough for photo storage.
+
+Path-style addressing (``{endpoint}/{bucket}/{key}``) so it works with MinIO, Ceph RGW, Yandex
+Object Storage and AWS alike, without pulling boto3 into the API image.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+import aiofiles
+import httpx
+
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+EMPTY_PAYLOAD_SHA256 = hashlib.sha256(b"").hexdigest()
+_CHUNK_SIZE = 1024 * 1024
+
+
+class S3Error(Exception):
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(f"S3 {status_code}: {message}")
+        self.status_code = status_code
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def _quote(value: str, safe: str = "-_.~") -> str:
+    return quote(value, safe=safe)
+
+
+def signature_v4(
+    *,
+    method: str,
+    host: str,
+    path: str,
+    query: dict[str, str],
+    headers: dict[str, str],
+    payload_hash: str,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    now: datetime,
+) -> tuple[str, str, str]:
+    """(signature, credential scope, signed header names) for one request.
+
+    ``headers`` must not contain ``host``; it is always signed.
+    """
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date = amz_date[:8]
+    signed = {"host": host, **{name.lower(): value.strip() for name, value in headers.items()}}
+    signed_names = ";".join(sorted(signed))
+    canonical_request = "\n".join(
+        [
+            method,
+            _quote(path, safe="/-_.~"),
+            "&".join(f"{_quote(k)}={_quote(v)}" for k, v in sorted(query.items())),
+            "".join(f"{name}:{signed[name]}\n" for name in sorted(signed)),
+            signed_names,
+            payload_hash,
+        ]
+    )
+    scope = f"{date}/{region}/s3/aws4_request"
+    string_to_sign = "\n".join(
+        [
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ]
+    )
+    key = _hmac(
+        _hmac(_hmac(_hmac(f"AWS4{secret_key}".encode(), date), region), "s3"), "aws4_request"
+    )
+    return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest(), scope, signed_names
+
+
+class S3Client:
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        *,
+        transport: httpx.AsyncBaseTransport | None = None,
+        timeout: float = 60.0,
+    ) -> None:
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.host = urlsplit(self.endpoint_url).netloc
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self._transport = transport
+        self._timeout = timeout
+        self._client: httpx.AsyncClient | None = None
+
+    def _path(self, key: str) -> str:
+        return f"/{self.bucket}/{key.lstrip('/')}"
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(transport=self._transport, timeout=self._timeout)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(
+        self,
+        method: str,
+        key: str,
+        *,
+        payload_hash: str = EMPTY_PAYLOAD_SHA256,
+        headers: dict[str, str] | None = None,
+        content=None,
+        stream: bool = False,
+    ) -> httpx.Response:
+        now = datetime.now(UTC)
+        amz = {"x-amz-content-sha256": payload_hash, "x-amz-date": now.strftime("%Y%m%dT%H%M%SZ")}
+        path = self._path(key)
+        signature, scope, signed_names = signature_v4(
+            method=method,
+            host=self.host,
+            path=path,
+            query={},
+            headers={
+                **amz,
+                **{k: v for k, v in (headers or {}).items() if k.lower().startswith("x-amz-")},
+            },
+            payload_hash=payload_hash,
+            access_key=self.access_key,
+            secret_key=self.secret_key,
+            region=self.region,
+            now=now,
+        )
+        request_headers = {
+            **(headers or {}),
+            **amz,
+            "Authorization": (
+                f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+                f"SignedHeaders={signed_names}, Signature={signature}"
+            ),
+        }
+        request = self._http().build_request(
+            method,
+            self.endpoint_url + _quote(path, safe="/-_.~"),
+            headers=request_headers,
+            content=content,
+        )
+        response = await self._http().send(request, stream=stream)
+        if response.status_code >= 300 and not (method == "HEAD" and response.status_code == 404):
+            body = (await response.aread()).decode(errors="replace")[:200]
+            await response.aclose()
+            raise S3Error(response.status_code, body or response.reason_phrase)
+        return response
+
+    async def put_file(self, key: str, source: Path, *, sha256: str, content_type: str) -> None:
+        async def body() -> AsyncIterator[bytes]:
+            async with aiofiles.open(source, "rb") as handle:
+                while chunk := await handle.read(_CHUNK_SIZE):
+                    yield chunk
+
+        await self._request(
+            "PUT",
+            key,
+            payload_hash=sha256,
+            headers={"Content-Type": content_type, "Content-Length": str(source.stat().st_size)},
+            content=body(),
+        )
+
+    async def download(self, key: str, destination: Path) -> None:
+        response = await self._request("GET", key, stream=True)
+        try:
+            async with aiofiles.open(destination, "wb") as output:
+                async for chunk in response.aiter_bytes(_CHUNK_SIZE):
+                    await output.write(chunk)
+        finally:
+            await response.aclose()
+
+    async def exists(self, key: str) -> bool:
+        return (await self._request("HEAD", key)).status_code == 200
+
+    async def delete(self, key: str) -> None:
+        await self._request("DELETE", key)
+
+    def presign(self, key: str, expires: int, *, now: datetime | None = None) -> str:
+        """Time-limited GET URL (query-string authentication)."""
+        now = now or datetime.now(UTC)
+        path = self._path(key)
+        date = now.strftime("%Y%m%d")
+        query = {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self.access_key}/{date}/{self.region}/s3/aws4_request",
+            "X-Amz-Date": now.strftime("%Y%m%dT%H%M%SZ"),
+            "X-Amz-Expires": str(expires),
+            "X-Amz-SignedHeaders": "host",
+        }
+        signature, _scope, _names = signature_v4(
+            method="GET",
+            host=self.host,
+            path=path,
+            query=query,
+            headers={},
+            payload_hash=UNSIGNED_PAYLOAD,
+            access_key=self.access_key,
+            secret_key=self.secret_key,
+            region=self.region,
+            now=now,
+        )
+        encoded = "&".join(f"{_quote(k)}={_quote(v)}" for k, v in sorted(query.items()))
+        return (
+            f"{self.endpoint_url}{_quote(path, safe='/-_.~')}?{encoded}&X-Amz-Signature={signature}"
+        )
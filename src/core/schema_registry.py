@@ -0,0 +1,87 @@
+"""In-memory map of the "Sales" schema columns.
+
+Loaded once instead of probing information_schema on every request.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import UTC, datetime
+
+from sqlalchemy import text
+
+from src.database.connection import engine
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_NAME = "Sales"
+
+_COLUMNS_SQL = text(
+    """
+    SELECT table_name, column_name
+    FROM information_schema.columns
+    WHERE table_schema = :schema
+    """
+)
+
+
+class SchemaCapabilities:
+    """Answers "does table/column exist" from memory; refresh after migrations."""
+
+    def __init__(self) -> None:
+        self._columns: dict[str, frozenset[str]] = {}
+        self.loaded_at: datetime | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def load(self, rows) -> None:
+        columns: dict[str, set[str]] = {}
+        for table_name, column_name in rows:
+            columns.setdefault(table_name, set()).add(column_name)
+        self._columns = {table: frozenset(cols) for table, cols in columns.items()}
+        self.loaded_at = datetime.now(UTC)
+
+    async def refresh(self, conn) -> None:
+        """Reload from ``conn`` (AsyncSession or AsyncConnection)."""
+        result = await conn.execute(_COLUMNS_SQL, {"schema": SCHEMA_NAME})
+        self.load(result.fetchall())
+        logger.info(
+            "Schema capabilities loaded: %s tables, %s columns",
+            len(self._columns),
+            sum(len(cols) for cols in self._columns.values()),
+        )
+
+    def has_table(self, table_name: str) -> bool:
+        return table_name in self._columns
+
+    def has_column(self, table_name: str, column_name: str) -> bool:
+        return column_name in self._columns.get(table_name, ())
+
+    def as_dict(self) -> dict:
+        return {
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "tables": {table: sorted(cols) for table, cols in sorted(self._columns.items())},
+        }
+
+
+SCHEMA = SchemaCapabilities()
+
+
+async def has_column(conn, table_name: str, column_name: str) -> bool:
+    """Column check that loads the registry through ``conn`` on first use (startup load failed)."""
+    if not SCHEMA.loaded:
+        await SCHEMA.refresh(conn)
+    return SCHEMA.has_column(table_name, column_name)
+
+
+async def refresh_schema_capabilities() -> bool:
+    """Load the registry on startup or after migrations; on failure callers load it lazily."""
+    try:
+        async with engine.connect() as conn:
+            await SCHEMA.refresh(conn)
+        return True
+    except Exception as exc:
+        logger.warning("Could not load schema capabilities: %s", exc)
+        return False
@@ -0,0 +1,231 @@
+"""Slow SQL recorder: fingerprints statements above SLOW_QUERY_MS, samples their EXPLAIN plans."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any
+
+from src.core.config import settings
+from src.core.query_stats import add_statement_observer, normalize_statement
+
+logger = logging.getLogger(__name__)
+
+_EXPLAINABLE_PREFIXES = ("SELECT", "WITH")
+_MAX_STATEMENT_CHARS = 4000
+
+
+def fingerprint(shape: str) -> str:
+    """Stable short id of a normalized statement shape."""
+    return hashlib.sha1(shape.encode("utf-8"), usedforsecurity=False).hexdigest()[:16]
+
+
+@dataclass
+class SlowQueryEntry:
+    fingerprint: str
+    statement: str
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seen: datetime | None = None
+    plan: Any = None
+    plan_captured_at: datetime | None = None
+    _plan_claimed_at: float | None = None
+
+    def as_dict(self, include_plan: bool = False) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "fingerprint": self.fingerprint,
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total_seconds * 1000, 2),
+            "avg_ms": round(self.total_seconds * 1000 / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 2),
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+            "has_plan": self.plan is not None,
+            "plan_captured_at": (
+                self.plan_captured_at.isoformat() if self.plan_captured_at else None
+            ),
+        }
+        if include_plan:
+            data["plan"] = self.plan
+        return data
+
+
+class SlowQueryLog:
+    """Per-process aggregate of slow statements keyed by fingerprint."""
+
+    _ORDERINGS = {
+        "total": lambda e: e.total_seconds,
+        "max": lambda e: e.max_seconds,
+        "count": lambda e: e.count,
+    }
+
+    def __init__(self, max_entries: int = 500) -> None:
+        self.max_entries = max_entries
+        self._entries: dict[str, SlowQueryEntry] = {}
+        self._lock = threading.Lock()
+
+    def record(self, shape: str, elapsed_seconds: float) -> SlowQueryEntry:
+        fp = fingerprint(shape)
+        with self._lock:
+            entry = self._entries.get(fp)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    victim = min(self._entries.values(), key=lambda e: e.total_seconds)
+                    del self._entries[victim.fingerprint]
+                entry = SlowQueryEntry(fingerprint=fp, statement=shape[:_MAX_STATEMENT_CHARS])
+                self._entries[fp] = entry
+            entry.count += 1
+            entry.total_seconds += elapsed_seconds
+            entry.max_seconds = max(entry.max_seconds, elapsed_seconds)
+            entry.last_seen = datetime.now(UTC)
+            return entry
+
+    def claim_plan(self, fp: str, interval_seconds: float) -> bool:
+        """True if the caller should capture a plan now (one per interval per fingerprint)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(fp)
+            if entry is None:
+                return False
+            if (
+                entry._plan_claimed_at is not None
+                and now - entry._plan_claimed_at < interval_seconds
+            ):
+                return False
+            entry._plan_claimed_at = now
+            return True
+
+    def set_plan(self, fp: str, plan: Any) -> None:
+        with self._lock:
+            entry = self._entries.get(fp)
+            if entry is not None:
+                entry.plan = plan
+                entry.plan_captured_at = datetime.now(UTC)
+
+    def get(self, fp: str) -> SlowQueryEntry | None:
+        with self._lock:
+            return self._entries.get(fp)
+
+    def top(self, limit: int = 20, order_by: str = "total") -> list[SlowQueryEntry]:
+        key = self._ORDERINGS.get(order_by)
+        if key is None:
+            raise ValueError(f"order_by must be one of {sorted(self._ORDERINGS)}")
+        with self._lock:
+            entries = list(self._entries.values())
+        return sorted(entries, key=key, reverse=True)[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+SLOW_QUERIES = SlowQueryLog()
+
+_explain_engine = None
+_pending_plans: set[asyncio.Task] = set()
+_file_logger: logging.Logger | None = None
+
+
+def _get_file_logger() -> logging.Logger:
+    """Rotating JSON-lines file, separate from loguru so plans do not flood app.log."""
+    global _file_logger
+    if _file_logger is None:
+        path = Path(settings.slow_query_log_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file_logger = logging.getLogger("sds.slow_queries")
+        file_logger.propagate = False
+        file_logger.setLevel(logging.INFO)
+        if not file_logger.handlers:
+            handler = RotatingFileHandler(
+                path, maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            file_logger.addHandler(handler)
+        _file_logger = file_logger
+    return _file_logger
+
+
+def _write_event(event: str, entry: SlowQueryEntry, **extra: Any) -> None:
+    payload = {
+        "ts": datetime.now(UTC).isoformat(),
+        "event": event,
+        "fingerprint": entry.fingerprint,
+        "statement": entry.statement,
+        **extra,
+    }
+    try:
+        _get_file_logger().info(json.dumps(payload, ensure_ascii=False, default=str))
+    except OSError:
+        logger.warning(
+            "Cannot write slow query log %s", settings.slow_query_log_file, exc_info=True
+        )
+
+
+async def _capture_plan(fp: str, statement: str, parameters: Any) -> None:
+    try:
+        async with _explain_engine.connect() as conn:
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN (ANALYZE false, FORMAT JSON) {statement}",
+                parameters,
+            )
+            plan = result.scalar()
+    except Exception as exc:
+        logger.warning("EXPLAIN failed for slow query %s: %s", fp, exc)
+        return
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    SLOW_QUERIES.set_plan(fp, plan)
+    entry = SLOW_QUERIES.get(fp)
+    if entry is not None:
+        _write_event("plan", entry, plan=plan)
+
+
+def _schedule_plan_capture(fp: str, statement: str, parameters: Any) -> None:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    # Fresh context: the EXPLAIN must not be counted against the request that triggered it.
+    task = loop.create_task(_capture_plan(fp, statement, parameters), context=contextvars.Context())
+    _pending_plans.add(task)
+    task.add_done_callback(_pending_plans.discard)
+
+
+def observe_statement(
+    statement: str, parameters: Any, executemany: bool, elapsed_seconds: float
+) -> None:
+    threshold_ms = settings.slow_query_ms
+    if threshold_ms <= 0 or elapsed_seconds * 1000 < threshold_ms:
+        return
+    head = statement.lstrip()[:7].upper()
+    if head.startswith("EXPLAIN"):
+        return
+    try:
+        entry = SLOW_QUERIES.record(normalize_statement(statement), elapsed_seconds)
+        _write_event("slow_query", entry, duration_ms=round(elapsed_seconds * 1000, 2))
+        if (
+            _explain_engine is not None
+            and not executemany
+            and head.startswith(_EXPLAINABLE_PREFIXES)
+            and SLOW_QUERIES.claim_plan(entry.fingerprint, settings.slow_query_explain_interval)
+        ):
+            _schedule_plan_capture(entry.fingerprint, statement, parameters)
+    except Exception:
+        logger.warning("Slow query recorder failed", exc_info=True)
+
+
+def install_slow_query_log(engine) -> None:
+    """Enable recording for statements run through ``engine`` (an AsyncEngine used for EXPLAIN)."""
+    global _explain_engine
+    _explain_engine = engine
+    add_statement_observer(observe_statement)
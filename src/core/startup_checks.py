@@ -0,0 +1,82 @@
+"""Startup diagnostics that run after the API starts serving (STARTUP_CHECKS=background)."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from src.database.connection import (
+    check_data_integrity,
+    get_schema_info,
+    verify_postgres_max_connections,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StartupCheckReport:
+    status: str = "pending"
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    duration_ms: float | None = None
+    max_connections: int | None = None
+    tables: list[str] = field(default_factory=list)
+    integrity: list[dict[str, Any]] = field(default_factory=list)
+    error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        for key in ("started_at", "finished_at"):
+            if data[key] is not None:
+                data[key] = data[key].isoformat()
+        return data
+
+
+STARTUP_REPORT = StartupCheckReport()
+_background_task: asyncio.Task | None = None
+
+
+async def run_startup_checks(report: StartupCheckReport = STARTUP_REPORT) -> StartupCheckReport:
+    """Run pool capacity, schema and integrity checks, filling ``report`` as they complete."""
+    report.status = "running"
+    report.started_at = datetime.now(UTC)
+    start = time.perf_counter()
+    try:
+        report.max_connections = await verify_postgres_max_connections()
+        report.tables = [row[0] for row in await get_schema_info()]
+        report.integrity = await check_data_integrity()
+    except Exception as exc:
+        logger.warning("Startup checks failed: %s", exc)
+        report.status = "failed"
+        report.error = str(exc)
+    else:
+        report.status = "warn" if any(r["status"] != "ok" for r in report.integrity) else "ok"
+    report.finished_at = datetime.now(UTC)
+    report.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+    logger.info(
+        "Startup checks finished status=%s duration_ms=%s", report.status, report.duration_ms
+    )
+    return report
+
+
+def start_background_checks() -> asyncio.Task:
+    global _background_task
+    _background_task = asyncio.create_task(run_startup_checks(), name="startup-checks")
+    return _background_task
+
+
+async def stop_background_checks() -> None:
+    """Cancel checks still running at shutdown so they do not hold pool connections."""
+    task = _background_task
+    if task is None or task.done():
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        STARTUP_REPORT.status = "cancelled"
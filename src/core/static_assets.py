@@ -0,0 +1,214 @@
+"""Static assets: content-hash fingerprints and precompressed ``.gz`` / ``.br`` siblings.
+
+``build_static_assets`` copies ``src/static`` into ``STATIC_BUILD_DIR``: every asset is written
+under its own name and as ``<stem>.<sha256[:12]><ext>``, text assets also gzip- (and, with the
+``brotli`` package, brotli-) compressed at maximum level once, instead of on every request. The
+pages (``app.html``, ``login.html``) are rewritten to reference the hashed names, so browsers
+cache those forever and a repeat load only revalidates the page itself.
+
+Run at deploy with ``python -m src.scripts.build_static`` (or at startup with
+``STATIC_BUILD_ON_STARTUP=true``; unchanged files are not rewritten).
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+from fastapi.responses import FileResponse, Response
+from starlette.datastructures import Headers
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from src.core.file_delivery import IMMUTABLE_CACHE_CONTROL, NAMED_FILE_CACHE_CONTROL, file_etag
+from src.core.http_cache import etag_matches
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip siblings are written without it
+    brotli = None
+
+MANIFEST_NAME = "manifest.json"
+PAGES = ("app.html", "login.html")
+# Pages must pick up a new build at once: always revalidate (ETag makes that a 304).
+PAGE_CACHE_CONTROL = "no-cache"
+COMPRESSIBLE_SUFFIXES = frozenset(
+    {".js", ".css", ".html", ".svg", ".json", ".txt", ".map", ".ico", ".xml"}
+)
+MIN_COMPRESS_SIZE = 512
+# (Accept-Encoding token, file suffix) in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Root URLs the app serves from an asset, rewritten in pages like ``/static/...`` references
+PAGE_ALIASES = {"/favicon.ico": "favicon.png"}
+
+_HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+
+
+def fingerprinted_name(relative: str, data: bytes) -> str:
+    path = Path(relative)
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    return path.with_name(f"{path.stem}.{digest}{path.suffix}").as_posix()
+
+
+def is_fingerprinted(name: str) -> bool:
+    return bool(_HASHED_NAME_RE.search(name))
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")  # several workers may build at once
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def _write_asset(path: Path, data: bytes) -> None:
+    """Write ``path`` and, for text assets, its compressed siblings (only when they are smaller)."""
+    changed = _write_if_changed(path, data)
+    if path.suffix.lower() not in COMPRESSIBLE_SUFFIXES or len(data) < MIN_COMPRESS_SIZE:
+        return
+    variants = {".gz": lambda: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = lambda: brotli.compress(data, quality=11)
+    for suffix, compress in variants.items():
+        sibling = path.with_name(path.name + suffix)
+        # level 9 / quality 11 are slow: never redo them for nothing
+        if changed or not sibling.exists():
+            compressed = compress()
+            if len(compressed) < len(data):
+                _write_if_changed(sibling, compressed)
+
+
+def _rewrite_page(html: str, manifest: dict[str, str]) -> str:
+    # Longest names first, so "vendor/x/a.js" is not clobbered by a shorter "a.js"
+    for relative in sorted(manifest, key=len, reverse=True):
+        html = html.replace(f"/static/{relative}", f"/static/{manifest[relative]}")
+    for url, relative in PAGE_ALIASES.items():
+        if relative in manifest:
+            html = re.sub(
+                rf"""(["']){re.escape(url)}(["'])""",
+                rf"\g<1>/static/{manifest[relative]}\g<2>",
+                html,
+            )
+    return html
+
+
+def build_static_assets(source: Path, target: Path) -> dict[str, str]:
+    """Build ``target`` from ``source``; returns the manifest {asset: fingerprinted asset}."""
+    manifest: dict[str, str] = {}
+    pages: dict[str, bytes] = {}
+    for path in sorted(p for p in source.rglob("*") if p.is_file()):
+        relative = path.relative_to(source).as_posix()
+        data = path.read_bytes()
+        if relative in PAGES:
+            pages[relative] = data
+            continue
+        manifest[relative] = fingerprinted_name(relative, data)
+        # The plain name stays too: CSS url(images/...) and links from cached old pages
+        _write_asset(target / relative, data)
+        _write_asset(target / manifest[relative], data)
+    for relative, data in pages.items():
+        # utf-8-sig keeps the BOM of app.html as it is
+        html = _rewrite_page(data.decode("utf-8-sig"), manifest)
+        _write_asset(
+            target / relative,
+            (b"\xef\xbb\xbf" if data.startswith(b"\xef\xbb\xbf") else b"") + html.encode(),
+        )
+    _write_if_changed(
+        target / MANIFEST_NAME, json.dumps(manifest, indent=1, sort_keys=True).encode()
+    )
+    return manifest
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue  # explicitly refused
+            except ValueError:
+                continue
+        if token:
+            accepted.add(token)
+    return accepted
+
+
+def negotiate(path: Path, accept_encoding: str) -> tuple[Path, str | None]:
+    """The precompressed sibling of ``path`` the client accepts, or ``path`` itself."""
+    accepted = accepted_encodings(accept_encoding)
+    for encoding, suffix in ENCODINGS:
+        candidate = path.with_name(path.name + suffix)
+        if (encoding in accepted or "*" in accepted) and candidate.is_file():
+            return candidate, encoding
+    return path, None
+
+
+def asset_response(path: Path, request_headers: Headers, *, cache_control: str) -> Response:
+    """Conditional response with the best precompressed variant of ``path``."""
+    variant, encoding = negotiate(path, request_headers.get("accept-encoding", ""))
+    stat_result = variant.stat()
+    headers = {
+        "ETag": file_etag(stat_result),
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type == "application/javascript":
+        media_type += "; charset=utf-8"
+    return FileResponse(variant, headers=headers, media_type=media_type, stat_result=stat_result)
+
+
+def page_response(
+    build_dir: Path, source_dir: Path, name: str, request_headers: Headers
+) -> Response:
+    """A page from the build, or the source page while no build exists yet."""
+    path = build_dir / name
+    if not path.is_file():
+        path = source_dir / name
+    return asset_response(path, request_headers, cache_control=PAGE_CACHE_CONTROL)
+
+
+class AssetStaticFiles(StaticFiles):
+    """``/static`` mount over the build: fingerprinted names are immutable, others cached for a day.
+
+    ``fallback_directory`` (the sources) is searched after the build, so nothing 404s before the
+    first build finishes.
+    """
+
+    def __init__(self, *args, fallback_directory: str | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if fallback_directory is not None:
+            self.all_directories.append(fallback_directory)
+
+    async def check_config(self) -> None:
+        if os.path.isdir(self.directory):  # a missing build is served from the fallback
+            await super().check_config()
+
+    def file_response(
+        self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200
+    ) -> Response:
+        path = Path(full_path)
+        cache_control = (
+            IMMUTABLE_CACHE_CONTROL if is_fingerprinted(path.name) else NAMED_FILE_CACHE_CONTROL
+        )
+        return asset_response(path, Headers(scope=scope), cache_control=cache_control)
@@ -0,0 +1,312 @@
+"""Process-wide translation catalog shared by the API, the notifications and the Telegram bot.
+
+All ``(key, language)`` rows of "Sales".translations are loaded with one SELECT; per-language
+maps with the default-language fallback and the key aliases already applied, and the reverse
+text -> key index used to localize hard-coded literals, are built once per change, so a lookup
+is a plain dict hit.
+
+Freshness:
+* the translations CRUD (``TranslationService``) fires ``NOTIFY sales_translations`` in the
+  writing transaction; every process running ``start_translation_listener`` refreshes on it;
+* otherwise, and as a safety net (psql, migrations, a lost listener connection), the catalog
+  re-reads the rows whose indexed ``updated_at`` moved, at most every
+  ``TRANSLATIONS_REFRESH_SECONDS``; a row count mismatch (deletes) triggers a full reload.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.metrics import record_cache_lookup
+from src.database.connection import async_session
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "sales_translations"
+
+# Keys that leaked into handlers/UI under an old name -> current key.
+ALIAS_KEYS: dict[str, str] = {
+    "telegram.button.back": "telegram.action.back",
+    "telegram.button.cancel": "telegram.action.cancel",
+}
+
+# updated_at is the writing transaction's start time: re-read a margin so that a transaction
+# committed after the previous refresh is not skipped.
+_INCREMENTAL_OVERLAP = timedelta(seconds=60)
+
+_ALL_SQL = text(
+    """
+    SELECT translation_key, language_code, translation_text, category, updated_at
+    FROM "Sales".translations
+    """
+)
+_CHANGED_SQL = text(
+    """
+    SELECT translation_key, language_code, translation_text, category, updated_at
+    FROM "Sales".translations
+    WHERE updated_at > :since
+    """
+)
+_COUNT_SQL = text('SELECT count(*) FROM "Sales".translations')
+_NOTIFY_SQL = text("SELECT pg_notify(:channel, :payload)")
+
+
+class TranslationCatalog:
+    """Translations in memory: raw rows plus lazily built, fully resolved per-language views.
+
+    A view is a transform applied to every text once per catalog change (the bot registers one
+    that unescapes ``\\n`` and repairs mojibake).
+    """
+
+    def __init__(self, refresh_seconds: float) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._rows: dict[tuple[str, str], str] = {}
+        self._categories: dict[str, str | None] = {}
+        self._views: dict[str, Callable[[str], str]] = {}
+        self._resolved: dict[tuple[str, str | None], dict[str, str]] = {}
+        self._literal_index: dict[tuple[str, str | None], dict[str, str]] = {}
+        self._watermark: datetime | None = None
+        self._checked_at = 0.0
+        self._loaded = False
+        self._full_reload = False
+        self._lock = asyncio.Lock()
+        self.generation = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def register_view(self, name: str, transform: Callable[[str], str]) -> None:
+        self._views[name] = transform
+        self._resolved = {k: v for k, v in self._resolved.items() if k[1] != name}
+        self._literal_index = {k: v for k, v in self._literal_index.items() if k[1] != name}
+
+    def invalidate(self, *, full: bool = False) -> None:
+        """Make the next ``ready()`` re-read the database (``full`` after deletes)."""
+        self._checked_at = 0.0
+        self._full_reload = self._full_reload or full
+
+    # --- loading -----------------------------------------------------------------------------
+
+    def load(self, rows) -> None:
+        """Replace the whole catalog with ``rows`` (key, lang, text, category, updated_at)."""
+        self._rows = {}
+        self._categories = {}
+        self._watermark = None
+        self._apply(rows)
+        self._loaded = True
+        self._full_reload = False
+
+    def _apply(self, rows) -> int:
+        changed = 0
+        for key, lang, value, category, updated_at in rows:
+            if self._rows.get((key, lang)) != value:
+                changed += 1
+            self._rows[(key, lang)] = value
+            self._categories[key] = category
+            if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+                self._watermark = updated_at
+        if changed or not self._loaded:
+            self._resolved = {}
+            self._literal_index = {}
+            self.generation += 1
+        return changed
+
+    async def refresh(self, session: AsyncSession) -> None:
+        if not self._loaded or self._full_reload or self._watermark is None:
+            self.load((await session.execute(_ALL_SQL)).fetchall())
+        else:
+            since = self._watermark - _INCREMENTAL_OVERLAP
+            self._apply((await session.execute(_CHANGED_SQL, {"since": since})).fetchall())
+            if int((await session.execute(_COUNT_SQL)).scalar() or 0) != len(self._rows):
+                # Rows were deleted (or keys renamed) behind our back
+                self.load((await session.execute(_ALL_SQL)).fetchall())
+        self._checked_at = time.monotonic()
+
+    async def ready(self, session: AsyncSession | None = None) -> TranslationCatalog:
+        """Load on first use and refresh when due; a no-op (no query) most of the time."""
+        fresh = self._loaded and time.monotonic() - self._checked_at < self.refresh_seconds
+        record_cache_lookup("translation_catalog", fresh)
+        if fresh:
+            return self
+        async with self._lock:
+            if self._loaded and time.monotonic() - self._checked_at < self.refresh_seconds:
+                return self
+            try:
+                if session is not None:
+                    await self.refresh(session)
+                else:
+                    async with async_session() as own_session:
+                        await self.refresh(own_session)
+            except Exception:
+                if not self._loaded:
+                    raise
+                # Keep serving the last good copy; retry on a later call
+                logger.exception("Translation catalog refresh failed")
+                self._checked_at = time.monotonic()
+        return self
+
+    # --- lookups (pure dict hits) --------------------------------------------------------------
+
+    @property
+    def default_language(self) -> str:
+        return settings.effective_default_language
+
+    def _build(self, lang: str, view: str | None) -> dict[str, str]:
+        transform = self._views.get(view) if view else None
+        default_lang = self.default_language
+        resolved: dict[str, str] = {}
+        for (key, row_lang), value in self._rows.items():
+            if row_lang == lang or (row_lang == default_lang and key not in resolved):
+                resolved[key] = value
+        for alias, target in ALIAS_KEYS.items():
+            if target in resolved:
+                resolved[alias] = resolved[target]
+        if transform is not None:
+            resolved = {key: transform(value) for key, value in resolved.items()}
+        return resolved
+
+    def texts(self, lang: str, view: str | None = None) -> dict[str, str]:
+        """key -> text in ``lang`` (default language when missing), aliases included."""
+        resolved = self._resolved.get((lang, view))
+        if resolved is None:
+            resolved = self._resolved[(lang, view)] = self._build(lang, view)
+        return resolved
+
+    def get(
+        self, key: str, lang: str, default: str | None = None, *, view: str | None = None
+    ) -> str | None:
+        return self.texts(lang, view).get(key, default)
+
+    def _build_literal_index(self, lang: str, view: str | None) -> dict[str, str]:
+        transform = self._views.get(view) if view else None
+        default_lang = self.default_language
+        best: dict[str, tuple[int, str]] = {}
+        for (key, row_lang), value in self._rows.items():
+            literal = (transform(value) if transform is not None else value).strip()
+            if not literal:
+                continue
+            # Same preference as the old ORDER BY: the user's language, the default one, then key
+            rank = (0 if row_lang == lang else 1 if row_lang == default_lang else 2, key)
+            current = best.get(literal)
+            if current is None or rank < current:
+                best[literal] = rank
+        return {literal: key for literal, (_rank, key) in best.items()}
+
+    def literal_keys(self, lang: str, view: str | None = None) -> dict[str, str]:
+        """Reverse index: stripped text (any language) -> translation key, preferring ``lang``."""
+        index = self._literal_index.get((lang, view))
+        if index is None:
+            index = self._literal_index[(lang, view)] = self._build_literal_index(lang, view)
+        return index
+
+    def category(self, key: str) -> str | None:
+        return self._categories.get(key)
+
+    def rows(self) -> dict[tuple[str, str], str]:
+        return self._rows
+
+
+async def notify_translations_changed(session: AsyncSession, *, deleted: bool = False) -> None:
+    """Queue a cluster-wide refresh; Postgres delivers it only if the caller's transaction commits.
+
+    The writing process should also ``TRANSLATION_CATALOG.invalidate()`` after its commit, so it
+    sees its own change even without a listener.
+    """
+    await session.execute(
+        _NOTIFY_SQL, {"channel": NOTIFY_CHANNEL, "payload": "delete" if deleted else "upsert"}
+    )
+
+
+def _listener_dsn() -> str:
+    url = settings.database_url
+    for driver in ("+asyncpg", "+psycopg"):
+        url = url.replace(f"postgresql{driver}://", "postgresql://", 1)
+    return url
+
+
+async def _listen_once(catalog: TranslationCatalog) -> None:
+    """Hold one LISTEN connection until it drops."""
+    import asyncpg
+
+    connection = await asyncpg.connect(_listener_dsn())
+    closed = asyncio.Event()
+
+    def _on_notify(_connection, _pid, _channel, payload: str) -> None:
+        catalog.invalidate(full=payload == "delete")
+
+    try:
+        connection.add_termination_listener(lambda _connection, closed=closed: closed.set())
+        await connection.add_listener(NOTIFY_CHANNEL, _on_notify)
+        catalog.invalidate()  # notifications sent while we were not listening are lost
+        await closed.wait()
+    finally:
+        if not connection.is_closed():
+            await connection.close()
+
+
+async def _listen_forever(
+    catalog: TranslationCatalog, *, initial_delay: float = 1.0, max_delay: float = 60.0
+) -> None:
+    delay = initial_delay
+    while True:
+        started = time.monotonic()
+        try:
+            await _listen_once(catalog)
+            logger.warning("Translation listener connection lost, reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # Any failure (connect, LISTEN setup, a dropped connection) only delays the next attempt
+            logger.warning("Translation listener failed: %s", exc)
+        if time.monotonic() - started > max_delay:
+            delay = initial_delay  # the connection was up for a while: not a reconnect loop
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+
+async def _warm_and_listen(catalog: TranslationCatalog) -> None:
+    """Load the catalog off the startup path, then keep it fresh."""
+    try:
+        await catalog.ready()
+        logger.info("Translation catalog loaded: %s rows", len(catalog.rows()))
+    except Exception as exc:
+        logger.warning(
+            "Translation catalog not loaded at startup (will retry on first use): %s", exc
+        )
+    await _listen_forever(catalog)
+
+
+_listener_task: asyncio.Task | None = None
+
+
+def start_translation_listener(*, warm: bool = False) -> None:
+    """Start listening for catalog changes; ``warm`` also loads the catalog first, in the task."""
+    global _listener_task
+    if _listener_task is None or _listener_task.done():
+        listener = _warm_and_listen if warm else _listen_forever
+        _listener_task = asyncio.create_task(listener(TRANSLATION_CATALOG))
+
+
+async def stop_translation_listener() -> None:
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.debug("Translation listener ended with an error", exc_info=True)
+        _listener_task = None
+
+
+TRANSLATION_CATALOG = TranslationCatalog(refresh_seconds=settings.translations_refresh_seconds)
@@ -3,6 +3,7 @@ PostgreSQL async connection module. Configuration is loaded only from environmen
 """
 
 import logging
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import HTTPException
@@ -11,7 +12,10 @@ from sqlalchemy.exc import TimeoutError as SQLAlchemyTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from src.core import metrics
 from src.core.config import settings
+from src.core.query_stats import install_query_hooks
+from src.core.slow_queries import install_slow_query_log
 
 logger = logging.getLogger(__name__)
 
@@ -33,18 +37,41 @@ DB_POOL_TIMEOUT = 30
 DB_POOL_RECYCLE = 1800
 DB_RESERVED_CONNECTIONS = 10
 
+
+class _TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that reports how long each checkout blocks (no pre-checkout event exists)."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            metrics.DB_POOL_WAIT.observe(time.perf_counter() - start, pool="api")
+
+
 engine = create_async_engine(
     DATABASE_URL,
     echo=settings.api_debug,
     future=True,
     pool_pre_ping=True,
-    poolclass=AsyncAdaptedQueuePool,
+    poolclass=_TimedQueuePool,
     pool_size=DB_POOL_SIZE,
     max_overflow=DB_MAX_OVERFLOW,
     pool_timeout=DB_POOL_TIMEOUT,
     pool_recycle=DB_POOL_RECYCLE,
 )
 
+
+def _collect_pool_metrics() -> None:
+    metrics.DB_POOL_SIZE.set(engine.pool.size(), pool="api")
+    metrics.DB_POOL_CHECKED_OUT.set(engine.pool.checkedout(), pool="api")
+    metrics.DB_POOL_OVERFLOW.set(max(engine.pool.overflow(), 0), pool="api")
+
+
+metrics.REGISTRY.add_collector(_collect_pool_metrics)
+install_query_hooks(engine.sync_engine)
+install_slow_query_log(engine)
+
 async_session = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -122,34 +149,41 @@ async def get_schema_info():
         return tables
 
 
-async def check_data_integrity() -> None:
-    """Run basic integrity checks."""
+async def check_data_integrity() -> list[dict]:
+    """Run basic integrity checks; return one result per check."""
     checks = [
         (
             "Orders without customer",
-            'SELECT COUNT(*) FROM "Sales".orders WHERE customer_id NOT IN (SELECT id FROM "Sales".customers)',
+            'SELECT COUNT(*) FROM "Sales".orders o WHERE o.customer_id IS NOT NULL '
+            'AND NOT EXISTS (SELECT 1 FROM "Sales".customers c WHERE c.id = o.customer_id)',
         ),
         (
             "Items without order",
-            'SELECT COUNT(*) FROM "Sales".items WHERE order_id NOT IN (SELECT order_no FROM "Sales".orders)',
+            'SELECT COUNT(*) FROM "Sales".items i WHERE i.order_id IS NOT NULL '
+            'AND NOT EXISTS (SELECT 1 FROM "Sales".orders o WHERE o.order_no = i.order_id)',
         ),
         (
             "Operations without type",
-            'SELECT COUNT(*) FROM "Sales".operations o WHERE o.type_code IS NOT NULL AND o.type_code NOT IN (SELECT code FROM "Sales".operation_types)',
+            'SELECT COUNT(*) FROM "Sales".operations o WHERE o.type_code IS NOT NULL '
+            'AND NOT EXISTS (SELECT 1 FROM "Sales".operation_types t WHERE t.code = o.type_code)',
         ),
         (
             "Expired batches",
             'SELECT COUNT(*) FROM "Sales".batches WHERE expiry_date < CURRENT_DATE',
         ),
     ]
+    results: list[dict] = []
     for name, query in checks:
         try:
             async with engine.begin() as conn:
                 result = await conn.execute(text(query))
                 count = result.scalar()
                 logger.info("%s %s: %s", "WARN" if count and count > 0 else "OK", name, count)
+                results.append({"name": name, "status": "warn" if count else "ok", "count": count})
         except Exception as exc:
             logger.warning("Check %s failed: %s", name, exc)
+            results.append({"name": name, "status": "failed", "error": str(exc)})
+    return results
 
 
 async def cleanup() -> None:
@@ -10,6 +10,7 @@ from sqlalchemy import (
     Column,
     String,
     Integer,
+    SmallInteger,
     Boolean,
     Numeric,
     Text,
@@ -203,6 +204,11 @@ class CustomerPhoto(Base):
     uploaded_by = Column(String, ForeignKey("Sales.users.login"), nullable=False)
     uploaded_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     photo_datetime = Column(TIMESTAMP(timezone=True), nullable=True)  # Дата и время съёмки
+    # Из EXIF файла (migration 055), заполняются фоновой обработкой после загрузки
+    latitude = Column(Numeric(9, 6), nullable=True)
+    longitude = Column(Numeric(9, 6), nullable=True)
+    exif_orientation = Column(SmallInteger, nullable=True)
+    exif_checked_at = Column(TIMESTAMP(timezone=True), nullable=True)
 
 
 class OperationType(Base):
@@ -1,24 +1,38 @@
 """Sale & Distribution System (SDS) application entrypoint."""
 
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.exceptions import HTTPException as FastAPIHTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, RedirectResponse, Response
 from loguru import logger
 from sqlalchemy.exc import IntegrityError, OperationalError
 
+from src.api.v1.services.photo_exif import shutdown_exif_executor
+from src.api.v1.services.photo_storage import PHOTO_STORAGE
+from src.api.v1.services.photo_thumbnails import shutdown_thumbnail_pool
 from src.core.env import validate_runtime_secrets
+from src.core.file_delivery import PhotoStaticFiles
 from src.core.config import settings
 from src.core.logging_setup import setup_logging
+from src.core.metrics import CONTENT_TYPE_LATEST, render_latest, scrape_authorized
 from src.core.middleware import request_logging_middleware
 from src.core.middleware import SecurityHeadersMiddleware
 from src.core.rate_limit import InMemoryRateLimiter, RateLimitMiddleware
+from src.core.schema_registry import refresh_schema_capabilities
+from src.core.static_assets import AssetStaticFiles, build_static_assets, page_response
+from src.core.translation_catalog import start_translation_listener, stop_translation_listener
 from src.core.sentry_setup import init_sentry
+from src.core.startup_checks import (
+    STARTUP_REPORT,
+    run_startup_checks,
+    start_background_checks,
+    stop_background_checks,
+)
 from src.core.exception_handlers import (
     database_error_handler,
     generic_error_handler,
@@ -27,12 +41,9 @@ from src.core.exception_handlers import (
     validation_exception_handler,
 )
 from src.database.connection import (
-    check_data_integrity,
     cleanup,
-    get_schema_info,
     log_pool_status,
     test_connection,
-    verify_postgres_max_connections,
 )
 
 init_sentry("sales-api")
@@ -50,6 +61,11 @@ async def lifespan(app: FastAPI):
     upload_dir = Path(settings.upload_dir)
     upload_dir.mkdir(parents=True, exist_ok=True)
     logger.info("Photo upload directory: {}", upload_dir.resolve())
+    if settings.static_build_on_startup:
+        manifest = await asyncio.to_thread(build_static_assets, STATIC_DIR, STATIC_BUILD_DIR)
+        logger.info(
+            "Static assets built: {} files in {}", len(manifest), STATIC_BUILD_DIR.resolve()
+        )
     logger.info(
         "Starting SDS Application host={} port={} env={}",
         settings.api_host,
@@ -61,12 +77,23 @@ async def lifespan(app: FastAPI):
         logger.critical("Cannot start without database connection")
         raise RuntimeError("Database connection failed")
     log_pool_status()
-    await verify_postgres_max_connections()
-    await get_schema_info()
-    await check_data_integrity()
+    await refresh_schema_capabilities()
+    # The catalog loads lazily on first use as well; warming it must not delay serving
+    start_translation_listener(warm=True)
+    if settings.startup_checks_mode == "blocking":
+        await run_startup_checks()
+    elif settings.startup_checks_mode == "background":
+        start_background_checks()
+    else:
+        STARTUP_REPORT.status = "skipped"
     logger.info("Application startup complete")
     yield
     logger.info("Shutting down SDS Application...")
+    await stop_background_checks()
+    await stop_translation_listener()
+    shutdown_thumbnail_pool()
+    shutdown_exif_executor()
+    await PHOTO_STORAGE.aclose()
     await cleanup()
     logger.info("Application shutdown complete")
 
@@ -103,6 +130,7 @@ app.add_middleware(SecurityHeadersMiddleware)
 app.middleware("http")(request_logging_middleware)
 
 STATIC_DIR = Path(__file__).resolve().parent / "static"
+STATIC_BUILD_DIR = Path(settings.static_build_dir)
 
 
 @app.get("/")
@@ -111,21 +139,32 @@ async def root():
 
 
 @app.get("/login", include_in_schema=False)
-async def login_page():
-    return FileResponse(STATIC_DIR / "login.html")
+async def login_page(request: Request):
+    return page_response(STATIC_BUILD_DIR, STATIC_DIR, "login.html", request.headers)
 
 
 @app.get("/app", include_in_schema=False)
-async def app_page():
-    return FileResponse(STATIC_DIR / "app.html")
-
+async def app_page(request: Request):
+    return page_response(STATIC_BUILD_DIR, STATIC_DIR, "app.html", request.headers)
 
-app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
-from src.api.v1.routers.customer_photos import UPLOAD_DIR
+app.mount(
+    "/static",
+    AssetStaticFiles(
+        directory=str(STATIC_BUILD_DIR), fallback_directory=str(STATIC_DIR), check_dir=False
+    ),
+    name="static",
+)
 
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-app.mount("/photo", StaticFiles(directory=str(UPLOAD_DIR)), name="photo")
+PHOTO_STORAGE.root.mkdir(parents=True, exist_ok=True)
+app.mount(
+    "/photo",
+    PhotoStaticFiles(
+        directory=str(PHOTO_STORAGE.root),
+        remote_url=PHOTO_STORAGE.served_url if PHOTO_STORAGE.remote else None,
+    ),
+    name="photo",
+)
 
 
 @app.get("/favicon.ico", include_in_schema=False)
@@ -135,10 +174,24 @@ async def favicon():
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    return {"status": "ok", "startup_checks": STARTUP_REPORT.status}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus text exposition of API, DB pool and cache metrics.
+
+    Off unless METRICS_ENABLED; with METRICS_TOKEN the scraper must send it as a Bearer token.
+    """
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    if not scrape_authorized(request.headers.get("authorization"), settings.metrics_token):
+        return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 from src.api.v1.routers import (
+    admin,
     auth,
     customer_photos,
     customers,
@@ -171,3 +224,4 @@ app.include_router(customer_photos.router, prefix="/api/v1", tags=["customer-pho
 app.include_router(visits.router, prefix="/api/v1", tags=["visits"])
 app.include_router(reports.router, prefix="/api/v1/reports", tags=["reports"])
 app.include_router(translations.router, prefix="/api/v1", tags=["translations"])
+app.include_router(admin.router, prefix="/api/v1", tags=["admin"])
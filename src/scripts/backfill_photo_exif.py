@@ -0,0 +1,96 @@
+"""Fill capture time / GPS / orientation of customer photos uploaded before EXIF extraction existed.
+
+    python -m src.scripts.backfill_photo_exif [--workers 8] [--batch 200] [--all]
+
+Files are parsed in a process pool, each batch is written with one UPDATE and committed, so the
+command can be interrupted and restarted: only rows with exif_checked_at IS NULL are picked
+(``--all`` re-reads every photo).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+from sqlalchemy import text  # noqa: E402
+
+from src.api.v1.services.photo_exif import PhotoExif, read_exif, store_exif  # noqa: E402
+from src.api.v1.services.photo_storage import PHOTO_STORAGE  # noqa: E402
+from src.database.connection import async_session  # noqa: E402
+
+PENDING_SQL = text(
+    """
+    SELECT id, photo_path FROM "Sales".customer_photo
+    WHERE id > :after AND (:everything OR exif_checked_at IS NULL)
+    ORDER BY id
+    LIMIT :batch
+    """
+)
+
+
+async def backfill(workers: int, batch: int, everything: bool) -> int:
+    loop = asyncio.get_running_loop()
+    # S3: bound parallel downloads to what the pool can parse
+    slots = asyncio.Semaphore(workers * 2)
+
+    async def read(pool: ProcessPoolExecutor, key: str) -> PhotoExif:
+        async with slots:
+            try:
+                async with PHOTO_STORAGE.local_copy(key) as path:
+                    return await loop.run_in_executor(pool, read_exif, str(path))
+            except FileNotFoundError:
+                return PhotoExif()
+
+    done = 0
+    after = 0
+    started = time.monotonic()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async with async_session() as session:
+            while True:
+                rows = (
+                    await session.execute(
+                        PENDING_SQL, {"after": after, "everything": everything, "batch": batch}
+                    )
+                ).fetchall()
+                if not rows:
+                    break
+                after = rows[-1][0]
+                results = await asyncio.gather(
+                    *(read(pool, photo_path) for _photo_id, photo_path in rows)
+                )
+                await store_exif(
+                    session, [(row[0], exif) for row, exif in zip(rows, results, strict=True)]
+                )
+                await session.commit()
+                done += len(rows)
+                located = sum(1 for exif in results if exif.latitude is not None)
+                elapsed = time.monotonic() - started
+                print(f"{done} photos ({located} with GPS in this batch), {elapsed:.1f}s")
+    await PHOTO_STORAGE.aclose()
+    return done
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument(
+        "--all", action="store_true", dest="everything", help="re-read already processed photos"
+    )
+    args = parser.parse_args()
+    total = asyncio.run(backfill(max(1, args.workers), max(1, args.batch), args.everything))
+    print(f"Done: {total} photos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Fingerprint and precompress the web UI assets into STATIC_BUILD_DIR (run at deploy).
+
+    python -m src.scripts.build_static
+
+Run it at deploy: the (slow, maximum level) compression stays out of the API start. The API
+builds at startup only with ``STATIC_BUILD_ON_STARTUP=true`` and serves the sources until a build
+exists.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.core.config import settings  # noqa: E402
+from src.core.static_assets import build_static_assets  # noqa: E402
+
+STATIC_DIR = Path(__file__).resolve().parents[1] / "static"
+
+
+def _size(directory: Path, pattern: str) -> int:
+    return sum(path.stat().st_size for path in directory.rglob(pattern) if path.is_file())
+
+
+def main() -> None:
+    target = Path(settings.static_build_dir)
+    started = time.monotonic()
+    manifest = build_static_assets(STATIC_DIR, target)
+    for name in sorted(manifest):
+        print(f"{name} -> {manifest[name]}")
+    elapsed = time.monotonic() - started
+    print(
+        f"Built {len(manifest)} assets into {target.resolve()} in {elapsed:.1f}s: "
+        f"sources {_size(STATIC_DIR, '*') // 1024} KiB, "
+        f"gzip siblings {_size(target, '*.gz') // 1024} KiB, "
+        f"brotli siblings {_size(target, '*.br') // 1024} KiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
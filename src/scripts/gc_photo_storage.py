@@ -0,0 +1,78 @@
+"""Quarantine photo files no customer_photo / product row references, purge old quarantine.
+
+    python -m src.scripts.gc_photo_storage [--workers 8] [--grace-hours 6] [--keep-days 7]
+                                           [--dry-run]
+
+Meant for a nightly cron. Quarantined files keep their relative path under
+``<UPLOAD_DIR>/.quarantine/<run>/``; move one back to restore it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+from src.api.v1.services.photo_gc import GcReport, collect_garbage  # noqa: E402
+from src.api.v1.services.photo_storage import PHOTO_STORAGE  # noqa: E402
+from src.database.connection import async_session  # noqa: E402
+
+
+def _mib(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MiB"
+
+
+async def run(workers: int, grace_hours: float, keep_days: float, dry_run: bool) -> GcReport:
+    async with async_session() as session:
+        return await collect_garbage(
+            PHOTO_STORAGE,
+            session,
+            grace_seconds=grace_hours * 3600,
+            keep_days=keep_days,
+            workers=workers,
+            dry_run=dry_run,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8, help="directories scanned in parallel")
+    parser.add_argument(
+        "--grace-hours", type=float, default=6, help="never touch files linked more recently"
+    )
+    parser.add_argument(
+        "--keep-days", type=float, default=7, help="how long quarantined files are kept"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="only report the orphans")
+    parser.add_argument("--verbose", action="store_true", help="list every orphan")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    report = asyncio.run(run(max(1, args.workers), args.grace_hours, args.keep_days, args.dry_run))
+    if args.verbose:
+        for item in report.orphans:
+            print(f"orphan {item.kind}: {item.relative} ({item.size} B)")
+    kinds = ", ".join(
+        f"{kind}: {count}"
+        for kind, count in sorted(Counter(i.kind for i in report.orphans).items())
+    )
+    print(f"Scanned {report.scanned} files in {time.monotonic() - started:.1f}s")
+    moved = "to quarantine" if args.dry_run else "quarantined"
+    print(
+        f"Orphans: {len(report.orphans)} ({kinds or 'none'}), "
+        f"{_mib(report.quarantined_bytes)} {moved}"
+    )
+    print(f"Purged {report.purged_runs} quarantine runs, reclaimed {_mib(report.reclaimed_bytes)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Move customer and product photos stored under a bare name into the fan-out storage layout.
+
+    python -m src.scripts.migrate_photo_storage [--concurrency 16] [--dry-run]
+
+With ``PHOTO_STORAGE=s3`` this uploads the local files to the bucket. Each photo is moved in three
+steps: the file is put at its fan-out key, the row is switched to that key, then the bare copy is
+removed. A bare name resolves at both locations, so ``photo_path`` stays servable at every
+moment, and an interrupted run can simply be restarted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import mimetypes
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+from sqlalchemy import text  # noqa: E402
+
+from src.api.v1.services.photo_storage import (  # noqa: E402
+    PHOTO_STORAGE,
+    drop_bare_copy,
+    move_to_layout,
+)
+from src.database.connection import async_session  # noqa: E402
+
+# (table, primary key) of every column holding a photo key
+PHOTO_TABLES = (("customer_photo", "id"), ("product", "code"))
+
+
+@dataclass
+class MigrationStats:
+    moved: int = 0
+    missing: list[str] = field(default_factory=list)
+    changed: int = 0
+
+
+async def _migrate_one(
+    table: str, pk: str, row_id, name: str, dry_run: bool, stats: MigrationStats
+) -> None:
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if dry_run:
+        key = name if PHOTO_STORAGE.local_path(name) is not None else None
+    else:
+        key = await move_to_layout(PHOTO_STORAGE, name, content_type)
+    if key is None:
+        stats.missing.append(f"{table}.{row_id}: {name}")
+        return
+    if dry_run:
+        stats.moved += 1
+        return
+    async with async_session() as session:
+        result = await session.execute(
+            text(
+                f'UPDATE "Sales".{table} SET photo_path = :key '  # noqa: S608
+                f"WHERE {pk} = :id AND photo_path = :name"
+            ),
+            {"key": key, "id": row_id, "name": name},
+        )
+        await session.commit()
+    if result.rowcount == 0:
+        # Строку изменили параллельно (новое фото / удаление): копию под старым именем не трогаем
+        stats.changed += 1
+        return
+    await drop_bare_copy(PHOTO_STORAGE, name)
+    stats.moved += 1
+
+
+async def migrate(concurrency: int, dry_run: bool) -> MigrationStats:
+    stats = MigrationStats()
+    slots = asyncio.Semaphore(concurrency)
+    started = time.monotonic()
+
+    async def guarded(*args) -> None:
+        async with slots:
+            await _migrate_one(*args, dry_run, stats)
+
+    try:
+        for table, pk in PHOTO_TABLES:
+            async with async_session() as session:
+                rows = (
+                    await session.execute(
+                        text(
+                            f'SELECT {pk}, photo_path FROM "Sales".{table} '  # noqa: S608
+                            "WHERE photo_path IS NOT NULL AND photo_path <> '' "
+                            "AND photo_path NOT LIKE '%/%'"
+                        )
+                    )
+                ).fetchall()
+            await asyncio.gather(*(guarded(table, pk, row_id, name) for row_id, name in rows))
+            print(f"{table}: {len(rows)} bare names, {time.monotonic() - started:.1f}s")
+    finally:
+        await PHOTO_STORAGE.aclose()
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16, help="files moved in parallel")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be moved")
+    args = parser.parse_args()
+    stats = asyncio.run(migrate(max(1, args.concurrency), args.dry_run))
+    for entry in stats.missing:
+        print(f"missing: {entry}")
+    print(
+        f"Done: {stats.moved} moved, {len(stats.missing)} missing, "
+        f"{stats.changed} changed meanwhile"
+    )
+
+
+if __name__ == "__main__":
+    main()
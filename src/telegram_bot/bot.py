@@ -7,14 +7,22 @@ import os
 from pathlib import Path
 
 from dotenv import load_dotenv
+from telegram import Update
 from telegram.error import Conflict, NetworkError
-from telegram.ext import Application
+from telegram.ext import Application, TypeHandler
 
+from src.core.config import settings
 from src.core.sentry_setup import init_sentry
+from src.core.translation_catalog import (
+    TRANSLATION_CATALOG,
+    start_translation_listener,
+    stop_translation_listener,
+)
 from .config import BOT_TOKEN
 from .handlers_agent import register_agent_handlers
 from .handlers_auth import register_auth_handlers
 from .handlers_expeditor import register_expeditor_handlers
+from .metrics import count_update, start_metrics_server
 from .sds_api import api
 from .session import close_pool, init_pool
 
@@ -27,6 +35,7 @@ BOT_DB_DSN: str | None = None
 
 _LOCK_FH = None
 _LOCK_PATH = Path(".telegram_bot.lock")
+_METRICS_SERVER = None
 
 
 def _build_bot_dsn() -> str:
@@ -98,13 +107,29 @@ def _release_single_instance_lock() -> None:
 
 
 async def post_init(application: Application):
+    global _METRICS_SERVER
     if not BOT_DB_DSN:
         raise RuntimeError("Bot DB DSN is not configured")
     await init_pool(BOT_DB_DSN)
     logger.info("Telegram bot initialized, DB pool ready")
+    try:
+        await TRANSLATION_CATALOG.ready()
+    except Exception as exc:
+        logger.warning(
+            "Translation catalog not loaded at startup (will retry on first use): %s", exc
+        )
+    start_translation_listener()
+    if settings.bot_metrics_port > 0:
+        _METRICS_SERVER = await start_metrics_server(settings.bot_metrics_port)
 
 
 async def post_shutdown(application: Application):
+    global _METRICS_SERVER
+    if _METRICS_SERVER is not None:
+        _METRICS_SERVER.close()
+        await _METRICS_SERVER.wait_closed()
+        _METRICS_SERVER = None
+    await stop_translation_listener()
     await close_pool()
     await api.close()
     _release_single_instance_lock()
@@ -161,6 +186,7 @@ def run_bot():
         .build()
     )
 
+    app.add_handler(TypeHandler(Update, count_update), group=-1)
     register_auth_handlers(app)
     register_expeditor_handlers(app)
     register_agent_handlers(app)
@@ -14,7 +14,7 @@ from .helpers import (
     fmt_money, fmt_date, date_picker_keyboard, calendar_keyboard,
     back_button, get_cached_products, get_cached_payment_types, fmt_product_name,
 )
-from .i18n import t, localize_literal, localize_reply_markup
+from .i18n import t, localize_literal, localize_reply_markup, prefetch
 from .handlers_agent_v3_add_customer import get_add_customer_v3_handler
 from .handlers_agent_create_visit import get_create_visit_handler
 
@@ -1273,7 +1273,17 @@ async def cb_agent_order_customer(update: Update, context: ContextTypes.DEFAULT_
     await _show_products_page(q, context, session)
 
 
+PRODUCTS_PAGE_KEYS = (
+    "telegram.agent.cart_title",
+    "telegram.agent.total",
+    "telegram.agent.products_choose_page",
+    "telegram.button.create_order",
+    "telegram.button.back",
+)
+
+
 async def _show_products_page(q, context, session):
+    await prefetch(q, context, PRODUCTS_PAGE_KEYS)
     page = context.user_data.get("products_page", 0)
     products = await get_cached_products(session.jwt_token)
     total = len(products)
@@ -1291,8 +1301,8 @@ async def _show_products_page(q, context, session):
             s = item["qty"] * item["price"]
             total_sum += s
             cart_lines.append(f"  • {item['name']}: {item['qty']} × {fmt_money(item['price'])}")
-        cart_title = await t(update, context, "telegram.agent.cart_title", fallback="🛒 *Корзина:*")
-        total_lbl = await t(update, context, "telegram.agent.total", fallback="Итого:")
+        cart_title = await t(q, context, "telegram.agent.cart_title", fallback="🛒 *Корзина:*")
+        total_lbl = await t(q, context, "telegram.agent.total", fallback="Итого:")
         cart_text = f"\n{cart_title}\n" + "\n".join(cart_lines) + f"\n*{total_lbl}* {fmt_money(total_sum)}\n"
 
     total_pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
@@ -1323,7 +1333,9 @@ async def _show_products_page(q, context, session):
     if nav:
         buttons.append(nav)
     if cart:
-        create_order_btn = await t(update, context, "telegram.button.create_order", fallback="🛒 Оформить заказ")
+        create_order_btn = await t(
+            q, context, "telegram.button.create_order", fallback="🛒 Оформить заказ"
+        )
         buttons.append([InlineKeyboardButton(create_order_btn, callback_data="agent_ordercheckout")])
     buttons.append([InlineKeyboardButton(await t(q, context, "telegram.button.back", fallback="◀️ Назад"), callback_data="main_menu")])
     await _edit_loc(q, None, context, "\n".join(lines), reply_markup=InlineKeyboardMarkup(buttons), parse_mode="Markdown")
@@ -1589,22 +1601,23 @@ async def cb_agent_order_confirm(update: Update, context: ContextTypes.DEFAULT_T
     total = sum(i["qty"] * i["price"] for i in cart)
 
     try:
-        order = await api.create_order(token, {
+        order = await api.create_order_full(token, {
             "customer_id": cid,
             "status_code": "open",
             "payment_type_code": pay_code,
             # Expeditor bot screens are date-based; default new Telegram orders to today's route.
             "scheduled_delivery_at": date.today().isoformat(),
+            "items": [
+                {
+                    "product_code": item["product_code"],
+                    "quantity": item["qty"],
+                    "price": item["price"],
+                }
+                for item in cart
+            ],
         })
         order_no = order.get("order_no") or order.get("id")
-
-        for item in cart:
-            await api.add_order_item(token, order_no, {
-                "product_code": item["product_code"],
-                "quantity": item["qty"],
-                "price": item["price"],
-            })
-        await api.update_order_total(token, order_no, total)
+        total = order.get("total_amount", total)
 
         await log_action(q.from_user.id, session.login, session.role,
                          "order_created", f"order={order_no}, total={total}", "success")
@@ -13,7 +13,7 @@ from .helpers import (
     fmt_money, fmt_date, date_picker_keyboard, calendar_keyboard,
     back_button,
 )
-from .i18n import t, localize_literal, localize_reply_markup
+from .i18n import t, localize_literal, localize_reply_markup, prefetch
 
 logger = logging.getLogger(__name__)
 
@@ -313,6 +313,17 @@ async def cb_exp_orders_date(update: Update, context: ContextTypes.DEFAULT_TYPE)
     )
 
 
+EXP_ROUTE_KEYS = (
+    "telegram.expeditor.no_coords_route",
+    "telegram.expeditor.route_for",
+    "telegram.expeditor.points_count",
+    "telegram.expeditor.route_built_all",
+    "telegram.expeditor.route_skipped_no_coords",
+    "telegram.expeditor.open_map",
+    "telegram.button.back",
+)
+
+
 async def cb_exp_route(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Построить маршрут на Яндекс.Картах для всех заказов дня."""
     q = update.callback_query
@@ -320,6 +331,7 @@ async def cb_exp_route(update: Update, context: ContextTypes.DEFAULT_TYPE):
     session, token = await _get_auth(update)
     if not session:
         return
+    await prefetch(update, context, EXP_ROUTE_KEYS)
 
     orders = context.user_data.get("exp_orders_list", [])
     if not orders:
@@ -328,6 +340,23 @@ async def cb_exp_route(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     await _edit_loc(q, update, context, "⏳ Строю маршрут...")
 
+    # Координаты клиентов приходят вместе с заказами одним запросом /orders/batch.
+    coords: dict = {}
+    try:
+        order_nos = [o.get("order_no") for o in orders if o.get("order_no")]
+        details = await api.get_orders_batch(token, order_nos)
+        coords = {
+            d.get("customer_id"): (
+                d.get("customer_latitude"),
+                d.get("customer_longitude"),
+                d.get("customer_address") or "—",
+            )
+            for d in details
+            if d.get("customer_id")
+        }
+    except SDSApiError as batch_error:
+        logger.debug("orders/batch unavailable, loading customers one by one: %s", batch_error)
+
     points = []
     point_names = []
     skipped_orders = []
@@ -342,7 +371,7 @@ async def cb_exp_route(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 }
             )
             continue
-        lat, lon, addr = await _fetch_customer_coords(token, cid)
+        lat, lon, addr = coords.get(cid) or await _fetch_customer_coords(token, cid)
         if lat and lon:
             points.append((lat, lon))
             client = o.get("customer_name") or f"#{cid}"
@@ -440,9 +469,10 @@ async def cb_exp_order_detail(update: Update, context: ContextTypes.DEFAULT_TYPE
     status_code = o.get("status_code", "")
     status = await _status_label(update, context, status_code)
 
-    lat, lon, address = None, None, "—"
-    phone = "—"
-    if customer_id:
+    lat, lon = o.get("customer_latitude"), o.get("customer_longitude")
+    address = o.get("customer_address") or "—"
+    phone = o.get("customer_phone") or "—"
+    if customer_id and "customer_address" not in o:
         try:
             cust = await api.get_customer(token, customer_id)
             lat = cust.get("latitude")
@@ -8,6 +8,7 @@ from typing import Any
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
+from src.core.metrics import record_cache_lookup
 from .sds_api import api
 from .config import CACHE_TTL
 
@@ -69,9 +70,15 @@ def fmt_product_name(product: dict[str, Any] | None) -> str:
 _cache: dict[str, tuple[float, Any]] = {}
 
 
+def _is_fresh(key: str) -> bool:
+    fresh = key in _cache and time.time() - _cache[key][0] < CACHE_TTL
+    record_cache_lookup("bot_dictionary", fresh)
+    return fresh
+
+
 async def get_cached_products(token: str) -> list:
     key = "products"
-    if key in _cache and time.time() - _cache[key][0] < CACHE_TTL:
+    if _is_fresh(key):
         return _cache[key][1]
     data = await api.get_products(token)
     # Показываем ВСЕ продукты номенклатуры (даже без остатков на складе)
@@ -81,7 +88,7 @@ async def get_cached_products(token: str) -> list:
 
 async def get_cached_payment_types(token: str) -> list:
     key = "payment_types"
-    if key in _cache and time.time() - _cache[key][0] < CACHE_TTL:
+    if _is_fresh(key):
         return _cache[key][1]
     data = await api.get_payment_types(token)
     _cache[key] = (time.time(), data)
@@ -91,7 +98,7 @@ async def get_cached_payment_types(token: str) -> list:
 async def get_cached_user_logins(token: str) -> list:
     """Кэшированный список пользователей (экспедиторов). TTL=300сек."""
     key = "user_logins"
-    if key in _cache and time.time() - _cache[key][0] < CACHE_TTL:
+    if _is_fresh(key):
         return _cache[key][1]
     try:
         data = await api.get_user_logins(token)
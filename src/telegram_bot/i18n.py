@@ -1,22 +1,17 @@
 ﻿from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+from collections.abc import Iterable
 from typing import Any
 
-from sqlalchemy import text
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
 
 from src.core.config import settings
-from src.database.connection import async_session
+from src.core.translation_catalog import ALIAS_KEYS, TRANSLATION_CATALOG
 
-_CACHE: dict[tuple[str, str], tuple[datetime, str]] = {}
-_CACHE_TTL_SECONDS = max(int(getattr(settings, "cache_ttl", 300) or 300), 30)
-_LITERAL_KEY_CACHE: dict[tuple[str, str], tuple[datetime, str]] = {}
-
-_ALIAS_KEYS: dict[str, str] = {
-    "telegram.button.back": "telegram.action.back",
-    "telegram.button.cancel": "telegram.action.cancel",
-}
+# Catalog view with the texts as the bot sends them (see _normalize_text)
+BOT_VIEW = "telegram"
+# CallbackContext attribute holding (lang, {key: text}) prepared by prefetch() for the update
+_SCREEN_TEXTS_ATTR = "_screen_texts"
 
 # Literal phrases still present in bot handlers; map them to translation keys.
 _LITERAL_KEY_MAP: dict[str, str] = {
@@ -118,24 +113,6 @@ def detect_language(update: Any | None, context: Any | None = None) -> str:
     return _normalize_language(user_lang)
 
 
-def _cache_get(key: str, lang: str) -> str | None:
-    cached = _CACHE.get((key, lang))
-    if not cached:
-        return None
-    expires_at, value = cached
-    if expires_at <= datetime.now(timezone.utc):
-        _CACHE.pop((key, lang), None)
-        return None
-    return value
-
-
-def _cache_set(key: str, lang: str, value: str) -> None:
-    _CACHE[(key, lang)] = (
-        datetime.now(timezone.utc) + timedelta(seconds=_CACHE_TTL_SECONDS),
-        value,
-    )
-
-
 def _normalize_text(text_value: str) -> str:
     # Keep Telegram multiline templates human-readable in DB: support escaped newlines.
     normalized = (text_value or "").replace("\\n", "\n").strip("\ufeff")
@@ -149,70 +126,30 @@ def _normalize_text(text_value: str) -> str:
     return normalized
 
 
-async def _fetch_from_db(key: str, lang: str) -> str | None:
-    query = text(
-        '''
-        SELECT translation_text
-        FROM "Sales".translations
-        WHERE translation_key = :k AND language_code = :l
-        LIMIT 1
-        '''
-    )
-    async with async_session() as session:
-        value = await session.scalar(query, {"k": key, "l": lang})
-    if value is None:
-        return None
-    return _normalize_text(str(value))
-
-
-def _literal_cache_get(literal: str, lang: str) -> str | None:
-    cached = _LITERAL_KEY_CACHE.get((literal, lang))
-    if not cached:
-        return None
-    expires_at, value = cached
-    if expires_at <= datetime.now(timezone.utc):
-        _LITERAL_KEY_CACHE.pop((literal, lang), None)
-        return None
-    return value
-
-
-def _literal_cache_set(literal: str, lang: str, key: str) -> None:
-    _LITERAL_KEY_CACHE[(literal, lang)] = (
-        datetime.now(timezone.utc) + timedelta(seconds=_CACHE_TTL_SECONDS),
-        key,
-    )
+TRANSLATION_CATALOG.register_view(BOT_VIEW, _normalize_text)
 
 
 async def _find_key_by_literal(literal: str, lang: str) -> str | None:
-    cached = _literal_cache_get(literal, lang)
-    if cached is not None:
-        return cached
-
-    default_lang = settings.effective_default_language
-    query = text(
-        '''
-        SELECT translation_key
-        FROM "Sales".translations
-        WHERE translation_text = :txt
-        ORDER BY
-            CASE
-                WHEN language_code = :lang THEN 0
-                WHEN language_code = :default_lang THEN 1
-                ELSE 2
-            END,
-            translation_key
-        LIMIT 1
-        '''
-    )
-    async with async_session() as session:
-        value = await session.scalar(
-            query, {"txt": literal, "lang": lang, "default_lang": default_lang}
-        )
-    if value is None:
-        return None
-    key = str(value)
-    _literal_cache_set(literal, lang, key)
-    return key
+    catalog = await TRANSLATION_CATALOG.ready()
+    return catalog.literal_keys(lang, view=BOT_VIEW).get(literal.strip())
+
+
+async def prefetch(update: Any | None, context: Any | None, keys: Iterable[str]) -> dict[str, str]:
+    """Resolve the keys of a whole screen with one catalog check (one query when it is cold).
+
+    The texts are kept on ``context`` (a new one per update), so the ``t()`` calls that render
+    the screen read them without going back to the catalog.
+    """
+    lang = detect_language(update, context)
+    texts = (await TRANSLATION_CATALOG.ready()).texts(lang, view=BOT_VIEW)
+    prepared = {key: texts[key] for key in keys if key in texts}
+    if context is not None:
+        screen = getattr(context, _SCREEN_TEXTS_ATTR, None)
+        if screen is None or screen[0] != lang:
+            screen = (lang, {})
+            setattr(context, _SCREEN_TEXTS_ATTR, screen)
+        screen[1].update(prepared)
+    return prepared
 
 
 async def t(
@@ -223,22 +160,13 @@ async def t(
     **params: Any,
 ) -> str:
     lang = detect_language(update, context)
-    resolved_key = _ALIAS_KEYS.get(key, key)
-
-    cached = _cache_get(resolved_key, lang)
-    if cached is not None:
-        base = cached
-    else:
-        base = await _fetch_from_db(resolved_key, lang)
-        if base is None and lang != settings.effective_default_language:
-            base = await _fetch_from_db(resolved_key, settings.effective_default_language)
-        if base is None and resolved_key != key:
-            base = await _fetch_from_db(key, lang)
-            if base is None and lang != settings.effective_default_language:
-                base = await _fetch_from_db(key, settings.effective_default_language)
-        if base is None:
-            base = fallback if fallback is not None else key
-        _cache_set(resolved_key, lang, base)
+    screen = getattr(context, _SCREEN_TEXTS_ATTR, None) if context is not None else None
+    base = screen[1].get(key) if screen is not None and screen[0] == lang else None
+    if base is None:
+        catalog = await TRANSLATION_CATALOG.ready()
+        base = catalog.get(key, lang, view=BOT_VIEW)
+    if base is None:
+        base = fallback if fallback is not None else key
 
     if params:
         try:
@@ -264,8 +192,8 @@ async def localize_literal(update: Any | None, context: Any | None, text_value:
         return await t(update, context, key, fallback=normalized)
 
     # Compatibility aliases for entries that may leak as translation keys in UI.
-    if normalized in _ALIAS_KEYS:
-        return await t(update, context, _ALIAS_KEYS[normalized], fallback=normalized)
+    if normalized in ALIAS_KEYS:
+        return await t(update, context, ALIAS_KEYS[normalized], fallback=normalized)
 
     lang = detect_language(update, context)
     key_by_literal = await _find_key_by_literal(normalized, lang)
@@ -330,5 +258,4 @@ async def localize_reply_markup(update: Any | None, context: Any | None, reply_m
 
 
 def clear_translation_cache() -> None:
-    _CACHE.clear()
-    _LITERAL_KEY_CACHE.clear()
+    TRANSLATION_CATALOG.invalidate(full=True)
@@ -0,0 +1,83 @@
+"""
+Метрики процесса Telegram-бота: обработанные апдейты, латентность вызовов SDS API,
+пул БД сессий. Отдаются в формате Prometheus через минимальный HTTP-листенер.
+"""
+import asyncio
+import logging
+import re
+
+from src.core.metrics import CONTENT_TYPE_LATEST, REGISTRY, render_latest
+
+logger = logging.getLogger(__name__)
+
+BOT_UPDATES_TOTAL = REGISTRY.counter(
+    "sds_bot_updates_total",
+    "Telegram updates received by the bot, by update type.",
+    ("update_type",),
+)
+SDS_API_REQUEST_DURATION = REGISTRY.histogram(
+    "sds_bot_api_request_duration_seconds",
+    "Latency of bot calls to SDS API by endpoint.",
+    ("method", "endpoint"),
+)
+SDS_API_REQUESTS_TOTAL = REGISTRY.counter(
+    "sds_bot_api_requests_total",
+    "Bot calls to SDS API by endpoint and response status (0 = network error).",
+    ("method", "endpoint", "status"),
+)
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27,})$")
+
+
+def normalize_endpoint(url: str) -> str:
+    """/api/v1/orders/42/items -> /api/v1/orders/{id}/items (ограничивает кардинальность меток)."""
+    path = url.split("?", 1)[0]
+    return "/".join("{id}" if _ID_SEGMENT.match(seg) else seg for seg in path.split("/"))
+
+
+def observe_api_call(method: str, url: str, status: int, duration_seconds: float) -> None:
+    endpoint = normalize_endpoint(url)
+    SDS_API_REQUEST_DURATION.observe(duration_seconds, method=method.upper(), endpoint=endpoint)
+    SDS_API_REQUESTS_TOTAL.inc(method=method.upper(), endpoint=endpoint, status=status)
+
+
+def _update_type(update) -> str:
+    for attr in ("callback_query", "message", "edited_message", "inline_query", "my_chat_member"):
+        if getattr(update, attr, None) is not None:
+            return attr
+    return "other"
+
+
+async def count_update(update, context) -> None:
+    """TypeHandler-колбэк в группе -1: считает каждый апдейт, не прерывая обработку."""
+    BOT_UPDATES_TOTAL.inc(update_type=_update_type(update))
+
+
+async def _handle_metrics_connection(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+            pass
+        parts = request_line.decode("latin1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?", 1)[0] == "/metrics":
+            body = render_latest().encode("utf-8")
+            head = f"HTTP/1.1 200 OK\r\nContent-Type: {CONTENT_TYPE_LATEST}\r\n"
+        else:
+            body = b"Not Found\n"
+            head = "HTTP/1.1 404 Not Found\r\nContent-Type: text/plain\r\n"
+        head += f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+        writer.write(head.encode("latin1") + body)
+        await writer.drain()
+    except (TimeoutError, ConnectionError) as exc:
+        logger.debug("Metrics connection dropped: %s", exc)
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(port: int, host: str = "127.0.0.1") -> asyncio.AbstractServer:
+    server = await asyncio.start_server(_handle_metrics_connection, host=host, port=port)
+    logger.info("Bot metrics listening on http://%s:%s/metrics", host, port)
+    return server
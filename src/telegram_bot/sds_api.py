@@ -1,12 +1,15 @@
 """
 HTTP-клиент для SDS API. Все запросы бота к основной системе проходят здесь.
 """
+import copy
 import logging
+import time
 from typing import Any
 
 import httpx
 
-from .config import SDS_API_URL, API_TIMEOUT
+from .config import API_TIMEOUT, SDS_API_URL
+from .metrics import observe_api_call
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +30,9 @@ class SDSApi:
             base_url=SDS_API_URL,
             timeout=API_TIMEOUT,
         )
+        # Последние ответы справочников: (url, params) -> (ETag, данные);
+        # повторный запрос идёт с If-None-Match.
+        self._etag_cache: dict[tuple[str, str], tuple[str, Any]] = {}
 
     async def close(self):
         await self._client.aclose()
@@ -39,16 +45,29 @@ class SDSApi:
             h["Authorization"] = f"Bearer {token}"
         return h
 
-    async def _request(self, method: str, url: str, token: str | None = None, **kwargs) -> Any:
+    async def _request(
+        self, method: str, url: str, token: str | None = None, *, revalidate: bool = False, **kwargs
+    ) -> Any:
+        headers = self._headers(token)
+        cache_key = (
+            (url, repr(sorted((kwargs.get("params") or {}).items()))) if revalidate else None
+        )
+        cached = self._etag_cache.get(cache_key) if cache_key else None
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        started = time.perf_counter()
         try:
-            resp = await self._client.request(
-                method, url, headers=self._headers(token), **kwargs
-            )
+            resp = await self._client.request(method, url, headers=headers, **kwargs)
         except httpx.TimeoutException:
+            observe_api_call(method, url, 0, time.perf_counter() - started)
             raise SDSApiError(0, "Таймаут соединения с сервером SDS")
         except httpx.ConnectError:
+            observe_api_call(method, url, 0, time.perf_counter() - started)
             raise SDSApiError(0, "Нет соединения с сервером SDS")
+        observe_api_call(method, url, resp.status_code, time.perf_counter() - started)
 
+        if cached and resp.status_code == 304:
+            return copy.deepcopy(cached[1])
         if resp.status_code == 401:
             raise SDSApiError(401, "Сессия истекла")
         if resp.status_code == 403:
@@ -71,10 +90,14 @@ class SDSApi:
         if resp.status_code == 204:
             return None
         try:
-            return resp.json()
+            data = resp.json()
         except Exception as parse_error:
             logger.debug("Response is not JSON, returning text: %s", parse_error)
             return resp.text
+        etag = resp.headers.get("ETag")
+        if cache_key and etag:
+            self._etag_cache[cache_key] = (etag, copy.deepcopy(data))
+        return data
 
     # ---------- Auth ----------
 
@@ -113,6 +136,16 @@ class SDSApi:
         """GET /api/v1/orders/{order_no}"""
         return await self._request("GET", f"/api/v1/orders/{order_no}", token=token)
 
+    async def get_orders_batch(self, token: str, order_nos: list[int]) -> list[dict]:
+        """GET /api/v1/orders/batch — несколько заказов с позициями и координатами клиентов."""
+        data = await self._request(
+            "GET",
+            "/api/v1/orders/batch",
+            token=token,
+            params={"ids": ",".join(str(n) for n in order_nos)},
+        )
+        return (data or {}).get("data") or []
+
     async def update_order(self, token: str, order_no: int, data: dict) -> dict:
         """PATCH /api/v1/orders/{order_no}"""
         return await self._request("PATCH", f"/api/v1/orders/{order_no}", token=token, json=data)
@@ -121,6 +154,10 @@ class SDSApi:
         """POST /api/v1/orders"""
         return await self._request("POST", "/api/v1/orders", token=token, json=data)
 
+    async def create_order_full(self, token: str, data: dict) -> dict:
+        """POST /api/v1/orders/full — заказ с позициями и суммой одной транзакцией"""
+        return await self._request("POST", "/api/v1/orders/full", token=token, json=data)
+
     async def add_order_item(self, token: str, order_no: int, item: dict) -> dict:
         """POST /api/v1/orders/{order_no}/items"""
         return await self._request("POST", f"/api/v1/orders/{order_no}/items", token=token, json=item)
@@ -150,13 +187,12 @@ class SDSApi:
     # ---------- Customers ----------
 
     async def search_customers(self, token: str, **params) -> list:
-        """GET /api/v1/customers.
+        """GET /api/v1/customers/search (plain text search) or GET /api/v1/customers.
 
         Normalizes paginated response ({data: [...]}) to plain list for bot handlers.
         Adds fallback search by explicit fields for backend compatibility.
         """
         query_params = dict(params or {})
-        response = await self._request("GET", "/api/v1/customers", token=token, params=query_params)
 
         def _as_list(payload) -> list:
             if isinstance(payload, list):
@@ -167,11 +203,26 @@ class SDSApi:
                     return data
             return []
 
+        raw_search = (query_params.get("search") or "").strip()
+        if len(raw_search) >= 2 and set(query_params) <= {"search", "limit"}:
+            # Индексированный поиск; старый бэкенд без /customers/search отвечает 404/422.
+            try:
+                response = await self._request(
+                    "GET",
+                    "/api/v1/customers/search",
+                    token=token,
+                    params={"q": raw_search, "limit": query_params.get("limit", 10)},
+                )
+                return _as_list(response)
+            except SDSApiError as e:
+                if e.status not in (404, 422):
+                    raise
+
+        response = await self._request("GET", "/api/v1/customers", token=token, params=query_params)
         customers = _as_list(response)
         if customers:
             return customers
 
-        raw_search = (query_params.get("search") or "").strip()
         if not raw_search:
             return customers
 
@@ -213,13 +264,16 @@ class SDSApi:
         """POST /api/v1/customers/{id}/photos (multipart)"""
         import io
         files = {"file": (filename, io.BytesIO(file_bytes), "image/jpeg")}
+        url = f"/api/v1/customers/{customer_id}/photos"
+        started = time.perf_counter()
         resp = await self._client.post(
-            f"/api/v1/customers/{customer_id}/photos",
+            url,
             headers={"Authorization": f"Bearer {token}"},
             files=files,
             data={"is_main": "false"},
             timeout=30,
         )
+        observe_api_call("POST", url, resp.status_code, time.perf_counter() - started)
         if resp.status_code >= 400:
             detail = str(resp.status_code)
             try:
@@ -242,24 +296,32 @@ class SDSApi:
 
     async def get_products(self, token: str) -> list:
         """GET /api/v1/dictionary/products"""
-        return await self._request("GET", "/api/v1/dictionary/products", token=token)
+        return await self._request(
+            "GET", "/api/v1/dictionary/products", token=token, revalidate=True
+        )
 
     async def get_payment_types(self, token: str) -> list:
         """GET /api/v1/dictionary/payment-types"""
-        return await self._request("GET", "/api/v1/dictionary/payment-types", token=token)
+        return await self._request(
+            "GET", "/api/v1/dictionary/payment-types", token=token, revalidate=True
+        )
 
     async def get_cities(self, token: str) -> list:
         """GET /api/v1/dictionary/cities"""
-        return await self._request("GET", "/api/v1/dictionary/cities", token=token)
+        return await self._request("GET", "/api/v1/dictionary/cities", token=token, revalidate=True)
 
     async def get_territories(self, token: str, city_id: int | None = None) -> list:
         """GET /api/v1/dictionary/territories (optionally filtered by city)."""
         params = {"city_id": city_id} if city_id is not None else None
-        return await self._request("GET", "/api/v1/dictionary/territories", token=token, params=params)
+        return await self._request(
+            "GET", "/api/v1/dictionary/territories", token=token, params=params, revalidate=True
+        )
 
     async def get_warehouses(self, token: str) -> list:
         """GET /api/v1/dictionary/warehouses"""
-        return await self._request("GET", "/api/v1/dictionary/warehouses", token=token)
+        return await self._request(
+            "GET", "/api/v1/dictionary/warehouses", token=token, revalidate=True
+        )
 
     async def get_warehouse_stock(self, token: str, warehouse: str, **params) -> dict:
         """GET /api/v1/warehouse/stock"""
@@ -10,6 +10,7 @@ import asyncpg
 
 from .config import MAX_LOGIN_ATTEMPTS, LOGIN_BLOCK_MINUTES
 from src.core.config import settings
+from src.core.metrics import DB_POOL_CHECKED_OUT, DB_POOL_OVERFLOW, DB_POOL_SIZE, REGISTRY
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,18 @@ async def close_pool():
         _pool = None
 
 
+def _collect_pool_metrics() -> None:
+    if not _pool:
+        return
+    size = _pool.get_size()
+    DB_POOL_SIZE.set(_pool.get_max_size(), pool="bot")
+    DB_POOL_CHECKED_OUT.set(size - _pool.get_idle_size(), pool="bot")
+    DB_POOL_OVERFLOW.set(0, pool="bot")
+
+
+REGISTRY.add_collector(_collect_pool_metrics)
+
+
 def _pool_or_raise() -> asyncpg.Pool:
     if not _pool:
         raise RuntimeError("DB pool not initialized — call init_pool() first")
@@ -57,6 +57,66 @@ def _validate_test_database_url(raw_url: str) -> str:
     return _normalize_database_url(raw_url)
 
 
+class FakeResult:
+    """Result over prepared rows; the scalar accessors read the first column like SQLAlchemy."""
+
+    def __init__(self, rows=()):
+        self._rows = list(rows)
+
+    def all(self):
+        return self._rows
+
+    def fetchall(self):
+        return self._rows
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def scalar(self):
+        return self._rows[0][0] if self._rows else None
+
+    def scalar_one_or_none(self):
+        return self.scalar()
+
+    def scalars(self):
+        return iter([row[0] for row in self._rows])
+
+
+class FakeSession:
+    """AsyncSession stand-in for unit tests: ``respond(statement, params)`` returns the rows.
+
+    Executed statements are recorded as (whitespace-normalized SQL, params).
+    """
+
+    def __init__(self, respond=lambda statement, params: []):
+        self.respond = respond
+        self.statements: list[tuple[str, dict | None]] = []
+        self.added: list = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        self.statements.append((" ".join(str(statement).split()), params))
+        return FakeResult(self.respond(statement, params))
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        return None
+
+    async def commit(self):
+        self.commits += 1
+
+    async def refresh(self, obj):
+        return None
+
+
+@pytest.fixture
+def fake_session():
+    """Builds a FakeSession from a responder: ``fake_session(lambda statement, params: rows)``."""
+    return FakeSession
+
+
 @pytest.fixture(scope="session")
 def test_database_url() -> str:
     raw_url = _load_test_database_url()
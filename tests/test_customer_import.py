@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+from fastapi import HTTPException
+
+from src.api.v1.services.customer_import import (
+    _CREATE_STAGE_SQL,
+    CSV_COLUMN_COUNT,
+    STAGE_COLUMNS,
+    iter_csv_records,
+)
+
+
+def _stream(content: str, encoding: str = "utf-8-sig") -> io.BytesIO:
+    return io.BytesIO(content.encode(encoding))
+
+
+def test_records_skip_export_header_and_short_rows() -> None:
+    csv_text = (
+        "id;name_client;firm_name\n"
+        "12;Магазин;ООО Савдо\n"
+        "\n"
+        "lonely\n"
+        ";Новый клиент;;;;;;;;;;;agent1;;41,3;69,2\n"
+    )
+    records = list(iter_csv_records(_stream(csv_text)))
+
+    assert [r[0] for r in records] == [2, 5]
+    assert all(len(r) == len(STAGE_COLUMNS) for r in records)
+    first = dict(zip(STAGE_COLUMNS, records[0], strict=True))
+    assert (
+        first["id"] == "12"
+        and first["name_client"] == "Магазин"
+        and first["firm_name"] == "ООО Савдо"
+    )
+    assert first["vat_code"] is None
+    second = dict(zip(STAGE_COLUMNS, records[1], strict=True))
+    assert second["id"] is None
+    assert second["login_agent"] == "agent1"
+    assert (second["latitude"], second["longitude"]) == ("41,3", "69,2")
+
+
+def test_rows_without_header_and_extra_columns_are_trimmed() -> None:
+    row = ";".join(["7", "Клиент"] + ["x"] * (CSV_COLUMN_COUNT + 3))
+    (record,) = list(iter_csv_records(_stream(row + "\n")))
+
+    assert record[:3] == (1, "7", "Клиент")
+    assert len(record) == len(STAGE_COLUMNS)
+
+
+def test_quoted_multiline_cells_keep_physical_line_numbers() -> None:
+    csv_text = '1;"Адрес\nв две строки"\n2;Второй\n'
+    records = list(iter_csv_records(_stream(csv_text)))
+
+    assert [r[0] for r in records] == [2, 3]
+    assert records[0][2] == "Адрес\nв две строки"
+
+
+def test_non_utf8_upload_is_rejected() -> None:
+    stream = _stream("1;Клиент\n", encoding="cp1251")
+
+    with pytest.raises(HTTPException) as exc:
+        list(iter_csv_records(stream))
+    assert exc.value.status_code == 400
+    assert not stream.closed
+
+
+def test_stage_table_has_a_text_column_per_csv_field() -> None:
+    assert _CREATE_STAGE_SQL.count(" text") == CSV_COLUMN_COUNT
+    assert "ON COMMIT DROP" in _CREATE_STAGE_SQL
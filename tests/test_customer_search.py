@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from src.api.v1.services import customer_search
+from src.api.v1.services.customer_search import CustomerSearchCache, numeric_term, search_key
+
+MIGRATION = (
+    Path(__file__).resolve().parents[1] / "alembic" / "versions" / "052_customer_search_trgm.py"
+)
+
+
+def _load_migration():
+    spec = importlib.util.spec_from_file_location("migration_052", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize(
+    ("cyrillic", "latin"),
+    [
+        ("Ташкент", "Tashkent"),
+        ("Хуршид", "Xurshid"),
+        ("Ғайрат", "G'ayrat"),
+        ("Юсуф", "Yusuf"),
+        ("ООО «Чорсу-Савдо»", "OOO Chorsu Savdo"),
+    ],
+)
+def test_search_key_is_transliteration_insensitive(cyrillic: str, latin: str) -> None:
+    assert search_key(cyrillic) == search_key(latin)
+
+
+def test_search_key_collapses_punctuation() -> None:
+    assert search_key('  ООО "Ромашка",  ') == "ooo romaska"
+    assert search_key(None) == ""
+
+
+def test_numeric_term_detects_tax_ids_and_phones() -> None:
+    assert numeric_term("301 234 567") == "301234567"
+    assert numeric_term("+998 (90) 123-45-67") == "998901234567"
+    assert numeric_term("12") is None
+    assert numeric_term("Магазин 12") is None
+
+
+def test_migration_function_uses_the_same_mapping() -> None:
+    migration = _load_migration()
+
+    assert migration.TRANSLIT_FROM == customer_search.TRANSLIT_FROM
+    assert migration.TRANSLIT_TO == customer_search.TRANSLIT_TO
+    assert migration.DIGRAPHS == customer_search.DIGRAPHS
+    assert migration.LATIN_SINGLES == customer_search.LATIN_SINGLES
+    body = migration._search_key_body()
+    assert "''`" in body  # apostrophe is escaped inside the SQL literal
+    assert body.startswith("SELECT btrim(regexp_replace(translate(replace(")
+
+
+def test_cache_is_scoped_by_key_and_expires(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(customer_search.time, "monotonic", lambda: now[0])
+    cache = CustomerSearchCache(ttl=30, max_entries=2)
+
+    cache.set(("agent1", "ром", 10), [{"id": 1}])
+    assert cache.get(("agent1", "ром", 10)) == [{"id": 1}]
+    assert cache.get(("agent2", "ром", 10)) is None
+
+    now[0] += 31
+    assert cache.get(("agent1", "ром", 10)) is None
+
+
+def test_cache_evicts_least_recent_and_invalidates() -> None:
+    cache = CustomerSearchCache(ttl=30, max_entries=2)
+    cache.set(("a", "x", 10), [])
+    cache.set(("b", "x", 10), [])
+    cache.get(("a", "x", 10))
+    cache.set(("c", "x", 10), [])
+
+    assert cache.get(("b", "x", 10)) is None
+    assert cache.get(("a", "x", 10)) == []
+
+    cache.invalidate()
+    assert cache.get(("a", "x", 10)) is None
+
+
+async def test_text_terms_still_match_tax_id_and_account_no(monkeypatch) -> None:
+    monkeypatch.setattr(customer_search, "SEARCH_CACHE", CustomerSearchCache(ttl=0))
+    executed = []
+
+    class _Session:
+        async def execute(self, statement, params=None):
+            executed.append((str(statement), params))
+            return type("Result", (), {"fetchall": lambda self: []})()
+
+    service = customer_search.CustomerSearchService(_Session())
+    await service.search("UZ-12a", limit=10, user_login="agent1")
+    await service.search("Ромашка", limit=10, user_login="agent1")
+
+    for sql, _params in executed:
+        assert "c.tax_id ILIKE :raw" in sql and "c.account_no ILIKE :raw" in sql
+    assert executed[0][1]["raw"] == "%UZ-12a%"
+    assert executed[1][1]["key"] == "romaska"
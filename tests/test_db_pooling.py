@@ -1,6 +1,8 @@
 import importlib
 import sys
 
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
 
 def _reload_connection_module():
     sys.modules.pop("src.core.config", None)
@@ -14,7 +16,7 @@ def test_async_queue_pool_configured(monkeypatch):
     monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test-token")
     module = _reload_connection_module()
 
-    assert module.engine.pool.__class__.__name__ == "AsyncAdaptedQueuePool"
+    assert isinstance(module.engine.pool, AsyncAdaptedQueuePool)
     assert module.DB_POOL_SIZE == 10
     assert module.DB_MAX_OVERFLOW == 20
     assert module.DB_POOL_TIMEOUT == 30
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.core import file_delivery
+from src.core.file_delivery import (
+    IMMUTABLE_CACHE_CONTROL,
+    NAMED_FILE_CACHE_CONTROL,
+    PhotoStaticFiles,
+    send_file,
+)
+
+
+def _app(root: Path) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/download/{name:path}")
+    async def download(name: str, request: Request):
+        return send_file(request, root, root / name, media_type="image/jpeg", filename="shop.jpg")
+
+    app.mount("/photo", PhotoStaticFiles(directory=str(root)), name="photo")
+    return TestClient(app)
+
+
+def _store(root: Path) -> None:
+    (root / "blobs" / "ab").mkdir(parents=True)
+    (root / "blobs" / "ab" / "abcd.jpg").write_bytes(b"0123456789")
+    (root / "33_19102026_093015.jpg").write_bytes(b"named-photo")
+
+
+def test_token_download_supports_range_and_revalidation(tmp_path) -> None:
+    _store(tmp_path)
+    client = _app(tmp_path)
+
+    full = client.get("/download/33_19102026_093015.jpg")
+    assert full.status_code == 200
+    assert full.headers["cache-control"] == NAMED_FILE_CACHE_CONTROL
+    assert 'filename="shop.jpg"' in full.headers["content-disposition"]
+
+    part = client.get("/download/33_19102026_093015.jpg", headers={"Range": "bytes=0-4"})
+    assert part.status_code == 206 and part.content == b"named"
+
+    again = client.get(
+        "/download/33_19102026_093015.jpg", headers={"If-None-Match": full.headers["etag"]}
+    )
+    assert again.status_code == 304 and again.content == b""
+
+
+def test_static_mount_marks_content_addressed_files_immutable(tmp_path) -> None:
+    _store(tmp_path)
+    client = _app(tmp_path)
+
+    blob = client.get("/photo/blobs/ab/abcd.jpg")
+    assert blob.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    again = client.get("/photo/blobs/ab/abcd.jpg", headers={"If-None-Match": blob.headers["etag"]})
+    assert again.status_code == 304
+    named = client.get("/photo/33_19102026_093015.jpg")
+    assert named.headers["cache-control"] == NAMED_FILE_CACHE_CONTROL
+
+
+def test_x_accel_mode_hands_the_bytes_to_nginx(tmp_path, monkeypatch) -> None:
+    _store(tmp_path)
+    monkeypatch.setattr(file_delivery.settings, "photo_delivery", "x-accel")
+    monkeypatch.setattr(file_delivery.settings, "photo_accel_prefix", "/protected-photo/")
+    client = _app(tmp_path)
+
+    response = client.get("/download/blobs/ab/abcd.jpg")
+
+    assert response.status_code == 200
+    assert response.headers["x-accel-redirect"] == "/protected-photo/blobs/ab/abcd.jpg"
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.content == b""
+    assert client.get("/photo/33_19102026_093015.jpg").headers["x-accel-redirect"] == (
+        "/protected-photo/33_19102026_093015.jpg"
+    )
+
+
+def test_static_mount_redirects_missing_keys_to_remote_storage(tmp_path) -> None:
+    async def remote_url(key: str) -> str | None:
+        return (
+            f"https://s3.example/photos/{key}?X-Amz-Signature=x" if key.startswith("ab/") else None
+        )
+
+    app = FastAPI()
+    app.mount(
+        "/photo", PhotoStaticFiles(directory=str(tmp_path), remote_url=remote_url), name="photo"
+    )
+    client = TestClient(app)
+
+    response = client.get("/photo/ab/cd/1_a.jpg", follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["location"] == "https://s3.example/photos/ab/cd/1_a.jpg?X-Amz-Signature=x"
+    assert client.get("/photo/other.jpg", follow_redirects=False).status_code == 404
+
+
+def test_static_mount_hides_internal_directories(tmp_path) -> None:
+    for relative in (
+        ".incoming/abc.jpg",
+        ".quarantine/20261019-000000/ab/cd/1_a.jpg",
+        "ab/cd/1_a.jpg",
+    ):
+        (tmp_path / relative).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / relative).write_bytes(b"jpeg")
+    client = _app(tmp_path)
+
+    assert client.get("/photo/ab/cd/1_a.jpg").status_code == 200
+    assert client.get("/photo/.incoming/abc.jpg").status_code == 404
+    assert client.get("/photo/.quarantine/20261019-000000/ab/cd/1_a.jpg").status_code == 404
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import importlib.util
+from datetime import UTC, datetime
+from pathlib import Path
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from src.core import http_cache
+from src.core.deps import get_current_user
+from src.core.http_cache import ConditionalGet, ReferenceVersions, conditional_get
+from src.database.connection import get_db_session
+from src.database.models import User
+
+VERSIONS_DIR = Path(__file__).resolve().parents[1] / "alembic" / "versions"
+UPDATED_AT = datetime(2026, 10, 19, 9, 30, 15, 123000, tzinfo=UTC)
+
+
+def _load_migration(name: str):
+    spec = importlib.util.spec_from_file_location(name, VERSIONS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _app(monkeypatch, versions: dict, role: str = "agent") -> tuple[TestClient, list[int]]:
+    calls = []
+
+    async def fake_get(session, tables):
+        return {table: versions.get(table, (0, None)) for table in tables}
+
+    monkeypatch.setattr(http_cache.REFERENCE_VERSIONS, "get", fake_get)
+    app = FastAPI()
+
+    @app.get("/items")
+    async def items(cache: ConditionalGet = Depends(conditional_get("currency", vary_role=True))):
+        if cache.not_modified:
+            return cache.not_modified_response()
+        calls.append(1)
+        return [{"code": "UZS"}]
+
+    app.dependency_overrides[get_db_session] = lambda: None
+    app.dependency_overrides[get_current_user] = lambda: User(login="u", role=role)
+    return TestClient(app), calls
+
+
+def test_migration_triggers_cover_the_same_tables() -> None:
+    triggered = (
+        _load_migration("053_reference_versions").REFERENCE_TABLES
+        + _load_migration("054_reference_versions_users_status").REFERENCE_TABLES
+    )
+    assert triggered == http_cache.REFERENCE_TABLES
+
+
+def test_revalidation_returns_304_without_running_the_handler(monkeypatch) -> None:
+    client, calls = _app(monkeypatch, {"currency": (3, UPDATED_AT)})
+
+    first = client.get("/items")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert first.headers["Last-Modified"] == "Mon, 19 Oct 2026 09:30:15 GMT"
+    etag = first.headers["ETag"]
+
+    second = client.get("/items", headers={"If-None-Match": f"W/{etag}"})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+    assert calls == [1]
+
+    since = client.get("/items", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert since.status_code == 304
+
+
+def test_etag_changes_with_version_query_and_role(monkeypatch) -> None:
+    client, _ = _app(monkeypatch, {"currency": (3, UPDATED_AT)})
+    etag = client.get("/items").headers["ETag"]
+
+    assert client.get("/items?language=uz").headers["ETag"] != etag
+    bumped, _ = _app(monkeypatch, {"currency": (4, UPDATED_AT)})
+    assert bumped.get("/items", headers={"If-None-Match": etag}).status_code == 200
+    admin, _ = _app(monkeypatch, {"currency": (3, UPDATED_AT)}, role="admin")
+    assert admin.get("/items").headers["ETag"] != etag
+
+
+def test_without_versions_table_responses_are_not_cached(monkeypatch) -> None:
+    async def no_table(session, tables):
+        return None
+
+    client, _ = _app(monkeypatch, {})
+    monkeypatch.setattr(http_cache.REFERENCE_VERSIONS, "get", no_table)
+
+    response = client.get("/items", headers={"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+def test_local_writes_to_reference_tables_drop_the_snapshot() -> None:
+    versions = ReferenceVersions(ttl=60)
+    versions.load([("currency", 1, UPDATED_AT)])
+    assert versions._expires_at > 0
+
+    versions.observe_statement('SELECT * FROM "Sales".currency', None, False, 0.0)
+    versions.observe_statement('UPDATE "Sales".orders SET status_code = $1', None, False, 0.0)
+    assert versions._expires_at > 0
+
+    versions.observe_statement(
+        'UPDATE "Sales".currency SET name=$1 WHERE code = $2', None, False, 0.0
+    )
+    assert versions._expires_at == 0.0
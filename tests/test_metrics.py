@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.core.metrics import (
+    DB_POOL_WAIT,
+    REGISTRY,
+    MetricsRegistry,
+    record_cache_lookup,
+    render_latest,
+    scrape_authorized,
+)
+from src.core.middleware import request_logging_middleware
+from src.telegram_bot.metrics import normalize_endpoint
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    registry = MetricsRegistry()
+    hist = registry.histogram(
+        "test_latency_seconds", "Test latency.", ("route",), buckets=(0.1, 1.0)
+    )
+    hist.observe(0.05, route="/a")
+    hist.observe(0.5, route="/a")
+    hist.observe(3.0, route="/a")
+
+    text = registry.render()
+    assert '# TYPE test_latency_seconds histogram' in text
+    assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{route="/a"} 3' in text
+
+
+def test_registry_rejects_conflicting_label_sets() -> None:
+    registry = MetricsRegistry()
+    registry.counter("test_total", "Test.", ("a",))
+    assert registry.counter("test_total", "Test.", ("a",)) is not None
+    try:
+        registry.counter("test_total", "Test.", ("b",))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_cache_hit_ratio_is_computed_on_render() -> None:
+    record_cache_lookup("unit_test_cache", True)
+    record_cache_lookup("unit_test_cache", True)
+    record_cache_lookup("unit_test_cache", True)
+    record_cache_lookup("unit_test_cache", False)
+
+    text = render_latest()
+    assert 'sds_cache_hit_ratio{cache="unit_test_cache"} 0.75' in text
+
+
+def test_middleware_labels_requests_by_route_template() -> None:
+    app = FastAPI()
+    app.middleware("http")(request_logging_middleware)
+
+    @app.get("/api/v1/things/{thing_id}")
+    async def get_thing(thing_id: int):
+        return {"id": thing_id}
+
+    client = TestClient(app)
+    assert client.get("/api/v1/things/1").status_code == 200
+    assert client.get("/api/v1/things/2").status_code == 200
+
+    text = REGISTRY.render()
+    expected = 'route="/api/v1/things/{thing_id}",status="200"}'
+    assert expected in text
+    assert "/api/v1/things/1" not in text
+    assert "sds_http_requests_in_flight 0" in text
+
+
+def test_bot_endpoint_normalization_replaces_ids() -> None:
+    assert normalize_endpoint("/api/v1/orders/42/items") == "/api/v1/orders/{id}/items"
+    assert normalize_endpoint("/api/v1/customers?search=abc") == "/api/v1/customers"
+
+
+def test_api_pool_gauges_are_collected() -> None:
+    import src.database.connection  # noqa: F401  registers the api pool collector
+
+    text = render_latest()
+    assert 'sds_db_pool_size{pool="api"} 10' in text
+
+
+async def test_api_pool_checkout_wait_is_observed() -> None:
+    import sqlite3
+
+    from sqlalchemy.util import greenlet_spawn
+
+    from src.database.connection import _TimedQueuePool
+
+    before = DB_POOL_WAIT.get_count(pool="api")
+    pool = _TimedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1)
+    await greenlet_spawn(lambda: pool.connect().close())
+    assert DB_POOL_WAIT.get_count(pool="api") == before + 1
+
+
+def test_scrape_token_is_required_once_configured() -> None:
+    assert scrape_authorized(None, None)
+    assert scrape_authorized("Bearer s3cret", "s3cret")
+    assert not scrape_authorized(None, "s3cret")
+    assert not scrape_authorized("Bearer wrong", "s3cret")
+    assert not scrape_authorized("Bearer сек", "s3cret")
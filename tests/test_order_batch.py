@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import uuid
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from src.api.v1.services.order_service import OrderService
+from src.api.v1.services.reference_data import REFERENCE_DATA
+from src.database.models import Customer, Item, Order
+
+
+@pytest.fixture(autouse=True)
+def _reference_names(monkeypatch):
+    async def statuses(session):
+        return {"open": "Открыт"}
+
+    async def payment_types(session):
+        return {"cash": "Наличные"}
+
+    monkeypatch.setattr(REFERENCE_DATA, "statuses", statuses)
+    monkeypatch.setattr(REFERENCE_DATA, "payment_types", payment_types)
+
+
+def _in_turn(*responses):
+    """Responder answering successive statements with ``responses`` in order."""
+    pending = iter(responses)
+    return lambda statement, params: next(pending)
+
+
+def _order_row(order_no: int, customer_id: int | None = 7):
+    order = Order(
+        order_no=order_no, customer_id=customer_id, status_code="open", payment_type_code="cash"
+    )
+    customer = (
+        Customer(
+            id=customer_id,
+            name_client="Магазин",
+            address="ул. Навои, 1",
+            latitude=Decimal("41.311081"),
+        )
+        if customer_id
+        else None
+    )
+    return (order, customer, "Агент Иванов", None, "W-EXP" if customer_id else None)
+
+
+def test_detail_query_is_one_select_with_outer_joins() -> None:
+    sql = str(OrderService._order_detail_query().compile(dialect=postgresql.dialect()))
+
+    assert sql.count("LEFT OUTER JOIN") == 3
+    assert '"Sales".warehouse.expeditor_login = "Sales".customers.login_expeditor' in sql
+
+
+async def test_get_order_is_two_queries_with_cached_names(fake_session) -> None:
+    item = Item(id=uuid.uuid4(), order_id=5, product_code="P1", quantity=2, price=Decimal("3.50"))
+    session = fake_session(_in_turn([_order_row(5)], [(item, "Йогурт")]))
+
+    order = await OrderService(session).get_order(5)
+
+    assert len(session.statements) == 2
+    assert order["status_name"] == "Открыт" and order["payment_type_name"] == "Наличные"
+    assert order["agent_fio"] == "Агент Иванов" and order["warehouse_from_expeditor"] == "W-EXP"
+    assert order["customer_latitude"] == 41.311081
+    assert order["items"] == [
+        {
+            "id": str(item.id),
+            "product_code": "P1",
+            "product_name": "Йогурт",
+            "quantity": 2,
+            "price": 3.5,
+        }
+    ]
+
+
+async def test_missing_order_is_404(fake_session) -> None:
+    with pytest.raises(HTTPException) as exc:
+        await OrderService(fake_session(_in_turn([], []))).get_order(5)
+    assert exc.value.status_code == 404
+
+
+async def test_batch_keeps_requested_order_and_reports_missing(fake_session) -> None:
+    items = [
+        (Item(id=uuid.uuid4(), order_id=2, product_code="P1", quantity=1, price=None), None),
+        (
+            Item(id=uuid.uuid4(), order_id=1, product_code="P2", quantity=4, price=Decimal("1")),
+            "Творог",
+        ),
+    ]
+    session = fake_session(_in_turn([_order_row(1), _order_row(2, customer_id=None)], items))
+
+    orders, missing = await OrderService(session).get_orders_batch([2, 9, 1, 2])
+
+    assert len(session.statements) == 2
+    assert [o["order_no"] for o in orders] == [2, 1]
+    assert missing == [9]
+    assert orders[0]["customer_name"] is None and orders[0]["items"][0]["price"] is None
+    assert [i["product_name"] for i in orders[1]["items"]] == ["Творог"]
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.sql.dml import Insert
+
+from src.api.v1.services.order_service import OrderService, _diff_item_set
+from src.api.v1.services.reference_data import REFERENCE_DATA
+from src.core.exceptions import ConflictError
+from src.database.models import Order
+
+
+@pytest.fixture(autouse=True)
+def _no_reference_tables(monkeypatch):
+    async def empty(session):
+        return {}
+
+    monkeypatch.setattr(REFERENCE_DATA, "statuses", empty)
+    monkeypatch.setattr(REFERENCE_DATA, "payment_types", empty)
+
+
+def _catalog_session(fake_session, catalog: dict[str, Decimal | None]):
+    """Session answering the statements create_order_full issues, and the rows it inserts."""
+    inserted_rows: list[dict] = []
+
+    def respond(statement, params):
+        if isinstance(statement, Insert):
+            inserted_rows.extend(
+                {col.key: value for col, value in row.items()} for row in statement._multi_values[0]
+            )
+            return []
+        sql = str(statement)
+        if "product.code" in sql:
+            return list(catalog.items())
+        if "max(" in sql:
+            return [(41,)]
+        return []
+
+    return fake_session(respond), inserted_rows
+
+
+async def test_full_order_is_one_commit_with_multi_row_insert_and_server_total(
+    fake_session,
+) -> None:
+    session, inserted_rows = _catalog_session(
+        fake_session, {"P1": Decimal("10.00"), "P2": Decimal("2.50")}
+    )
+    payload = {
+        "customer_id": None,
+        "status_code": "open",
+        "items": [
+            {"product_code": "P1", "quantity": 3, "price": 9.5},
+            {"product_code": "P2", "quantity": 4, "price": None},
+        ],
+    }
+
+    response, notification = await OrderService(session).create_order_full(payload, "agent1")
+
+    (order,) = [obj for obj in session.added if isinstance(obj, Order)]
+    assert order.order_no == 41
+    assert order.total_amount == Decimal("38.50")
+    assert session.commits == 1
+    assert sum(sql.startswith("INSERT") for sql, _ in session.statements) == 1
+    assert [(r["product_code"], r["quantity"], r["price"]) for r in inserted_rows] == [
+        ("P1", 3, Decimal("9.5")),
+        ("P2", 4, Decimal("2.50")),
+    ]
+    assert all(r["order_id"] == 41 and r["last_updated_by"] == "agent1" for r in inserted_rows)
+    assert response["total_amount"] == 38.5 and response["items_count"] == 2
+    assert notification is None
+
+
+async def test_unknown_product_rejects_whole_order_before_insert(fake_session) -> None:
+    session, _ = _catalog_session(fake_session, {"P1": Decimal("10.00")})
+    payload = {
+        "items": [{"product_code": "P1", "quantity": 1}, {"product_code": "NOPE", "quantity": 1}]
+    }
+
+    with pytest.raises(HTTPException) as exc:
+        await OrderService(session).create_order_full(payload, "agent1")
+
+    assert exc.value.status_code == 422
+    assert "NOPE" in exc.value.detail
+    assert session.added == [] and session.commits == 0
+
+
+async def test_non_positive_quantity_is_rejected(fake_session) -> None:
+    session, _ = _catalog_session(fake_session, {"P1": Decimal("10.00")})
+
+    with pytest.raises(HTTPException) as exc:
+        await OrderService(session).create_order_full(
+            {"items": [{"product_code": "P1", "quantity": 0}]}, "a"
+        )
+
+    assert exc.value.status_code == 422
+
+
+def test_item_set_diff_keeps_updates_recreates_changed_products_and_deletes_rest() -> None:
+    keep, swap, drop = uuid4(), uuid4(), uuid4()
+    current = {keep: "P1", swap: "P2", drop: "P3"}
+    desired = [
+        {"id": keep, "product_code": "P1", "quantity": 5, "price": 1.0},
+        {"id": swap, "product_code": "P9", "quantity": 1, "price": None},
+        {"id": None, "product_code": "P4", "quantity": 2, "price": 3.0},
+    ]
+
+    to_add, to_update, to_delete = _diff_item_set(current, desired)
+
+    assert [i["product_code"] for i in to_add] == ["P9", "P4"]
+    assert to_update == [{"id": keep, "quantity": 5, "price": 1.0}]
+    assert set(to_delete) == {swap, drop}
+
+
+async def test_batch_item_edit_rejects_stale_last_updated_at(fake_session) -> None:
+    order = Order(order_no=7, last_updated_at=datetime(2026, 10, 1, 9, 0, tzinfo=UTC))
+    session = fake_session(lambda statement, params: [(order,)])
+    with pytest.raises(ConflictError):
+        await OrderService(session).replace_order_items(
+            7, {"last_updated_at": "2026-10-01T08:59:00+00:00", "items": []}, "admin"
+        )
+    assert session.commits == 0
+
+
+async def test_batch_item_edit_rejects_repeated_item_ids(fake_session) -> None:
+    order = Order(order_no=7, last_updated_at=None)
+    item_id = uuid4()
+
+    def respond(statement, params):
+        if 'FROM "Sales".items' in str(statement):
+            return [(item_id, "P1")]
+        return [(order,)]
+
+    session = fake_session(respond)
+    for payload in (
+        {"update": [{"id": item_id, "quantity": 1}, {"id": item_id, "quantity": 2}]},
+        {"update": [{"id": item_id, "quantity": 1}], "delete": [item_id]},
+        {"items": [{"id": item_id, "product_code": "P1"}, {"id": item_id, "product_code": "P1"}]},
+    ):
+        with pytest.raises(HTTPException) as exc:
+            await OrderService(session).replace_order_items(7, payload, "admin")
+        assert exc.value.status_code == 400 and str(item_id) in exc.value.detail
+    assert session.commits == 0
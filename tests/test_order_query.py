@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from sqlalchemy.dialects import postgresql
+
+from src.api.v1.services.order_query import (
+    ITEM_AMOUNT,
+    ORDER_AMOUNT,
+    OrderFilters,
+    order_items_query,
+    orders_query,
+    parse_optional_datetime,
+    totals_query,
+    with_window_totals,
+)
+
+
+def _filters(**overrides) -> OrderFilters:
+    values = {
+        "order_no": None,
+        "customer_id": None,
+        "customer_name": None,
+        "status_code": None,
+        "scheduled_delivery_from": None,
+        "scheduled_delivery_to": None,
+        "login_agent": None,
+        "login_expeditor": None,
+        "last_updated_by": None,
+    }
+    values.update(overrides)
+    return OrderFilters(**values)
+
+
+def _sql(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_filters_normalize_blank_values() -> None:
+    filters = _filters(
+        customer_name="  ", status_code=" open ", scheduled_delivery_from="not-a-date"
+    )
+
+    assert filters.customer_name is None
+    assert filters.status_code == "open"
+    assert filters.scheduled_delivery_from is None
+    assert parse_optional_datetime("2026-03-01").tzinfo is not None
+
+
+def test_orders_query_applies_every_filter_once() -> None:
+    filters = _filters(
+        order_no=7,
+        customer_name="ООО",
+        status_code="open",
+        scheduled_delivery_from="2026-03-01",
+        login_agent="agent1",
+    )
+    sql = _sql(orders_query(filters))
+
+    assert "orders.order_no = %(order_no_1)s" in sql
+    assert sql.count("ILIKE") == 2
+    assert "orders.status_code = " in sql
+    assert "orders.scheduled_delivery_at >= " in sql
+    assert "customers.login_agent = " in sql
+    assert "ORDER BY" not in sql
+
+
+def test_window_totals_ride_on_the_page_query() -> None:
+    sql = _sql(with_window_totals(orders_query(_filters(customer_id=1)), ORDER_AMOUNT))
+
+    assert "count(*) OVER () AS window_total_count" in sql
+    assert "sum(coalesce(" in sql and "OVER () AS window_total_amount" in sql
+
+
+def test_totals_query_shares_filters_and_joins() -> None:
+    sql = _sql(totals_query(order_items_query(_filters(login_expeditor="exp1")), ITEM_AMOUNT))
+
+    assert sql.startswith("SELECT count(*) AS count_1, sum(")
+    assert "JOIN" in sql and "customers.login_expeditor = " in sql
+    assert "ORDER BY" not in sql
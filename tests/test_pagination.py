@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, time
+from uuid import UUID
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, insert, select
+from sqlalchemy.dialects import postgresql
+
+from src.core.exceptions import ValidationError
+from src.core.pagination import (
+    PaginatedResponse,
+    PaginationParams,
+    SortKey,
+    decode_cursor,
+    encode_cursor,
+    keyset_predicate,
+    paginate_keyset,
+    split_page,
+)
+
+
+def _params(limit: int = 50, offset: int = 0, cursor: str | None = None) -> PaginationParams:
+    return PaginationParams(limit=limit, offset=offset, cursor=cursor, count="exact")
+
+
+def test_cursor_round_trips_typed_values() -> None:
+    values = [
+        datetime(2026, 3, 1, 10, 30, tzinfo=UTC),
+        date(2026, 3, 1),
+        time(9, 15),
+        UUID("12345678-1234-5678-1234-567812345678"),
+        None,
+        42,
+    ]
+    assert decode_cursor(encode_cursor(values)) == values
+
+
+def test_invalid_cursor_is_a_validation_error() -> None:
+    with pytest.raises(ValidationError):
+        decode_cursor("not-a-cursor")
+    with pytest.raises(ValidationError):
+        _params(cursor=encode_cursor([1])).cursor_values(2)
+
+
+def test_cursor_mode_ignores_offset() -> None:
+    assert _params(offset=100, cursor=encode_cursor([1])).offset == 0
+
+
+def test_create_keeps_offset_has_more_when_not_given() -> None:
+    response = PaginatedResponse.create(data=[1, 2], total=5, pagination=_params(limit=2))
+    assert response.has_more is True
+    assert response.next_cursor is None
+
+
+def _compiled(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_cursor_condition_gives_the_index_a_start_position() -> None:
+    from src.api.v1.routers.orders import ORDER_LIST_SORT
+    from src.api.v1.routers.visits import VISIT_LIST_SORT
+
+    order_sql = _compiled(keyset_predicate(ORDER_LIST_SORT, [None, datetime(2026, 3, 1), 42]))
+    assert order_sql == (
+        "(coalesce(\"Sales\".orders.scheduled_delivery_at, '-infinity'::timestamptz), "
+        "coalesce(\"Sales\".orders.order_date, 'infinity'::timestamptz), "
+        "\"Sales\".orders.order_no) "
+        "< ('-infinity'::timestamptz, '2026-03-01 00:00:00', 42)"
+    )
+
+    visit_sql = _compiled(keyset_predicate(VISIT_LIST_SORT, [date(2026, 3, 1), None, 7]))
+    assert visit_sql.startswith("\"Sales\".customers_visits.visit_date <= '2026-03-01' AND (")
+    assert " OR " in visit_sql
+
+
+@pytest.mark.parametrize(
+    ("nulls_last", "sentinel"), [(True, None), (False, None), (True, "-1000"), (False, "1000")]
+)
+def test_keyset_walk_matches_full_ordering_with_nullable_keys(nulls_last, sentinel) -> None:
+    metadata = MetaData()
+    table = Table(
+        "rows", metadata, Column("id", Integer, primary_key=True), Column("score", Integer)
+    )
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    scores = [5, None, 3, 5, None, 1, 3, 7, None, 5, 2]
+    keys = (
+        SortKey(table.c.score, descending=True, nulls_last=nulls_last, null_sentinel=sentinel),
+        SortKey(table.c.id, descending=True, nullable=False),
+    )
+    with engine.begin() as conn:
+        conn.execute(insert(table), [{"id": i + 1, "score": s} for i, s in enumerate(scores)])
+        expected = [
+            row.id
+            for row in conn.execute(select(table).order_by(*(key.order_clause() for key in keys)))
+        ]
+
+        walked: list[int] = []
+        cursor = None
+        pages = 0
+        while True:
+            pagination = _params(limit=3, cursor=cursor)
+            rows = conn.execute(paginate_keyset(select(table), keys, pagination)).all()
+            page, has_more, cursor = split_page(rows, pagination, lambda row: (row.score, row.id))
+            walked.extend(row.id for row in page)
+            pages += 1
+            if not has_more:
+                break
+
+    assert walked == expected
+    assert pages == 4
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+from PIL import ExifTags, Image
+
+from src.api.v1.services.photo_exif import PhotoExif, read_exif, store_exif
+from src.core.config import settings
+
+
+def _phone_jpeg(path, *, gps=True, offset=None):
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = 6
+    exif[ExifTags.Base.DateTime] = "2026:10:19 08:00:00"
+    exif.get_ifd(ExifTags.IFD.Exif)[ExifTags.Base.DateTimeOriginal] = "2026:10:18 14:30:05"
+    if offset:
+        exif.get_ifd(ExifTags.IFD.Exif)[ExifTags.Base.OffsetTimeOriginal] = offset
+    if gps:
+        location = exif.get_ifd(ExifTags.IFD.GPSInfo)
+        location[ExifTags.GPS.GPSLatitudeRef] = "N"
+        location[ExifTags.GPS.GPSLatitude] = (41.0, 18.0, 39.8916)
+        location[ExifTags.GPS.GPSLongitudeRef] = "W"
+        location[ExifTags.GPS.GPSLongitude] = (69.0, 16.0, 46.8)
+    Image.new("RGB", (64, 48)).save(path, "JPEG", exif=exif)
+    return path
+
+
+def test_capture_time_gps_and_orientation_are_read(tmp_path) -> None:
+    exif = read_exif(_phone_jpeg(tmp_path / "a.jpg"))
+
+    assert exif.taken_at == datetime(2026, 10, 18, 14, 30, 5, tzinfo=ZoneInfo(settings.timezone))
+    assert exif.latitude == Decimal("41.311081")
+    assert exif.longitude == Decimal("-69.279667")
+    assert exif.orientation == 6
+
+
+def test_capture_time_uses_the_recorded_offset(tmp_path) -> None:
+    taken_at = read_exif(_phone_jpeg(tmp_path / "a.jpg", offset="-03:30")).taken_at
+
+    assert taken_at.utcoffset() == -timedelta(hours=3, minutes=30)
+    assert taken_at == datetime(2026, 10, 18, 18, 0, 5, tzinfo=UTC)
+
+
+def test_files_without_exif_or_images_yield_empty_result(tmp_path) -> None:
+    Image.new("RGB", (8, 8)).save(tmp_path / "plain.png")
+    (tmp_path / "broken.jpg").write_bytes(b"not an image")
+
+    assert read_exif(tmp_path / "plain.png") == PhotoExif()
+    assert read_exif(tmp_path / "broken.jpg") == PhotoExif()
+    assert read_exif(tmp_path / "missing.jpg") == PhotoExif()
+    assert read_exif(_phone_jpeg(tmp_path / "b.jpg", gps=False)).latitude is None
+
+
+async def test_results_are_stored_in_one_statement() -> None:
+    class Session:
+        calls = []
+
+        async def execute(self, statement, params=None):
+            self.calls.append((str(statement), params))
+
+    session = Session()
+    await store_exif(
+        session, [(1, PhotoExif(orientation=1)), (2, PhotoExif(latitude=Decimal("1.5")))]
+    )
+    await store_exif(session, [])
+
+    assert len(session.calls) == 1
+    sql, params = session.calls[0]
+    assert "COALESCE(:taken_at, photo_datetime)" in sql and "exif_checked_at = now()" in sql
+    assert [p["id"] for p in params] == [1, 2] and params[1]["latitude"] == Decimal("1.5")
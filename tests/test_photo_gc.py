@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import io
+import time
+from datetime import datetime, timedelta
+
+from fastapi import UploadFile
+
+from src.api.v1.services.photo_gc import (
+    QUARANTINE_DIR_NAME,
+    collect_garbage,
+    find_orphans,
+    purge_quarantine,
+    scan_storage,
+)
+from src.api.v1.services.photo_storage import LocalPhotoStorage, storage_key, store_upload
+
+
+async def _upload(storage, key: str, content: bytes) -> None:
+    upload = UploadFile(file=io.BytesIO(content), filename="x.jpg")
+    await store_upload(upload, storage, key, max_size=1024, content_type="image/jpeg")
+
+
+async def _tree(tmp_path):
+    legacy = tmp_path / "legacy"
+    legacy.mkdir()
+    storage = LocalPhotoStorage(tmp_path / "photo", (legacy,))
+    await _upload(storage, "aa/bb/1_live.jpg", b"live")
+    await _upload(storage, "cc/dd/2_dup.jpg", b"live")  # same blob as 1_live
+    await _upload(storage, "ee/ff/3_gone.jpg", b"gone")
+    bare = storage.root / storage_key("4_bare.jpg")
+    bare.parent.mkdir(parents=True)
+    bare.write_bytes(b"bare")
+    (legacy / "5_old.jpg").write_bytes(b"old")
+    (legacy / "6_kept.jpg").write_bytes(b"kept")
+    thumbs = storage.root / "thumbs" / "12" / "34"
+    thumbs.mkdir(parents=True)
+    (thumbs / "1_live_320_abc.webp").write_bytes(b"t")
+    (thumbs / "3_gone_320_def.webp").write_bytes(b"t")
+    (storage.root / ".incoming" / "dead.part").write_bytes(b"partial")
+    return storage
+
+
+async def test_orphans_are_found_against_the_live_paths(tmp_path) -> None:
+    storage = await _tree(tmp_path)
+    files = scan_storage(storage, workers=4)
+
+    orphans = find_orphans(
+        files, ["aa/bb/1_live.jpg", "/4_bare.jpg", "6_kept.jpg"], older_than=time.time() + 60
+    )
+
+    assert sorted(item.relative for item in orphans) == [
+        ".incoming/dead.part",
+        "_legacy/0/5_old.jpg",
+        "cc/dd/2_dup.jpg",
+        "ee/ff/3_gone.jpg",
+        "thumbs/12/34/3_gone_320_def.webp",
+    ]
+    kinds = {item.relative: item.kind for item in orphans}
+    assert kinds["ee/ff/3_gone.jpg"] == "photo" and kinds["_legacy/0/5_old.jpg"] == "legacy"
+    assert "aa/bb/1_live.jpg" not in kinds and storage_key("4_bare.jpg") not in kinds
+    assert not any(kind == "blob" for kind in kinds.values())  # every blob still has a name
+    assert find_orphans(files, [], older_than=0) == []  # grace period protects fresh files
+
+
+async def test_collect_quarantines_then_purges_and_reports_bytes(tmp_path, fake_session) -> None:
+    storage = await _tree(tmp_path)
+    paths = ["aa/bb/1_live.jpg", "4_bare.jpg", "6_kept.jpg"]
+    session = fake_session(lambda statement, params: [(path,) for path in paths])
+
+    # grace_seconds < 0: files written by the test already count as old enough
+    report = await collect_garbage(storage, session, grace_seconds=-60, workers=2)
+
+    assert len(session.statements) == 1 and "UNION" in session.statements[0][0]
+    assert report.scanned == 11
+    assert report.reclaimed_bytes == len(b"partial")
+    run_dir = next((storage.root / QUARANTINE_DIR_NAME).iterdir())
+    assert (run_dir / "ee/ff/3_gone.jpg").read_bytes() == b"gone"
+    assert (run_dir / "_legacy/0/5_old.jpg").exists()
+    assert not (storage.root / "ee/ff/3_gone.jpg").exists()
+    assert storage.local_path("aa/bb/1_live.jpg").read_bytes() == b"live"
+    assert storage.local_path("4_bare.jpg").read_bytes() == b"bare"
+
+    runs, reclaimed = purge_quarantine(storage, keep_days=7, now=datetime.now() + timedelta(days=8))
+    assert runs == 1 and not run_dir.exists()
+    # 2_dup shared its inode with the live photo: only 3_gone, 5_old and the thumbnail are freed
+    assert reclaimed == len(b"old") + len(b"t")
+
+    # The blob of 3_gone lost its last name with the purge and is collected by the next run
+    second = await collect_garbage(storage, session, grace_seconds=-60, workers=2, dry_run=True)
+    assert [item.kind for item in second.orphans] == ["blob"]
+    assert second.quarantined_bytes == len(b"gone")
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from src.api.v1.routers import customer_photos
+from src.api.v1.services import photo_thumbnails
+from src.api.v1.services.photo_storage import LocalPhotoStorage, fanout
+from src.api.v1.services.photo_thumbnails import ensure_thumbnail, remove_thumbnails, thumbnail_for
+from src.core.file_delivery import NAMED_FILE_CACHE_CONTROL
+from src.database.connection import get_db_session
+from src.database.models import CustomerPhoto
+
+
+@pytest.fixture(autouse=True)
+def _pool():
+    yield
+    photo_thumbnails.shutdown_thumbnail_pool()
+
+
+def _camera_jpeg(path, size=(1200, 900)):
+    """Landscape sensor data stored with EXIF "rotate 90° CW" (orientation 6), like a phone shot."""
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new("RGB", size, (200, 40, 40)).save(path, "JPEG", exif=exif)
+    return path
+
+
+async def test_render_applies_orientation_and_is_cached(tmp_path, monkeypatch) -> None:
+    storage = LocalPhotoStorage(tmp_path)
+    _camera_jpeg(tmp_path / "33_19102026_093015.jpg")
+
+    thumb = await ensure_thumbnail(storage, "33_19102026_093015.jpg", 320)
+
+    assert thumb.path.parent == tmp_path / "thumbs" / fanout("33_19102026_093015.jpg")
+    assert thumb.path.name.startswith("33_19102026_093015_320_")
+    with Image.open(thumb.path) as image:
+        assert image.format == "WEBP" and image.size == (240, 320)
+    assert not list(thumb.path.parent.glob("*.tmp"))
+
+    def no_pool():
+        raise AssertionError("cached thumbnail must not be rendered again")
+
+    monkeypatch.setattr(photo_thumbnails, "_get_pool", no_pool)
+    assert (await ensure_thumbnail(storage, "33_19102026_093015.jpg", 320)).path == thumb.path
+
+
+async def test_new_original_gets_a_new_name(tmp_path) -> None:
+    storage = LocalPhotoStorage(tmp_path)
+    key = "ab/cd/7_01012026_120000.jpg"
+    (tmp_path / "ab" / "cd").mkdir(parents=True)
+    original = _camera_jpeg(tmp_path / key)
+    before = thumbnail_for(tmp_path, key, storage.version(key), 160)
+
+    _camera_jpeg(original, size=(800, 600))
+
+    assert thumbnail_for(tmp_path, key, storage.version(key), 160).path != before.path
+    thumb = await ensure_thumbnail(storage, key, 160)
+    remove_thumbnails(tmp_path, key)
+    assert not list(thumb.path.parent.iterdir())
+
+
+def test_removal_spares_photos_sharing_the_stem_prefix(tmp_path) -> None:
+    key = "ab/cd/abc.jpg"
+    own = thumbnail_for(tmp_path, key, "v1", 320).path
+    own.parent.mkdir(parents=True)
+    # Another photo "abc_2.jpg" whose derivatives happen to land in the same fan-out directory
+    neighbours = [
+        own.parent / f"abc_2_320_{'0' * 20}.webp",
+        own.parent / f"abc_160_320_{'1' * 20}.webp",
+    ]
+    for path in (own, *neighbours):
+        path.write_bytes(b"x")
+
+    remove_thumbnails(tmp_path, key)
+
+    assert not own.exists()
+    assert all(path.exists() for path in neighbours)
+
+
+def test_endpoint_serves_webp_and_revalidates(tmp_path, monkeypatch, fake_session) -> None:
+    _camera_jpeg(tmp_path / "5_19102026_100000.jpg")
+    monkeypatch.setattr(customer_photos, "PHOTO_STORAGE", LocalPhotoStorage(tmp_path))
+    photo = CustomerPhoto(
+        id=1, customer_id=5, photo_path="5_19102026_100000.jpg", mime_type="image/jpeg"
+    )
+    app = FastAPI()
+    app.include_router(customer_photos.router)
+    app.dependency_overrides[get_db_session] = lambda: fake_session(
+        lambda statement, params: [(photo,)]
+    )
+    client = TestClient(app)
+
+    response = client.get("/photos/thumbnail/token?size=160")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert response.headers["cache-control"] == NAMED_FILE_CACHE_CONTROL
+    assert len(response.content) < 20_000
+
+    etag = response.headers["etag"]
+    revalidated = client.get("/photos/thumbnail/token?size=160", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert client.get("/photos/thumbnail/token?size=150").status_code == 400
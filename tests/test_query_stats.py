@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from src.core import middleware
+from src.core.middleware import request_logging_middleware
+from src.core.query_stats import (
+    RequestQueryStats,
+    begin_request,
+    current_stats,
+    end_request,
+    install_query_hooks,
+    normalize_statement,
+)
+
+
+def test_normalize_statement_collapses_literals_and_placeholders() -> None:
+    first = normalize_statement(
+        'SELECT * FROM "Sales".orders WHERE order_no = $1 AND status = \'open\' AND qty > 5'
+    )
+    second = normalize_statement(
+        'SELECT *  FROM "Sales".orders\n WHERE order_no = $7 AND status = \'closed\' AND qty > 12'
+    )
+    assert first == second
+    assert "order_no = ?" in first
+
+
+def test_normalize_statement_keeps_casts_and_collapses_in_lists() -> None:
+    shape = normalize_statement("SELECT COALESCE(x, 0)::int FROM t1 WHERE id IN ($1, $2, $3)")
+    assert "::int" in shape
+    assert "t1" in shape
+    assert shape.endswith("IN (...)")
+
+
+def test_repeated_shapes_respects_threshold() -> None:
+    stats = RequestQueryStats(request_id="r1")
+    for customer_id in range(12):
+        stats.record(f"SELECT name FROM customers WHERE id = {customer_id}", 0.001)
+    stats.record("SELECT 1", 0.001)
+
+    assert stats.count == 13
+    assert stats.repeated_shapes(10) == [("SELECT name FROM customers WHERE id = ?", 12)]
+    assert stats.repeated_shapes(12) == []
+    assert stats.repeated_shapes(0) == []
+
+
+def test_engine_hooks_record_into_current_request() -> None:
+    engine = create_engine("sqlite://")
+    install_query_hooks(engine)
+    install_query_hooks(engine)
+
+    stats, token = begin_request("r2")
+    try:
+        with engine.connect() as conn:
+            for value in range(3):
+                conn.execute(text("SELECT :v"), {"v": value})
+    finally:
+        end_request(token)
+
+    assert current_stats() is None
+    assert stats.count == 3
+    assert stats.shapes["SELECT ?"] == 3
+
+
+def test_failed_statement_does_not_leave_its_start_time_behind() -> None:
+    from sqlalchemy.exc import OperationalError
+
+    from src.core.query_stats import _QUERY_START_KEY
+
+    engine = create_engine("sqlite://")
+    install_query_hooks(engine)
+
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info[_QUERY_START_KEY] == []
+        conn.execute(text("SELECT 1"))
+        assert conn.info[_QUERY_START_KEY] == []
+
+
+def test_middleware_exposes_debug_headers_and_flags_repeats(monkeypatch) -> None:
+    engine = create_engine("sqlite://")
+    install_query_hooks(engine)
+    warnings: list[str] = []
+    monkeypatch.setattr(middleware.settings, "api_debug", True)
+    monkeypatch.setattr(middleware.settings, "n_plus_one_threshold", 2)
+    monkeypatch.setattr(
+        middleware.logger, "warning", lambda message, *args: warnings.append(message.format(*args))
+    )
+
+    app = FastAPI()
+    app.middleware("http")(request_logging_middleware)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int) -> dict:
+        with engine.connect() as conn:
+            for value in range(4):
+                conn.execute(text("SELECT :v"), {"v": value})
+        return {"id": item_id}
+
+    response = TestClient(app).get("/items/1")
+
+    assert response.headers["X-DB-Query-Count"] == "4"
+    assert "X-DB-Time-Ms" in response.headers
+    assert any(
+        "n_plus_one_suspect" in line and "route=/items/{item_id}" in line and "repeats=4" in line
+        for line in warnings
+    )
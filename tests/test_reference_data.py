@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from src.api.v1.routers import operations_flow
+from src.api.v1.services import reference_data
+from src.api.v1.services.reference_data import ProductRef, ReferenceDataCache
+
+TABLE_ROWS = {
+    '"Sales".product': [("P1", "Йогурт", Decimal("12.50"), True), ("P2", "Старый", None, False)],
+    '"Sales".warehouse': [("W1", "Главный", None)],
+    '"Sales".payment_type': [("cash", "Наличные")],
+    '"Sales".users': [("exp1", "expeditor"), ("admin", "admin")],
+}
+
+
+def _table_rows(statement, params):
+    sql = str(statement)
+    return next(rows for table, rows in TABLE_ROWS.items() if f"FROM {table}" in sql)
+
+
+def _versions(monkeypatch, current: dict | None):
+    async def fake_get(session, tables):
+        if current is None:
+            return None
+        return {table: (current.get(table, 1), None) for table in tables}
+
+    monkeypatch.setattr(reference_data.REFERENCE_VERSIONS, "get", fake_get)
+
+
+async def test_tables_load_once_and_reload_when_their_version_moves(
+    monkeypatch, fake_session
+) -> None:
+    versions = {"product": 1}
+    _versions(monkeypatch, versions)
+    cache = ReferenceDataCache(ttl=60)
+    session = fake_session(_table_rows)
+
+    products = await cache.products(session)
+    assert products["P1"] == ProductRef("P1", "Йогурт", Decimal("12.50"), True)
+    await cache.products(session)
+    assert len(session.statements) == 1
+
+    versions["product"] = 2
+    await cache.products(session)
+    assert len(session.statements) == 2
+
+
+async def test_without_versions_table_copies_expire_after_ttl(monkeypatch, fake_session) -> None:
+    _versions(monkeypatch, None)
+    now = [100.0]
+    monkeypatch.setattr(reference_data.time, "monotonic", lambda: now[0])
+    cache = ReferenceDataCache(ttl=5)
+    session = fake_session(_table_rows)
+
+    await cache.payment_types(session)
+    await cache.payment_types(session)
+    assert len(session.statements) == 1
+
+    now[0] += 6
+    assert await cache.payment_types(session) == {"cash": "Наличные"}
+    assert len(session.statements) == 2
+
+
+async def test_operation_validators_run_no_queries_once_warm(monkeypatch, fake_session) -> None:
+    _versions(monkeypatch, {})
+    monkeypatch.setattr(operations_flow, "REFERENCE_DATA", ReferenceDataCache(ttl=60))
+    session = fake_session(_table_rows)
+    for _ in range(2):
+        assert await operations_flow.validate_warehouse(session, "W1")
+        assert await operations_flow.validate_product(session, "P1")
+        assert not await operations_flow.validate_product(session, "P2")
+        assert await operations_flow.validate_payment_type(session, "cash")
+        assert await operations_flow.validate_user_role(session, "exp1", ["Expeditor"])
+        assert not await operations_flow.validate_user_role(session, "admin", ["expeditor"])
+        assert not await operations_flow.validate_user_role(session, "ghost", ["admin"])
+
+    assert len(session.statements) == 4
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from src.core import schema_registry
+from src.core.schema_registry import SchemaCapabilities, has_column
+
+
+def test_capabilities_answer_from_loaded_rows() -> None:
+    schema = SchemaCapabilities()
+    assert schema.loaded is False
+
+    schema.load([("cities", "id"), ("cities", "region"), ("territories", "id")])
+
+    assert schema.loaded is True
+    assert schema.has_table("territories")
+    assert schema.has_column("cities", "region")
+    assert not schema.has_column("territories", "city_id")
+    assert not schema.has_column("missing", "id")
+    assert schema.as_dict()["tables"]["cities"] == ["id", "region"]
+
+
+async def test_has_column_loads_once_then_serves_from_memory(monkeypatch, fake_session) -> None:
+    monkeypatch.setattr(schema_registry, "SCHEMA", SchemaCapabilities())
+    rows = [("operation_types", "code"), ("operation_types", "executor_role")]
+    conn = fake_session(lambda statement, params: rows)
+
+    assert await has_column(conn, "operation_types", "executor_role") is True
+    assert await has_column(conn, "users", "language_code") is False
+    assert len(conn.statements) == 1
+
+
+async def test_refresh_replaces_previous_snapshot(fake_session) -> None:
+    schema = SchemaCapabilities()
+    schema.load([("users", "login")])
+
+    rows = [("users", "login"), ("users", "notifications_enabled")]
+    await schema.refresh(fake_session(lambda statement, params: rows))
+
+    assert schema.has_column("users", "notifications_enabled")
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+
+from sqlalchemy import create_engine, text
+
+from src.core import slow_queries
+from src.core.query_stats import install_query_hooks
+from src.core.slow_queries import SlowQueryLog, fingerprint, observe_statement
+
+
+def test_log_aggregates_by_fingerprint_and_orders_top() -> None:
+    log = SlowQueryLog()
+    log.record("SELECT * FROM a WHERE id = ?", 0.2)
+    log.record("SELECT * FROM a WHERE id = ?", 0.3)
+    log.record("SELECT * FROM b", 0.9)
+
+    top = log.top(order_by="total")
+    assert [e.statement for e in top] == ["SELECT * FROM b", "SELECT * FROM a WHERE id = ?"]
+    assert top[1].count == 2
+    assert top[1].as_dict()["total_ms"] == 500.0
+    assert log.top(order_by="count")[0].fingerprint == fingerprint("SELECT * FROM a WHERE id = ?")
+
+
+def test_log_evicts_cheapest_entry_when_full() -> None:
+    log = SlowQueryLog(max_entries=2)
+    log.record("q1", 1.0)
+    log.record("q2", 0.1)
+    log.record("q3", 0.5)
+
+    assert {e.statement for e in log.top()} == {"q1", "q3"}
+
+
+def test_claim_plan_is_rate_limited_per_fingerprint() -> None:
+    log = SlowQueryLog()
+    entry = log.record("SELECT 1", 1.0)
+
+    assert log.claim_plan(entry.fingerprint, interval_seconds=3600) is True
+    assert log.claim_plan(entry.fingerprint, interval_seconds=3600) is False
+    assert log.claim_plan("unknown", interval_seconds=0) is False
+
+
+def test_observer_records_only_statements_above_threshold(monkeypatch, tmp_path) -> None:
+    log_file = tmp_path / "slow.jsonl"
+    monkeypatch.setattr(slow_queries, "SLOW_QUERIES", SlowQueryLog())
+    monkeypatch.setattr(slow_queries, "_file_logger", None)
+    monkeypatch.setattr(slow_queries.settings, "slow_query_ms", 100)
+    monkeypatch.setattr(slow_queries.settings, "slow_query_log_file", str(log_file))
+
+    observe_statement("SELECT * FROM t WHERE id = 1", (), False, 0.05)
+    observe_statement("SELECT * FROM t WHERE id = 2", (), False, 0.25)
+    observe_statement("EXPLAIN (FORMAT JSON) SELECT 1", (), False, 5.0)
+
+    entries = slow_queries.SLOW_QUERIES.top()
+    assert len(entries) == 1
+    assert entries[0].statement == "SELECT * FROM t WHERE id = ?"
+    for handler in slow_queries._file_logger.handlers:
+        handler.flush()
+    event = json.loads(log_file.read_text(encoding="utf-8").splitlines()[-1])
+    assert event["event"] == "slow_query"
+    assert event["duration_ms"] == 250.0
+    for handler in list(slow_queries._file_logger.handlers):
+        handler.close()
+        slow_queries._file_logger.removeHandler(handler)
+
+
+def test_engine_hooks_feed_observers(monkeypatch) -> None:
+    seen: list[str] = []
+    monkeypatch.setattr(
+        "src.core.query_stats._statement_observers",
+        [lambda statement, parameters, executemany, elapsed: seen.append(statement)],
+    )
+    engine = create_engine("sqlite://")
+    install_query_hooks(engine)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert seen == ["SELECT 1"]
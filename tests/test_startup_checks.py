@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+
+from src.core import startup_checks
+from src.core.startup_checks import StartupCheckReport, run_startup_checks
+
+
+async def test_run_startup_checks_collects_results(monkeypatch) -> None:
+    async def fake_max_connections():
+        return 200
+
+    async def fake_schema_info():
+        return [("customers",), ("orders",)]
+
+    async def fake_integrity():
+        return [
+            {"name": "Orders without customer", "status": "ok", "count": 0},
+            {"name": "Expired batches", "status": "warn", "count": 3},
+        ]
+
+    monkeypatch.setattr(startup_checks, "verify_postgres_max_connections", fake_max_connections)
+    monkeypatch.setattr(startup_checks, "get_schema_info", fake_schema_info)
+    monkeypatch.setattr(startup_checks, "check_data_integrity", fake_integrity)
+
+    report = await run_startup_checks(StartupCheckReport())
+
+    assert report.status == "warn"
+    assert report.max_connections == 200
+    assert report.tables == ["customers", "orders"]
+    data = report.as_dict()
+    assert data["finished_at"] is not None
+    assert data["integrity"][1]["count"] == 3
+
+
+async def test_run_startup_checks_reports_failure(monkeypatch) -> None:
+    async def broken():
+        raise ConnectionError("db went away")
+
+    monkeypatch.setattr(startup_checks, "verify_postgres_max_connections", broken)
+
+    report = await run_startup_checks(StartupCheckReport())
+
+    assert report.status == "failed"
+    assert "db went away" in report.error
+
+
+async def test_stop_background_checks_cancels_running_task(monkeypatch) -> None:
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(startup_checks, "verify_postgres_max_connections", slow)
+    monkeypatch.setattr(startup_checks, "STARTUP_REPORT", StartupCheckReport())
+    monkeypatch.setattr(
+        startup_checks,
+        "run_startup_checks",
+        lambda: run_startup_checks(startup_checks.STARTUP_REPORT),
+    )
+
+    task = startup_checks.start_background_checks()
+    await started.wait()
+    await startup_checks.stop_background_checks()
+
+    assert task.cancelled()
+    assert startup_checks.STARTUP_REPORT.status == "cancelled"
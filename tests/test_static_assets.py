@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import gzip
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.core.file_delivery import IMMUTABLE_CACHE_CONTROL
+from src.core.static_assets import (
+    PAGE_CACHE_CONTROL,
+    AssetStaticFiles,
+    build_static_assets,
+    negotiate,
+    page_response,
+)
+
+_SCRIPT = b"console.log('leaflet');\n" * 100
+
+
+def _sources(root):
+    (root / "vendor" / "leaflet").mkdir(parents=True)
+    (root / "vendor" / "leaflet" / "leaflet.js").write_bytes(_SCRIPT)
+    (root / "favicon.png").write_bytes(b"\x89PNG tiny")
+    (root / "app.html").write_bytes(
+        (
+            "\ufeff<link rel=\"icon\" href=\"/favicon.ico\">"
+            "<script>s.src = '/static/vendor/leaflet/leaflet.js';</script>"
+        ).encode()
+        * 40
+    )
+    return root
+
+
+def _client(source, build) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/app")
+    async def page(request: Request):
+        return page_response(build, source, "app.html", request.headers)
+
+    app.mount(
+        "/static",
+        AssetStaticFiles(directory=str(build), fallback_directory=str(source), check_dir=False),
+    )
+    return TestClient(app)
+
+
+def test_build_fingerprints_compresses_and_rewrites_pages(tmp_path) -> None:
+    source, build = _sources(tmp_path / "src"), tmp_path / "build"
+
+    manifest = build_static_assets(source, build)
+
+    hashed = manifest["vendor/leaflet/leaflet.js"]
+    assert hashed.startswith("vendor/leaflet/leaflet.") and hashed.endswith(".js")
+    assert gzip.decompress((build / (hashed + ".gz")).read_bytes()) == _SCRIPT
+    assert not (build / (manifest["favicon.png"] + ".gz")).exists()  # too small / not text
+    page = (build / "app.html").read_bytes()
+    assert page.startswith(b"\xef\xbb\xbf")
+    assert f"/static/{hashed}".encode() in page
+    assert b"/static/vendor/leaflet/leaflet.js'" not in page
+    assert f'href="/static/{manifest["favicon.png"]}"'.encode() in page
+
+    mtime = (build / (hashed + ".gz")).stat().st_mtime_ns
+    assert build_static_assets(source, build) == manifest
+    # unchanged files are not rewritten
+    assert (build / (hashed + ".gz")).stat().st_mtime_ns == mtime
+
+
+def test_encoding_negotiation_respects_refusals(tmp_path) -> None:
+    asset = tmp_path / "a.js"
+    asset.write_text("x")
+    (tmp_path / "a.js.gz").write_bytes(b"gz")
+
+    assert negotiate(asset, "gzip, deflate, br") == (tmp_path / "a.js.gz", "gzip")
+    assert negotiate(asset, "br;q=1.0, gzip;q=0") == (asset, None)
+    assert negotiate(asset, "") == (asset, None)
+
+
+def test_hashed_assets_are_immutable_and_served_precompressed(tmp_path) -> None:
+    source, build = _sources(tmp_path / "src"), tmp_path / "build"
+    client = _client(source, build)
+    # sources before the build
+    assert client.get("/static/vendor/leaflet/leaflet.js").status_code == 200
+
+    hashed = build_static_assets(source, build)["vendor/leaflet/leaflet.js"]
+    response = client.get(f"/static/{hashed}", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200 and response.content == _SCRIPT
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(_SCRIPT) // 4
+
+    identity = client.get(f"/static/{hashed}", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers and identity.content == _SCRIPT
+
+    page = client.get("/app", headers={"Accept-Encoding": "gzip"})
+    assert page.headers["cache-control"] == PAGE_CACHE_CONTROL
+    assert page.headers["content-type"] == "text/html; charset=utf-8"
+    assert hashed in page.text
+    revalidated = client.get(
+        "/app", headers={"Accept-Encoding": "gzip", "If-None-Match": page.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
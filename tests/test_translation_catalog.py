@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.v1.routers import translations as translations_router
+from src.api.v1.services import translation_service
+from src.api.v1.services.translation_service import TranslationService
+from src.core import translation_catalog
+from src.core.deps import get_current_user
+from src.core.translation_catalog import NOTIFY_CHANNEL, TranslationCatalog
+from src.database.connection import get_db_session
+from src.database.models import User
+from src.telegram_bot import i18n
+
+T0 = datetime(2026, 10, 19, 9, 0, tzinfo=UTC)
+
+
+def _row(key, lang, value, minutes=0, category="ui"):
+    return (key, lang, value, category, T0 + timedelta(minutes=minutes))
+
+
+@pytest.fixture
+def catalog_session(fake_session):
+    """Builds a session answering the catalog queries from ``rows``, a list the test may edit."""
+
+    def build(rows):
+        def respond(statement, params):
+            sql = " ".join(str(statement).split())
+            if "count(*)" in sql:
+                return [(len(rows),)]
+            if "updated_at >" in sql:
+                return [row for row in rows if row[4] > params["since"]]
+            if "pg_notify" in sql:
+                return []
+            return list(rows)
+
+        return fake_session(respond)
+
+    return build
+
+
+ROWS = [
+    _row("ui.save", "ru", "Сохранить"),
+    _row("ui.save", "uz", "Saqlash"),
+    _row("ui.cancel", "ru", "Отмена"),
+    _row("telegram.action.back", "ru", "◀️ Назад", category="telegram"),
+    _row("telegram.action.back", "en", "◀️ Back", category="telegram"),
+    _row("telegram.multi", "ru", "строка 1\\nстрока 2", category="telegram"),
+]
+
+
+async def test_one_query_then_dict_hits_with_fallback_and_aliases(catalog_session) -> None:
+    catalog = TranslationCatalog(refresh_seconds=60)
+    session = catalog_session(ROWS)
+
+    await catalog.ready(session)
+    await catalog.ready(session)
+
+    assert len(session.statements) == 1
+    assert catalog.get("ui.save", "uz") == "Saqlash"
+    assert catalog.get("ui.cancel", "uz") == "Отмена"  # default language
+    assert catalog.get("telegram.button.back", "en") == "◀️ Back"  # alias of telegram.action.back
+    assert catalog.get("missing", "en") is None
+    assert catalog.texts("uz") is catalog.texts("uz")  # built once per change
+
+
+async def test_incremental_refresh_and_full_reload_after_deletes(catalog_session) -> None:
+    catalog = TranslationCatalog(refresh_seconds=0)
+    rows = list(ROWS)
+    session = catalog_session(rows)
+    await catalog.ready(session)
+    generation = catalog.generation
+
+    rows.append(_row("ui.close", "ru", "Закрыть", minutes=5))
+    rows[0] = _row("ui.save", "ru", "Сохранить всё", minutes=5)
+    session.statements.clear()
+    await catalog.ready(session)
+
+    assert [sql.split()[-1] for sql, _ in session.statements] == [":since", '"Sales".translations']
+    assert catalog.get("ui.close", "ru") == "Закрыть"
+    assert catalog.get("ui.save", "ru") == "Сохранить всё"
+    assert catalog.generation == generation + 1
+
+    del rows[2]  # ui.cancel
+    await catalog.ready(session)
+    assert catalog.get("ui.cancel", "ru") is None
+
+
+async def test_views_transform_texts_once(catalog_session) -> None:
+    catalog = TranslationCatalog(refresh_seconds=60)
+    catalog.register_view("upper", str.upper)
+    await catalog.ready(catalog_session(ROWS))
+
+    assert catalog.get("ui.save", "uz", view="upper") == "SAQLASH"
+    assert catalog.get("ui.save", "uz") == "Saqlash"
+
+
+async def test_service_resolves_from_catalog_and_notifies_on_write(
+    monkeypatch, catalog_session
+) -> None:
+    catalog = TranslationCatalog(refresh_seconds=60)
+    monkeypatch.setattr(translation_service, "TRANSLATION_CATALOG", catalog)
+    session = catalog_session(ROWS)
+    service = TranslationService(session)
+
+    assert await service.resolve_many(["ui.save", "ui.cancel", "nope", "ui.save"], "uz") == {
+        "ui.save": "Saqlash",
+        "ui.cancel": "Отмена",
+        "nope": "nope",
+    }
+    assert await service.resolve_key("ui.save", "xx") == "Сохранить"  # unknown language -> default
+    assert len(session.statements) == 1
+
+    class _WriteSession:
+        def __init__(self):
+            self.calls = []
+
+        async def execute(self, statement, params=None):
+            is_notify = "pg_notify" in str(statement)
+            self.calls.append(("notify", params) if is_notify else ("select", None))
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(first=lambda: SimpleNamespace()))
+
+        async def delete(self, entity):
+            self.calls.append(("delete", None))
+
+        async def commit(self):
+            self.calls.append(("commit", None))
+
+    writer = _WriteSession()
+    assert await TranslationService(writer).delete_item(uuid4())
+    assert writer.calls == [
+        ("select", None),
+        ("delete", None),
+        ("notify", {"channel": NOTIFY_CHANNEL, "payload": "delete"}),
+        ("commit", None),
+    ]
+    session.statements.clear()
+    await service.resolve_key("ui.save", "ru")
+    # the writer's own process reloads in full
+    assert "updated_at >" not in session.statements[0][0]
+
+
+async def test_bot_reads_the_normalized_view(monkeypatch, catalog_session) -> None:
+    catalog = TranslationCatalog(refresh_seconds=60)
+    catalog.register_view(i18n.BOT_VIEW, i18n._normalize_text)
+    await catalog.ready(catalog_session(ROWS))
+    monkeypatch.setattr(i18n, "TRANSLATION_CATALOG", catalog)
+    context = type("Context", (), {"user_data": {"lang": "en"}})()
+
+    assert await i18n.t(None, context, "telegram.multi") == "строка 1\nстрока 2"
+    assert await i18n.t(None, context, "telegram.button.back") == "◀️ Back"
+    fallback = await i18n.t(None, context, "telegram.unknown", fallback="Запасной {n}", n=2)
+    assert fallback == "Запасной 2"
+
+
+async def test_literal_index_prefers_user_language_then_default_then_smallest_key(
+    catalog_session,
+) -> None:
+    catalog = TranslationCatalog(refresh_seconds=60)
+    await catalog.ready(
+        catalog_session(
+            ROWS
+            + [
+                _row("ui.b_ok", "ru", "OK"),
+                _row("ui.a_ok", "ru", "OK"),
+                _row("ui.uz_ok", "uz", "OK"),
+                _row("ui.en_ok", "en", "OK "),
+            ]
+        )
+    )
+
+    assert catalog.literal_keys("uz")["OK"] == "ui.uz_ok"
+    assert catalog.literal_keys("en")["OK"] == "ui.en_ok"  # matched on stripped text
+    assert catalog.literal_keys("ru")["OK"] == "ui.a_ok"
+    assert catalog.literal_keys("uz")["Сохранить"] == "ui.save"  # any language finds the key
+    assert catalog.literal_keys("uz") is catalog.literal_keys("uz")
+
+
+async def test_literals_are_localized_in_one_pass(monkeypatch, catalog_session) -> None:
+    catalog = TranslationCatalog(refresh_seconds=60)
+    monkeypatch.setattr(translation_service, "TRANSLATION_CATALOG", catalog)
+    session = catalog_session(ROWS)
+
+    result = await TranslationService(session).localize_literals(
+        [" Сохранить ", "Отмена", "Нет такого", ""], "uz"
+    )
+
+    assert result == {"Сохранить": "Saqlash", "Отмена": "Отмена", "Нет такого": "Нет такого"}
+    assert len(session.statements) == 1  # the catalog load; no query per literal
+
+
+async def test_bot_localizes_literals_through_the_index(monkeypatch, catalog_session) -> None:
+    catalog = TranslationCatalog(refresh_seconds=60)
+    catalog.register_view(i18n.BOT_VIEW, i18n._normalize_text)
+    session = catalog_session(ROWS)
+    await catalog.ready(session)
+    monkeypatch.setattr(i18n, "TRANSLATION_CATALOG", catalog)
+    context = type("Context", (), {"user_data": {"lang": "en"}})()
+
+    assert await i18n.localize_literal(None, context, "◀️ Назад") == "◀️ Back"
+    assert await i18n.localize_literal(None, context, "строка 1\nстрока 2") == "строка 1\nстрока 2"
+    # no en text: default
+    assert await i18n.localize_literal(None, context, "Сохранить") == "Сохранить"
+    assert await i18n.localize_literal(None, context, "Просто текст") == "Просто текст"
+    assert len(session.statements) == 1
+
+
+def test_bundle_is_served_gzipped_with_etag_and_rebuilt_on_change(
+    monkeypatch, catalog_session
+) -> None:
+    catalog = TranslationCatalog(refresh_seconds=0)
+    monkeypatch.setattr(translation_service, "TRANSLATION_CATALOG", catalog)
+    monkeypatch.setattr(translation_service, "_BUNDLES", {})
+    rows = ROWS + [_row("field.phone", "ru", "Телефон", category=None)]
+    session = catalog_session(rows)
+    app = FastAPI()
+    app.include_router(translations_router.router)
+    app.dependency_overrides[get_db_session] = lambda: session
+    app.dependency_overrides[get_current_user] = lambda: User(login="u", role="agent")
+    client = TestClient(app)
+
+    response = client.get("/translations/bundle/uz")
+    assert response.status_code == 200 and response.headers["content-encoding"] == "gzip"
+    assert response.json() == {
+        "language": "uz",
+        "data": {"field.phone": "Телефон", "ui.cancel": "Отмена", "ui.save": "Saqlash"},
+    }
+    etag = response.headers["etag"]
+    bundle = translation_service._BUNDLES["uz"][1]
+    assert gzip.decompress(bundle.gzipped) == bundle.body
+
+    assert client.get("/translations/bundle/uz", headers={"If-None-Match": etag}).status_code == 304
+    plain = client.get("/translations/bundle/uz", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and json.loads(plain.content)["language"] == "uz"
+    assert plain.headers["etag"] != etag
+
+    rows.append(_row("ui.close", "uz", "Yopish", minutes=5))
+    changed = client.get("/translations/bundle/uz", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json()["data"]["ui.close"] == "Yopish"
+    assert client.get("/translations/bundle/xx").json()["language"] == "ru"  # unknown -> default
+
+
+async def test_prefetched_screen_renders_without_catalog_checks(
+    monkeypatch, catalog_session
+) -> None:
+    catalog = TranslationCatalog(refresh_seconds=0)  # every ready() would go to the database
+    catalog.register_view(i18n.BOT_VIEW, i18n._normalize_text)
+    session = catalog_session(ROWS)
+    checks = []
+
+    async def ready():
+        checks.append(1)
+        return await TranslationCatalog.ready(catalog, session)
+
+    monkeypatch.setattr(catalog, "ready", ready)
+    monkeypatch.setattr(i18n, "TRANSLATION_CATALOG", catalog)
+    context = type("Context", (), {"user_data": {"lang": "en"}})()
+
+    prepared = await i18n.prefetch(
+        None, context, ["telegram.multi", "telegram.button.back", "telegram.unknown"]
+    )
+    texts = [
+        await i18n.t(None, context, "telegram.multi"),
+        await i18n.t(None, context, "telegram.button.back"),
+    ]
+
+    assert prepared == {"telegram.multi": "строка 1\nстрока 2", "telegram.button.back": "◀️ Back"}
+    assert texts == list(prepared.values())
+    assert len(checks) == 1 and len(session.statements) == 1
+
+    # language switched mid-update: the prepared texts are not used
+    context.user_data["lang"] = "uz"
+    assert await i18n.t(None, context, "telegram.button.back") == "◀️ Назад"
+    assert len(checks) == 2
+
+
+async def test_listener_retries_after_a_failed_setup(monkeypatch) -> None:
+    import asyncpg
+
+    catalog = TranslationCatalog(refresh_seconds=60)
+    listening = asyncio.Event()
+    attempts = []
+
+    class _Connection:
+        def __init__(self):
+            self.closed = False
+
+        def add_termination_listener(self, callback):
+            pass
+
+        async def add_listener(self, channel, callback):
+            attempts.append(channel)
+            if len(attempts) == 1:
+                raise asyncpg.exceptions.ConnectionDoesNotExistError("connection was closed")
+            listening.set()
+
+        def is_closed(self):
+            return self.closed
+
+        async def close(self):
+            self.closed = True
+
+    async def connect(_dsn):
+        return _Connection()
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    task = asyncio.create_task(translation_catalog._listen_forever(catalog, initial_delay=0.01))
+    await asyncio.wait_for(listening.wait(), 1)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert attempts == [NOTIFY_CHANNEL, NOTIFY_CHANNEL]
+
+
+async def test_startup_warm_up_failure_still_starts_listening(monkeypatch) -> None:
+    catalog = TranslationCatalog(refresh_seconds=60)
+    listened = []
+
+    async def failing_ready(session=None):
+        raise OSError("database is starting")
+
+    async def listen_forever(target):
+        listened.append(target)
+
+    monkeypatch.setattr(catalog, "ready", failing_ready)
+    monkeypatch.setattr(translation_catalog, "_listen_forever", listen_forever)
+    await translation_catalog._warm_and_listen(catalog)
+
+    assert listened == [catalog] and not catalog.loaded
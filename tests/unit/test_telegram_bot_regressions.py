@@ -7,7 +7,8 @@ import pytest
 from telegram.error import NetworkError
 
 from src.telegram_bot import handlers_agent, handlers_auth
-from src.core import notifications
+from src.core import notifications, schema_registry
+from src.core.schema_registry import SchemaCapabilities
 from src.telegram_bot import bot as telegram_bot
 from src.telegram_bot import handlers_expeditor
 from src.api.v1.routers import operations
@@ -40,7 +41,7 @@ async def test_show_main_menu_force_reply_uses_new_message(monkeypatch) -> None:
 @pytest.mark.asyncio
 async def test_agent_order_confirm_sets_scheduled_delivery_for_today(monkeypatch) -> None:
     session = SimpleNamespace(login="agent1", role="agent")
-    create_order_mock = AsyncMock(return_value={"order_no": 42})
+    create_order_mock = AsyncMock(return_value={"order_no": 42, "total_amount": 20.0})
     add_item_mock = AsyncMock()
     update_total_mock = AsyncMock()
     get_customer_mock = AsyncMock(return_value={"name_client": "Client", "tax_id": "123456789"})
@@ -52,7 +53,7 @@ async def test_agent_order_confirm_sets_scheduled_delivery_for_today(monkeypatch
         handlers_agent,
         "api",
         SimpleNamespace(
-            create_order=create_order_mock,
+            create_order_full=create_order_mock,
             add_order_item=add_item_mock,
             update_order_total=update_total_mock,
             get_customer=get_customer_mock,
@@ -79,22 +80,20 @@ async def test_agent_order_confirm_sets_scheduled_delivery_for_today(monkeypatch
     payload = create_order_mock.await_args.args[1]
     assert payload["customer_id"] == 7
     assert payload["scheduled_delivery_at"] == handlers_agent.date.today().isoformat()
+    assert payload["items"] == [{"product_code": "P1", "quantity": 2, "price": 10.0}]
+    add_item_mock.assert_not_called()
+    update_total_mock.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_get_user_language_falls_back_when_column_missing(monkeypatch) -> None:
-    notifications._user_language_column_exists = None
-
-    class _Result:
-        def __init__(self, value):
-            self._value = value
-
-        def scalar(self):
-            return self._value
+    schema = SchemaCapabilities()
+    schema.load([("users", "login"), ("users", "role")])
+    monkeypatch.setattr(schema_registry, "SCHEMA", schema)
 
     class _Session:
         async def execute(self, *_args, **_kwargs):
-            return _Result(False)
+            raise AssertionError("language lookup must not query the DB when the column is missing")
 
     class _SessionCtx:
         async def __aenter__(self):